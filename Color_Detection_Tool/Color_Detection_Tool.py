@@ -9,17 +9,111 @@
 # In[7]:
 
 
-import cv2
-import numpy as np
+import time
+
+# Startup times are measured from here
+STARTUP_T0 = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
-import webcolors
+import argparse
+import contextlib
+import importlib.util
+import json
+import logging
+import os
 import threading
-import colorsys
+import types
+
+# Only light modules are imported up front; OpenCV, NumPy, PIL and the
+# color tables are loaded by load_backend() once the window is up
+from camera_pipeline import FramePipeline
+from history_view import HistoryView
+
+logger = logging.getLogger(__name__)
+
+# How often the Tk main loop checks for a new processed camera frame
+RENDER_INTERVAL_MS = 10
+
+# How long 'Capture Color' waits for a stable camera reading before giving up
+STABLE_CAPTURE_TIMEOUT_MS = 3000
+
+# Named colors listed in the area breakdown of a segmented image
+AREA_STATS_TOP = 8
+
+# How often the metrics bar refreshes (and --metrics-out is rewritten)
+METRICS_REFRESH_MS = 1000
+
+# Captured colors offered in the Track selector (newest first)
+TRACK_CHOICES = 20
+
+# Stands in for a stage timer when metrics are disabled
+_NOT_TIMED = contextlib.nullcontext()
+
+# How often the Tk main loop checks whether the background loader finished
+BACKEND_POLL_MS = 20
+
+
+def load_backend(palette=None):
+    """Import the heavy modules and load the color tables.
+
+    Takes seconds on thin clients, so the app runs it on a background
+    thread after its window is shown. Returns a namespace of everything the
+    app needs from those modules (cv2, Image, ImageTk, LargeImage, ...) plus
+    `color_lut` (RGB -> name lookup cube), `color_namer` (basic colors) and
+    `palette_matcher` (a perceptual.PerceptualMatcher over `palette` -- see
+    perceptual.named_palette -- or None); the app keeps it as `app.backend`.
+    With a `palette`, `color_lut` is built from the same colors (cached per
+    palette), so segmentation and area stats use its names too.
+    """
+    import cv2
+    from PIL import Image, ImageTk
+
+    from color_lut import ColorLUT, default_cache_dir
+    from color_names import ColorNamer
+    from color_updates import ColorUpdateCoalescer
+    from core import ColorAnalyzer
+    from display import DisplayRenderer
+    from frame_processing import CameraFrameProcessor
+    from frame_sources import open_source
+    from history import ColorHistory
+    from large_image import LargeImage
+    from palette import extract_palette
+    from sampling import SAMPLING_PRESETS
+    from segmentation import area_stats, overlay, segment_image
+    from tracking import ColorTracker
+
+    palette_matcher = None
+    # RGB -> name cube (CSS3 exact names + basic fallback), cached on disk;
+    # the namer's palette is precomputed once and shared by every lookup
+    color_lut_options = {'bits': 8}
+    if palette is not None:
+        from perceptual import PerceptualMatcher, named_palette
+        colors = named_palette(palette)
+        palette_matcher = PerceptualMatcher(colors)
+        # Every cell gets its nearest palette color, with no CSS3 names mixed
+        # in. Build time grows with the palette, so the cube is coarser (the
+        # picker still matches exactly through palette_matcher)
+        color_lut_options = {'bits': 6 if len(colors) <= 1024 else 5,
+                             'basic_colors': colors, 'exact_colors': {}}
+
+    return types.SimpleNamespace(
+        cv2=cv2, Image=Image, ImageTk=ImageTk,
+        default_cache_dir=default_cache_dir, ColorUpdateCoalescer=ColorUpdateCoalescer,
+        ColorAnalyzer=ColorAnalyzer, DisplayRenderer=DisplayRenderer,
+        CameraFrameProcessor=CameraFrameProcessor, open_source=open_source, ColorHistory=ColorHistory,
+        LargeImage=LargeImage, extract_palette=extract_palette, SAMPLING_PRESETS=SAMPLING_PRESETS,
+        area_stats=area_stats, overlay=overlay, segment_image=segment_image, ColorTracker=ColorTracker,
+        color_lut=ColorLUT.load_or_build(**color_lut_options),
+        color_namer=ColorNamer(),
+        palette_matcher=palette_matcher,
+    )
+
 
 class ColorDetectionApp:
-    def __init__(self, root):
+    def __init__(self, root, palette_matcher=None, source='0', metrics=None, metrics_path=None,
+                 history=None, history_path=None, history_size=None, autostart_camera=False,
+                 startup_report=None, palette=None):
         self.root = root
         self.root.title("🎨 Python Color Detection Tool")
         self.root.geometry("1000x700")
@@ -27,12 +121,143 @@ class ColorDetectionApp:
         
         # Variables
         self.cap = None
+        # Frame source spec for 'Start Camera' (webcam index, video file, image folder...)
+        self.source = source
+        self.pipeline = None
         self.is_camera_running = False
         self.current_image = None
-        self.color_history = []
+        self.track_choices = []
         self.current_color = None
+        self.drag_start = None
+        self.reading_stable = False
+        self.sampling_statistic = 'mean'
+        # Optional perceptual.PerceptualMatcher for large vendor palettes, or a
+        # palette spec (see perceptual.named_palette) to build one in the background
+        self.palette_matcher = palette_matcher
+        self._palette = palette
+        
+        # Optional metrics.PipelineMetrics; None keeps instrumentation off
+        self.metrics = metrics
+        self.metrics_path = metrics_path
+        
+        # Built by finish_startup() once load_backend() has run
+        self.backend = None
+        self.backend_ready = False
+        self.display_renderer = None
+        self.frame_processor = None
+        self.sampling_region = None
+        self.color_updates = None
+        self.color_namer = None
+        self.color_lut = None
+        self.color_info = None
+        self.color_history = history
+        self.history_view = None
+        self._history_path = history_path
+        self._history_size = history_size
+        
+        # Startup timing (ms since STARTUP_T0); see --startup-report
+        self.autostart_camera = autostart_camera
+        self.startup_report = startup_report
+        self.startup_times = {}
         
         self.setup_ui()
+        self.root.after(0, self.on_window_shown)
+        
+        # Heavy imports and the lookup cube load while the window is up
+        self._loaded_backend = None
+        self._backend_error = None
+        self._backend_thread = threading.Thread(target=self._load_backend, name="backend-loader", daemon=True)
+        self._backend_thread.start()
+        self.root.after(BACKEND_POLL_MS, self.check_backend)
+    
+    def _load_backend(self):
+        """Background thread: run load_backend() (never touches Tk)"""
+        try:
+            self._loaded_backend = load_backend(self._palette)
+        except Exception as e:
+            logger.exception("Failed to load modules: %s", e)
+            self._backend_error = e
+    
+    def check_backend(self):
+        """Poll the background loader from the Tk main loop"""
+        if self._backend_thread.is_alive():
+            self.root.after(BACKEND_POLL_MS, self.check_backend)
+            return
+        if self._backend_error is not None:
+            self.status_var.set(f"Failed to load: {self._backend_error}")
+            messagebox.showerror("Error", f"Failed to load modules: {self._backend_error}")
+            return
+        self.finish_startup(self._loaded_backend)
+    
+    def finish_startup(self, backend):
+        """Build everything that needs the heavy modules (see load_backend) and enable the controls"""
+        self.backend = backend
+        self.color_lut = backend.color_lut
+        self.color_namer = backend.color_namer
+        if self.palette_matcher is None:
+            self.palette_matcher = backend.palette_matcher
+        self.display_renderer = backend.DisplayRenderer(630, 480)
+        
+        # Camera frames are sampled, smoothed and drawn off the Tk thread
+        self.frame_processor = backend.CameraFrameProcessor(renderer=self.display_renderer)
+        if self.metrics is not None:
+            self.frame_processor.on_stage = self.metrics.record
+        
+        # Sampling settings for still images (the processor keeps its own copy)
+        self.sampling_region = backend.SAMPLING_PRESETS['Circle (20 px)']
+        self.region_combo['values'] = list(backend.SAMPLING_PRESETS)
+        
+        # Camera readings only re-render when the color visibly changes
+        self.color_updates = backend.ColorUpdateCoalescer(delta_e_threshold=2.0, max_rate_hz=15.0)
+        
+        # Name, hex and HSL per distinct color, computed once (camera colors repeat);
+        # the same core.ColorAnalyzer backs the HTTP service
+        self.analyzer = backend.ColorAnalyzer(self.palette_matcher if self.palette_matcher is not None
+                                              else self.color_lut)
+        self.color_info = self.analyzer.info
+        
+        # Captured colors: capped, deduplicated by ΔE and (with a path) persisted
+        if self.color_history is None:
+            history_path = self._history_path or os.path.join(backend.default_cache_dir(), 'history.sqlite3')
+            options = {'max_entries': self._history_size} if self._history_size else {}
+            self.color_history = backend.ColorHistory(history_path, **options)
+        self.history_view = HistoryView(self.history_frame, self.color_history,
+                                        on_select=self.on_history_selected, bg='#f0f0f0')
+        self.history_view.pack(fill=tk.BOTH, expand=True, padx=5, pady=5, before=self.history_buttons)
+        # Colors persisted from earlier sessions
+        self.update_color_history()
+        
+        self.backend_ready = True
+        self.start_camera_btn.config(state=tk.NORMAL)
+        self.upload_btn.config(state=tk.NORMAL)
+        self.region_combo.config(state='readonly')
+        self.statistic_combo.config(state='readonly')
+        self.export_history_btn.config(state=tk.NORMAL)
+        self.clear_history_btn.config(state=tk.NORMAL)
+        self.on_sampling_changed()
+        if self.segment_var.get():
+            self.on_segment_toggled()
+        self.status_var.set("Ready - Choose camera or upload image")
+        self.record_startup('backend_ms')
+        
+        if self.autostart_camera:
+            self.start_camera()
+        elif self.startup_report:
+            self.finish_startup_report()
+    
+    def on_window_shown(self):
+        self.record_startup('window_ms')
+    
+    def record_startup(self, name):
+        """Record a startup milestone (ms since the module started loading)"""
+        self.startup_times[name] = round((time.perf_counter() - STARTUP_T0) * 1000, 1)
+        logger.info("Startup %s: %.1f", name, self.startup_times[name])
+    
+    def finish_startup_report(self):
+        """Write the --startup-report file and quit"""
+        with open(self.startup_report, 'w', encoding='utf-8') as f:
+            json.dump(self.startup_times, f, indent=2)
+        self.root.quit()
         
     def setup_ui(self):
         # Title
@@ -47,7 +272,8 @@ class ColorDetectionApp:
         # Buttons
         self.start_camera_btn = tk.Button(control_frame, text="📹 Start Camera", 
                                          command=self.start_camera, font=('Arial', 12),
-                                         bg='#4CAF50', fg='white', padx=20, pady=5)
+                                         bg='#4CAF50', fg='white', padx=20, pady=5,
+                                         state=tk.DISABLED)
         self.start_camera_btn.pack(side=tk.LEFT, padx=5)
         
         self.stop_camera_btn = tk.Button(control_frame, text="⏹️ Stop Camera", 
@@ -58,7 +284,8 @@ class ColorDetectionApp:
         
         self.upload_btn = tk.Button(control_frame, text="📁 Upload Image", 
                                    command=self.upload_image, font=('Arial', 12),
-                                   bg='#2196F3', fg='white', padx=20, pady=5)
+                                   bg='#2196F3', fg='white', padx=20, pady=5,
+                                   state=tk.DISABLED)
         self.upload_btn.pack(side=tk.LEFT, padx=5)
         
         self.capture_color_btn = tk.Button(control_frame, text="🎯 Capture Color", 
@@ -67,6 +294,12 @@ class ColorDetectionApp:
                                           state=tk.DISABLED)
         self.capture_color_btn.pack(side=tk.LEFT, padx=5)
         
+        self.palette_btn = tk.Button(control_frame, text="🎨 Extract Palette", 
+                                    command=self.extract_palette_colors, font=('Arial', 12),
+                                    bg='#9C27B0', fg='white', padx=20, pady=5,
+                                    state=tk.DISABLED)
+        self.palette_btn.pack(side=tk.LEFT, padx=5)
+        
         # Main content frame
         main_frame = tk.Frame(self.root, bg='#f0f0f0')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -84,13 +317,49 @@ class ColorDetectionApp:
         self.image_label = tk.Label(self.image_frame, text="No image loaded\nClick 'Start Camera' or 'Upload Image'",
                                    font=('Arial', 14), bg='white', fg='gray')
         self.image_label.place(relx=0.5, rely=0.5, anchor='center')  # Center the label
-        self.image_label.bind("<Button-1>", self.on_image_click)
+        self.image_label.bind("<ButtonPress-1>", self.on_image_press)
+        self.image_label.bind("<ButtonRelease-1>", self.on_image_release)
         
         # Instructions
         instruction_label = tk.Label(left_frame, 
-                                   text="Camera Mode: Color detection at center crosshair\nImage Mode: Click anywhere to detect color",
+                                   text="Camera Mode: Color detection at center crosshair\nImage Mode: Click anywhere to detect color (or drag a rectangle)",
                                    font=('Arial', 10), bg='#f0f0f0', fg='#666')
-        instruction_label.pack(pady=(5, 10))
+        instruction_label.pack(pady=(5, 5))
+        
+        # Sampling region settings
+        sampling_frame = tk.Frame(left_frame, bg='#f0f0f0')
+        sampling_frame.pack(pady=(0, 10))
+        
+        tk.Label(sampling_frame, text="Sample:", font=('Arial', 10), bg='#f0f0f0').pack(side=tk.LEFT)
+        self.sampling_region_var = tk.StringVar(value='Circle (20 px)')
+        # Filled in and enabled by finish_startup() (the presets live in the OpenCV-based
+        # sampling module), like the statistic selector and the history buttons
+        self.region_combo = ttk.Combobox(sampling_frame, textvariable=self.sampling_region_var,
+                                         values=[], state=tk.DISABLED, width=15)
+        self.region_combo.pack(side=tk.LEFT, padx=5)
+        self.region_combo.bind("<<ComboboxSelected>>", self.on_sampling_changed)
+        
+        self.sampling_statistic_var = tk.StringVar(value='mean')
+        self.statistic_combo = ttk.Combobox(sampling_frame, textvariable=self.sampling_statistic_var,
+                                            values=['mean', 'median'], state=tk.DISABLED, width=8)
+        self.statistic_combo.pack(side=tk.LEFT, padx=5)
+        self.statistic_combo.bind("<<ComboboxSelected>>", self.on_sampling_changed)
+        
+        self.segment_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(sampling_frame, text="Segment colors", variable=self.segment_var,
+                      command=self.on_segment_toggled, font=('Arial', 10),
+                      bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
+        
+        # Color tracking (camera mode): box every region of a captured color
+        tracking_frame = tk.Frame(left_frame, bg='#f0f0f0')
+        tracking_frame.pack(pady=(0, 10))
+        
+        tk.Label(tracking_frame, text="Track:", font=('Arial', 10), bg='#f0f0f0').pack(side=tk.LEFT)
+        self.track_var = tk.StringVar(value='Off')
+        self.track_combo = ttk.Combobox(tracking_frame, textvariable=self.track_var,
+                                        values=['Off'], state='readonly', width=30)
+        self.track_combo.pack(side=tk.LEFT, padx=5)
+        self.track_combo.bind("<<ComboboxSelected>>", self.on_track_changed)
         
         # Right side - Color information
         right_frame = tk.LabelFrame(main_frame, text="Color Information", 
@@ -108,6 +377,15 @@ class ColorDetectionApp:
                                      relief=tk.RAISED, bg='white')
         self.color_preview.pack(pady=5)
         
+        self.stability_var = tk.StringVar(value="")
+        tk.Label(color_display_frame, textvariable=self.stability_var, font=('Arial', 9),
+                bg='#f0f0f0', fg='#666').pack()
+        
+        self.wait_stable_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(color_display_frame, text="Capture waits for stable reading",
+                      variable=self.wait_stable_var, font=('Arial', 9),
+                      bg='#f0f0f0').pack()
+        
         # Color values
         values_frame = tk.Frame(right_frame, bg='#f0f0f0')
         values_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -126,39 +404,51 @@ class ColorDetectionApp:
         tk.Label(values_frame, textvariable=self.hsl_var, font=('Arial', 10),
                 bg='#f0f0f0', anchor='w').pack(fill=tk.X, pady=2)
         
-        # Color history
-        history_frame = tk.LabelFrame(right_frame, text="Color History", 
+        # Dominant colors
+        palette_frame = tk.LabelFrame(right_frame, text="Dominant Colors", 
                                      font=('Arial', 12, 'bold'), bg='#f0f0f0')
-        history_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # Simple scrollable text widget for history
-        history_container = tk.Frame(history_frame)
-        history_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        palette_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
         
-        # Text widget with scrollbar for history
-        self.history_text = tk.Text(history_container, height=10, width=25, wrap=tk.WORD,
-                                   font=('Arial', 9), bg='white', relief=tk.SUNKEN, bd=1)
-        history_scrollbar = ttk.Scrollbar(history_container, orient="vertical", 
-                                         command=self.history_text.yview)
-        self.history_text.configure(yscrollcommand=history_scrollbar.set)
+        self.palette_container = tk.Frame(palette_frame, bg='#f0f0f0')
+        self.palette_container.pack(fill=tk.X, padx=5, pady=5)
+        tk.Label(self.palette_container, text="Load an image and click 'Extract Palette'",
+                font=('Arial', 9), bg='#f0f0f0', fg='#666').pack()
         
-        self.history_text.pack(side="left", fill="both", expand=True)
-        history_scrollbar.pack(side="right", fill="y")
+        # Color history
+        self.history_frame = tk.LabelFrame(right_frame, text="Color History", 
+                                          font=('Arial', 12, 'bold'), bg='#f0f0f0')
+        self.history_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Add initial message
-        self.history_text.insert(tk.END, "Captured colors will appear here...\n\n")
-        self.history_text.config(state=tk.DISABLED)
+        # The virtualized list (only visible rows are drawn) is added above
+        # these buttons by finish_startup(), once the history store is open
+        self.history_buttons = tk.Frame(self.history_frame, bg='#f0f0f0')
+        self.history_buttons.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=(0, 5))
+        self.export_history_btn = tk.Button(self.history_buttons, text="💾 Export",
+                                            command=self.export_history, font=('Arial', 9),
+                                            state=tk.DISABLED)
+        self.export_history_btn.pack(side=tk.LEFT)
+        self.clear_history_btn = tk.Button(self.history_buttons, text="🗑️ Clear",
+                                           command=self.clear_history, font=('Arial', 9),
+                                           state=tk.DISABLED)
+        self.clear_history_btn.pack(side=tk.LEFT, padx=5)
         
         # Status bar
-        self.status_var = tk.StringVar(value="Ready - Choose camera or upload image")
+        self.status_var = tk.StringVar(value="Loading...")
         status_bar = tk.Label(self.root, textvariable=self.status_var, relief=tk.SUNKEN,
                              anchor=tk.W, font=('Arial', 10), bg='#e0e0e0')
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        if self.metrics is not None:
+            self.metrics_var = tk.StringVar(value="Metrics: waiting for frames")
+            tk.Label(self.root, textvariable=self.metrics_var, relief=tk.SUNKEN, anchor=tk.W,
+                    font=('Arial', 9), bg='#e0e0e0', fg='#444').pack(side=tk.BOTTOM, fill=tk.X)
+            self.root.after(METRICS_REFRESH_MS, self.refresh_metrics)
     
     def start_camera(self):
         try:
-            self.cap = cv2.VideoCapture(0)
+            self.cap = self.backend.open_source(self.source, loop=True, realtime=True)
             if not self.cap.isOpened():
+                self.release_camera()
                 messagebox.showerror("Error", "Cannot access camera!")
                 return
             
@@ -166,25 +456,51 @@ class ColorDetectionApp:
             self.start_camera_btn.config(state=tk.DISABLED)
             self.stop_camera_btn.config(state=tk.NORMAL)
             self.capture_color_btn.config(state=tk.NORMAL)
+            self.palette_btn.config(state=tk.DISABLED)
             self.status_var.set("Camera started - Color detection at center crosshair")
             
-            # Start camera thread
-            self.camera_thread = threading.Thread(target=self.update_camera, daemon=True)
-            self.camera_thread.start()
+            # Capture and processing run on their own threads; rendering
+            # happens on the Tk main loop
+            self.display_renderer.reset()
+            self.color_updates.reset()
+            self.frame_processor.reset()
+            self.reading_stable = False
+            cap = self.cap
+            read_frame = cap.read
+            if self.metrics is not None:
+                self.metrics.reset()
+                read_frame = lambda: self.timed_read(cap)
+            # The capture thread releases the source itself once its last read() returns
+            self.pipeline = FramePipeline(read_frame, self.frame_processor.process,
+                                          on_capture_exit=cap.release)
+            self.pipeline.start()
+            self.root.after(0, self.render_camera)
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to start camera: {str(e)}")
     
+    def release_camera(self):
+        """Stop the pipeline threads; the source is released by the capture thread on its way out"""
+        if self.pipeline:
+            self.pipeline.stop()
+            self.pipeline = None
+        elif self.cap:
+            self.cap.release()
+        self.cap = None
+    
     def stop_camera(self):
         self.is_camera_running = False
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        self.release_camera()
         
         self.start_camera_btn.config(state=tk.NORMAL)
         self.stop_camera_btn.config(state=tk.DISABLED)
         self.capture_color_btn.config(state=tk.DISABLED)
+        # A still image loaded before the camera started can still be analysed
+        if self.current_image is not None:
+            self.palette_btn.config(state=tk.NORMAL)
         self.status_var.set("Camera stopped")
+        self.stability_var.set("")
+        self.display_renderer.reset()
         self.image_label.config(image='', text="No image loaded\nClick 'Start Camera' or 'Upload Image'")
         self.image_label.place(relx=0.5, rely=0.5, anchor='center')
     
@@ -205,50 +521,54 @@ class ColorDetectionApp:
             new_height = max_height
             new_width = int(max_height * aspect_ratio)
         
-        return pil_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-    def update_camera(self):
-        while self.is_camera_running:
-            ret, frame = self.cap.read()
-            if not ret:
-                break
-            
-            # Flip frame horizontally for mirror effect
-            frame = cv2.flip(frame, 1)
-            
-            # Draw crosshair at center
-            h, w = frame.shape[:2]
-            center_x, center_y = w // 2, h // 2
-            
-            # Draw crosshair
-            cv2.line(frame, (center_x - 15, center_y), (center_x + 15, center_y), (0, 255, 0), 2)
-            cv2.line(frame, (center_x, center_y - 15), (center_x, center_y + 15), (0, 255, 0), 2)
-            cv2.circle(frame, (center_x, center_y), 20, (0, 255, 0), 2)
-            
-            # Get color at center
-            bgr_color = frame[center_y, center_x]
-            rgb_color = tuple(reversed(bgr_color))  # Convert BGR to RGB
+        return pil_image.resize((new_width, new_height), self.backend.Image.Resampling.LANCZOS)
+    def render_camera(self):
+        """Render stage (Tk main loop): show the latest processed frame"""
+        if not self.is_camera_running or self.pipeline is None:
+            return
+        
+        result = self.pipeline.poll()
+        # Show the last processed frame before reporting why the pipeline ended
+        if result is None and self.pipeline.error and self.pipeline.finished:
+            error = self.pipeline.error
+            self.stop_camera()
+            self.status_var.set(f"Camera stopped - {error}")
+            return
+        
+        if result is not None:
+            display_frame, rgb_color, stable, areas, tracked = result
             
             # Update color information
-            self.update_color_info(rgb_color)
-            
-            # Convert to display format
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(rgb_frame)
+            with self.timed('name'):
+                self.update_color_info(rgb_color)
+            if stable != self.reading_stable or not self.stability_var.get():
+                self.reading_stable = stable
+                self.stability_var.set("● Stable" if stable else "○ Settling...")
             
-            # Resize to fit the display area while maintaining aspect ratio
-            display_width, display_height = 630, 480
-            pil_image = self.resize_image_maintain_aspect(pil_image, display_width, display_height)
-            photo = ImageTk.PhotoImage(pil_image)
+            status = []
+            if tracked is not None:
+                status.append(f"Tracking: {len(tracked.boxes)} object(s) in {tracked.latency_ms:.1f} ms")
+            if areas:
+                status.append("Segmenting - " + ", ".join(f"{a['name']} {a['percent']:.0f}%" for a in areas))
+            if status:
+                self.status_var.set(" | ".join(status))
             
-            # Update display
-            self.image_label.config(image=photo, text="")
-            self.image_label.place(relx=0.5, rely=0.5, anchor='center')
-            self.image_label.image = photo  # Keep reference
+            # Update display (reuses one PhotoImage)
+            with self.timed('render'):
+                self.display_renderer.show(self.image_label, display_frame)
+            if self.metrics is not None:
+                self.metrics.frame()
+            if 'first_frame_ms' not in self.startup_times:
+                self.record_startup('first_frame_ms')
+                if self.startup_report:
+                    self.finish_startup_report()
+        
+        self.root.after(RENDER_INTERVAL_MS, self.render_camera)
     
     def upload_image(self):
         file_path = filedialog.askopenfilename(
             title="Select Image",
-            filetypes=[("Image files", "*.jpg *.jpeg *.png *.bmp *.gif *.tiff")]
+            filetypes=[("Image files", "*.jpg *.jpeg *.png *.bmp *.gif *.tiff *.tif *.npy")]
         )
         
         if file_path:
@@ -257,229 +577,421 @@ class ColorDetectionApp:
                 if self.is_camera_running:
                     self.stop_camera()
                 
-                # Load and display image
-                self.current_image = cv2.imread(file_path)
-                if self.current_image is None:
+                # Load the image; huge files only decode a reduced preview and
+                # read full-resolution pixels lazily
+                try:
+                    with self.timed('load'):
+                        self.current_image = self.backend.LargeImage.open(file_path)
+                except ValueError:
                     messagebox.showerror("Error", "Failed to load image!")
                     return
                 
                 # Store original image dimensions for click coordinate conversion
-                self.original_height, self.original_width = self.current_image.shape[:2]
-                
-                # Convert to RGB for display
-                rgb_image = cv2.cvtColor(self.current_image, cv2.COLOR_BGR2RGB)
-                pil_image = Image.fromarray(rgb_image)
+                self.original_height, self.original_width = self.current_image.height, self.current_image.width
                 
-                # Resize for display while maintaining aspect ratio
-                display_width, display_height = 630, 480
-                self.display_image = self.resize_image_maintain_aspect(pil_image, display_width, display_height)
-                self.display_width, self.display_height = self.display_image.size
-                
-                photo = ImageTk.PhotoImage(self.display_image)
-                
-                self.image_label.config(image=photo, text="")
-                self.image_label.place(relx=0.5, rely=0.5, anchor='center')
-                self.image_label.image = photo
+                with self.timed('render'):
+                    self.show_image(self.current_image.preview)
                 
                 self.capture_color_btn.config(state=tk.NORMAL)
+                self.palette_btn.config(state=tk.NORMAL)
                 self.status_var.set("Image loaded - Click anywhere on image to detect color")
                 
+                if self.segment_var.get():
+                    self.on_segment_toggled()
+                
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load image: {str(e)}")
     
-    def on_image_click(self, event):
+    def show_image(self, bgr_image):
+        """Show a BGR image (the preview of the loaded image) in the display area"""
+        backend = self.backend
+        # Convert to RGB for display
+        rgb_image = backend.cv2.cvtColor(bgr_image, backend.cv2.COLOR_BGR2RGB)
+        pil_image = backend.Image.fromarray(rgb_image)
+        
+        # Resize for display while maintaining aspect ratio
+        display_width, display_height = 630, 480
+        self.display_image = self.resize_image_maintain_aspect(pil_image, display_width, display_height)
+        self.display_width, self.display_height = self.display_image.size
+        
+        photo = backend.ImageTk.PhotoImage(self.display_image)
+        
+        self.image_label.config(image=photo, text="")
+        self.image_label.place(relx=0.5, rely=0.5, anchor='center')
+        self.image_label.image = photo
+    
+    def on_segment_toggled(self):
+        if not self.backend_ready:
+            return  # applied by finish_startup()
+        enabled = self.segment_var.get()
+        # The camera thread picks this up on its next frame
+        self.frame_processor.overlay_lut = self.color_lut if enabled else None
+        if self.current_image is None or self.is_camera_running:
+            return
+        
+        preview = self.current_image.preview
+        if not enabled:
+            self.show_image(preview)
+            self.status_var.set("Segmentation overlay off")
+            return
+        
+        # Tint the preview for display; area statistics cover the full image
+        # (streamed band by band for huge images)
+        backend = self.backend
+        labels = backend.segment_image(preview, self.color_lut).labels
+        self.show_image(backend.overlay(preview, labels, self.color_lut.colors))
+        stats = backend.area_stats(backend.segment_image(self.current_image, self.color_lut), top=AREA_STATS_TOP)
+        self.show_area_stats(stats)
+        self.status_var.set("Segmented - " + ", ".join(f"{s['name']} {s['percent']:.0f}%" for s in stats[:3]))
+    
+    def show_area_stats(self, stats):
+        """List named-color areas in the Dominant Colors panel"""
+        for widget in self.palette_container.winfo_children():
+            widget.destroy()
+        
+        for stat in stats:
+            r, g, b = self.color_lut.colors[self.color_lut.names.index(stat['name'])]
+            row = tk.Frame(self.palette_container, bg='#f0f0f0')
+            row.pack(fill=tk.X, pady=1)
+            tk.Label(row, text="", width=3, bg=f"#{r:02x}{g:02x}{b:02x}", relief=tk.RAISED).pack(side=tk.LEFT)
+            tk.Label(row, text=f"{stat['name']} {stat['percent']:.1f}%",
+                    font=('Arial', 9), bg='#f0f0f0', anchor='w').pack(side=tk.LEFT, padx=5)
+    
+    def timed(self, stage):
+        """Time a block as `stage` when metrics are enabled"""
+        return self.metrics.time(stage) if self.metrics is not None else _NOT_TIMED
+    
+    def timed_read(self, source):
+        """source.read() timed as the 'read' stage (capture thread); a paced source's sleep is 'pace'"""
+        start = self.metrics.clock()
+        result = source.read()
+        elapsed = self.metrics.clock() - start
+        if source.paced:
+            self.metrics.record('pace', source.last_wait)
+        self.metrics.record('read', elapsed - source.last_wait)
+        return result
+    
+    def refresh_metrics(self):
+        """Show the latest metrics and rewrite the --metrics-out file"""
+        if self.pipeline is not None:
+            self.metrics.set_counter('frames_dropped', self.pipeline.frames_dropped)
+        if self.color_info is not None:
+            self.metrics.set_counter('name_cache_hits', self.color_info.hits)
+            self.metrics.set_counter('name_cache_misses', self.color_info.misses)
+            self.metrics.set_gauge('name_cache_size', len(self.color_info))
+        self.metrics_var.set("Metrics: " + self.metrics.status_text(('read', 'display', 'render')))
+        if self.metrics_path:
+            try:
+                self.metrics.export(self.metrics_path)
+            except OSError as e:
+                logger.warning("Could not write metrics to %s: %s", self.metrics_path, e)
+                self.metrics_path = None
+        self.root.after(METRICS_REFRESH_MS, self.refresh_metrics)
+    
+    def on_track_changed(self, event=None):
+        """Track the selected captured color in camera frames (or stop tracking)"""
+        if not self.backend_ready:
+            return
+        labels = list(self.track_combo['values'])
+        index = labels.index(self.track_var.get()) if self.track_var.get() in labels else 0
+        if index == 0:
+            self.frame_processor.tracker = None
+            self.status_var.set("Tracking off")
+            return
+        
+        color_info = self.track_choices[index - 1]
+        # The camera thread picks this up on its next frame
+        self.frame_processor.tracker = self.backend.ColorTracker(color_info['rgb'])
+        if not self.is_camera_running:
+            self.status_var.set(f"Tracking {color_info['name']} - start the camera to see matches")
+    
+    def on_sampling_changed(self, event=None):
+        if not self.backend_ready:
+            return  # applied by finish_startup()
+        self.sampling_region = self.backend.SAMPLING_PRESETS[self.sampling_region_var.get()]
+        self.sampling_statistic = self.sampling_statistic_var.get()
+        self.frame_processor.sampling_region = self.sampling_region
+        self.frame_processor.sampling_statistic = self.sampling_statistic
+        self.color_updates.reset()
+    
+    def display_to_image_coords(self, x, y):
+        """Convert label coordinates to original image coordinates (None if outside)"""
+        # Calculate scaling factors between displayed image and original image
+        scale_x = self.original_width / self.display_width
+        scale_y = self.original_height / self.display_height
+        
+        # Get click coordinates relative to the image label
+        label_width = self.image_label.winfo_width()
+        label_height = self.image_label.winfo_height()
+        
+        # Calculate offset from center (since image is centered)
+        x_offset = (label_width - self.display_width) / 2
+        y_offset = (label_height - self.display_height) / 2
+        
+        # Adjust click coordinates
+        click_x = x - x_offset
+        click_y = y - y_offset
+        
+        # Check if click is within the actual image bounds
+        if not (0 <= click_x <= self.display_width and 0 <= click_y <= self.display_height):
+            return None
+        
+        # Convert to original image coordinates, within bounds
+        orig_x = max(0, min(int(click_x * scale_x), self.original_width - 1))
+        orig_y = max(0, min(int(click_y * scale_y), self.original_height - 1))
+        return orig_x, orig_y
+    
+    def on_image_press(self, event):
+        self.drag_start = (event.x, event.y)
+    
+    def on_image_release(self, event):
+        start, self.drag_start = self.drag_start, None
+        if not self.backend_ready:
+            return
+        if (self.sampling_region.kind == 'rect' and start is not None
+                and abs(event.x - start[0]) + abs(event.y - start[1]) > 3):
+            self.on_image_drag(start, (event.x, event.y))
+        else:
+            self.on_image_click(event)
+    
+    def on_image_drag(self, start, end):
+        """Sample the rectangle dragged from `start` to `end` (label coordinates)"""
         if self.current_image is None or self.is_camera_running:
             return
         
         try:
-            # Calculate scaling factors between displayed image and original image
-            scale_x = self.original_width / self.display_width
-            scale_y = self.original_height / self.display_height
-            
-            # Get click coordinates relative to the image label
-            label_width = self.image_label.winfo_width()
-            label_height = self.image_label.winfo_height()
-            
-            # Calculate offset from center (since image is centered)
-            x_offset = (label_width - self.display_width) / 2
-            y_offset = (label_height - self.display_height) / 2
+            # Clamp both corners into the displayed image before converting
+            x_offset = (self.image_label.winfo_width() - self.display_width) / 2
+            y_offset = (self.image_label.winfo_height() - self.display_height) / 2
+            corners = []
+            for x, y in (start, end):
+                x = min(max(x, x_offset), x_offset + self.display_width)
+                y = min(max(y, y_offset), y_offset + self.display_height)
+                corners.append(self.display_to_image_coords(x, y))
             
-            # Adjust click coordinates
-            click_x = event.x - x_offset
-            click_y = event.y - y_offset
+            (x0, y0), (x1, y1) = corners
+            bounds = (min(x0, x1), min(y0, y1), max(x0, x1) + 1, max(y0, y1) + 1)
+            rgb_color = self.current_image.sample(self.sampling_region, bounds=bounds,
+                                                  statistic=self.sampling_statistic)
             
-            # Check if click is within the actual image bounds
-            if 0 <= click_x <= self.display_width and 0 <= click_y <= self.display_height:
-                # Convert to original image coordinates
-                orig_x = int(click_x * scale_x)
-                orig_y = int(click_y * scale_y)
-                
-                # Ensure coordinates are within bounds
-                orig_x = max(0, min(orig_x, self.original_width - 1))
-                orig_y = max(0, min(orig_y, self.original_height - 1))
+            self.update_color_info(rgb_color, force=True)
+            self.status_var.set(f"Color detected in region ({bounds[0]}, {bounds[1]}) - "
+                                f"({bounds[2] - 1}, {bounds[3] - 1})")
+        
+        except Exception as e:
+            logger.exception("Error in region detection: %s", e)
+            self.status_var.set("Error detecting color in selected region")
+    
+    def on_image_click(self, event):
+        if self.current_image is None or self.is_camera_running:
+            return
+        
+        try:
+            coords = self.display_to_image_coords(event.x, event.y)
+            if coords is not None:
+                orig_x, orig_y = coords
                 
-                # Get BGR color and convert to RGB
-                bgr_color = self.current_image[orig_y, orig_x]
-                rgb_color = tuple(reversed(bgr_color))
+                # Sample the configured region around the click (RGB)
+                region = self.sampling_region
+                if region.kind == 'rect':
+                    region = self.backend.SAMPLING_PRESETS['Single pixel']
+                with self.timed('sample'):
+                    rgb_color = self.current_image.sample(region, orig_x, orig_y,
+                                                          statistic=self.sampling_statistic)
                 
-                # Update color information
-                self.update_color_info(rgb_color)
+                # Update color information (clicks always refresh)
+                with self.timed('name'):
+                    self.update_color_info(rgb_color, force=True)
                 self.status_var.set(f"Color detected at ({orig_x}, {orig_y})")
             
         except Exception as e:
-            print(f"Error in click detection: {e}")
+            logger.exception("Error in click detection: %s", e)
             self.status_var.set("Error detecting color at clicked position")
     
-    def update_color_info(self, rgb_color):
+    def update_color_info(self, rgb_color, force=False):
+        """Show a sampled color; re-rendering is skipped when it barely differs from the last one"""
+        # Capture and tracking always act on the latest reading, even when
+        # the labels still show a color within the update threshold
         self.current_color = rgb_color
-        r, g, b = rgb_color
+        if not self.color_updates.should_update(rgb_color, force=force):
+            return
         
-        print(f"Updating color info: RGB({r}, {g}, {b})")  # Debug
+        r, g, b = rgb_color
         
-        # Update color preview
-        hex_color = f"#{r:02x}{g:02x}{b:02x}"
-        self.color_preview.config(bg=hex_color)
+        logger.debug("Updating color info: RGB(%d, %d, %d)", r, g, b)
         
-        # Get color name
-        color_name = self.get_color_name(rgb_color)
-        print(f"Color name: {color_name}")  # Debug
+        # Name, hex and HSL come from the cache
+        info = self.color_info.lookup(rgb_color)
+        logger.debug("Color name: %s", info.name)
         
-        # Convert to HSL
-        hsl = colorsys.rgb_to_hls(r/255, g/255, b/255)
-        h, s, l = int(hsl[0]*360), int(hsl[1]*100), int(hsl[2]*100)
+        # Update color preview
+        self.color_preview.config(bg=info.hex)
         
         # Update labels
-        self.color_name_var.set(f"Color Name: {color_name}")
+        h, s, l = info.hsl
+        self.color_name_var.set(f"Color Name: {info.name}")
         self.rgb_var.set(f"RGB: ({r}, {g}, {b})")
-        self.hex_var.set(f"HEX: {hex_color.upper()}")
+        self.hex_var.set(f"HEX: {info.hex.upper()}")
         self.hsl_var.set(f"HSL: ({h}°, {s}%, {l}%)")
     
     def get_color_name(self, rgb_color):
         """Get color name using a simple color mapping approach"""
-        try:
-            # Try webcolors first
-            color_name = webcolors.rgb_to_name(rgb_color)
-            return color_name.title()
-        except ValueError:
-            # If webcolors fails, use our own color mapping
-            return self.get_closest_color_name(rgb_color)
+        # The cache wraps the perceptual palette matcher when one is set,
+        # otherwise the lookup cube (webcolors exact names and the closest
+        # basic color for every other RGB value)
+        return self.color_info.lookup(rgb_color).name
     
     def get_closest_color_name(self, rgb_color):
         """Find closest color name using basic color definitions"""
-        r, g, b = rgb_color
+        return self.color_namer.name(rgb_color)
+    
+    def extract_palette_colors(self, n_colors=5):
+        """Show the dominant colors of the loaded image"""
+        if self.current_image is None:
+            messagebox.showwarning("Warning", "Load an image first!")
+            return
+        
+        # A strided full-resolution subsample is all k-means needs
+        palette = self.backend.extract_palette(self.current_image.subsample(), n_colors, bgr=True,
+                                               namer=self.color_info)
+        
+        for widget in self.palette_container.winfo_children():
+            widget.destroy()
         
-        # Define basic colors
-        color_map = {
-            'Red': (255, 0, 0),
-            'Green': (0, 255, 0),
-            'Blue': (0, 0, 255),
-            'Yellow': (255, 255, 0),
-            'Orange': (255, 165, 0),
-            'Purple': (128, 0, 128),
-            'Pink': (255, 192, 203),
-            'Brown': (165, 42, 42),
-            'Gray': (128, 128, 128),
-            'Black': (0, 0, 0),
-            'White': (255, 255, 255),
-            'Cyan': (0, 255, 255),
-            'Magenta': (255, 0, 255),
-            'Navy': (0, 0, 128),
-            'Maroon': (128, 0, 0),
-            'Olive': (128, 128, 0),
-            'Lime': (0, 255, 0),
-            'Aqua': (0, 255, 255),
-            'Silver': (192, 192, 192),
-            'Teal': (0, 128, 128),
-            'Fuchsia': (255, 0, 255),
-            'Gold': (255, 215, 0),
-            'Indigo': (75, 0, 130),
-            'Violet': (238, 130, 238),
-            'Turquoise': (64, 224, 208),
-            'Coral': (255, 127, 80),
-            'Salmon': (250, 128, 114),
-            'Khaki': (240, 230, 140),
-            'Crimson': (220, 20, 60)
-        }
-        
-        min_distance = float('inf')
-        closest_color = 'Unknown'
-        
-        for color_name, (cr, cg, cb) in color_map.items():
-            # Calculate Euclidean distance
-            distance = ((r - cr) ** 2 + (g - cg) ** 2 + (b - cb) ** 2) ** 0.5
-            if distance < min_distance:
-                min_distance = distance
-                closest_color = color_name
-        
-        return closest_color
+        for color in palette:
+            row = tk.Frame(self.palette_container, bg='#f0f0f0')
+            row.pack(fill=tk.X, pady=1)
+            tk.Label(row, text="", width=3, bg=color['hex'], relief=tk.RAISED).pack(side=tk.LEFT)
+            tk.Label(row, text=f"{color['name']} {color['hex'].upper()} {color['share'] * 100:.0f}%",
+                    font=('Arial', 9), bg='#f0f0f0', anchor='w').pack(side=tk.LEFT, padx=5)
+        
+        self.status_var.set(f"Extracted {len(palette)} dominant colors")
     
     def capture_current_color(self):
         if self.current_color is None:
             messagebox.showwarning("Warning", "No color detected!")
             return
         
+        if self.is_camera_running and self.wait_stable_var.get() and not self.reading_stable:
+            self.status_var.set("Waiting for a stable reading...")
+            self.capture_color_btn.config(state=tk.DISABLED)
+            self.root.after(50, self.capture_when_stable, STABLE_CAPTURE_TIMEOUT_MS - 50)
+            return
+        
+        self.record_current_color()
+    
+    def capture_when_stable(self, remaining_ms):
+        """Poll until the camera reading settles (or time runs out), then capture"""
+        if not self.is_camera_running:
+            return
+        
+        if self.reading_stable or remaining_ms <= 0:
+            self.capture_color_btn.config(state=tk.NORMAL)
+            self.record_current_color()
+            if remaining_ms <= 0:
+                self.status_var.set(self.status_var.get() + " (reading was not stable)")
+            return
+        
+        self.root.after(50, self.capture_when_stable, remaining_ms - 50)
+    
+    def record_current_color(self):
         r, g, b = self.current_color
         hex_color = f"#{r:02x}{g:02x}{b:02x}"
         color_name = self.get_color_name(self.current_color)
         
-        print(f"Capturing color: {color_name} - RGB{self.current_color} - {hex_color}")  # Debug
+        logger.debug("Capturing color: %s - RGB%s - %s", color_name, self.current_color, hex_color)
         
-        # Add to history
-        color_info = {
-            'rgb': self.current_color,
-            'hex': hex_color,
-            'name': color_name
-        }
-        
-        self.color_history.append(color_info)
+        # Add to history (near-identical captures only bump the existing entry)
+        entry, is_new = self.color_history.add(self.current_color, color_name)
         self.update_color_history()
         
-        self.status_var.set(f"Captured: {color_name} ({hex_color}) - Total: {len(self.color_history)}")
+        if is_new:
+            self.status_var.set(f"Captured: {color_name} ({hex_color}) - Total: {len(self.color_history)}")
+        else:
+            self.status_var.set(f"Already captured: {entry['name']} ({entry['hex']}) x{entry['count']}")
     
     def update_color_history(self):
-        """Update the color history display"""
-        self.history_text.config(state=tk.NORMAL)
-        
-        # Clear and add header if this is the first color
-        if len(self.color_history) == 1:
-            self.history_text.delete(1.0, tk.END)
-            self.history_text.insert(tk.END, "🎨 Captured Colors:\n" + "="*25 + "\n\n")
-        
-        # Add the latest color
-        if self.color_history:
-            latest_color = self.color_history[-1]
-            color_text = f"#{len(self.color_history):02d} {latest_color['name']}\n"
-            color_text += f"HEX: {latest_color['hex']}\n"
-            r, g, b = latest_color['rgb']
-            color_text += f"RGB: ({r}, {g}, {b})\n"
-            color_text += "-" * 20 + "\n\n"
-            
-            self.history_text.insert(tk.END, color_text)
-            
-            # Scroll to bottom
-            self.history_text.see(tk.END)
+        """Refresh the history view and the Track selector"""
+        self.history_view.refresh()
+        self.track_choices = self.color_history.recent(TRACK_CHOICES)
+        self.track_combo['values'] = ['Off'] + [f"{c['name']} {c['hex']}" for c in self.track_choices]
+        logger.debug("Color history updated. Total colors: %d", len(self.color_history))
+    
+    def on_history_selected(self, entry):
+        """Show a clicked history entry in the color information panel"""
+        self.update_color_info(entry['rgb'], force=True)
+        self.status_var.set(f"History: {entry['name']} ({entry['hex']})")
+    
+    def export_history(self):
+        if not len(self.color_history):
+            messagebox.showwarning("Warning", "No captured colors to export!")
+            return
+        
+        file_path = filedialog.asksaveasfilename(
+            title="Export Color History",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON", "*.json"), ("GIMP palette", "*.gpl"),
+                       ("Adobe Swatch Exchange", "*.ase")]
+        )
+        if not file_path:
+            return
         
-        self.history_text.config(state=tk.DISABLED)
-        print(f"Color history updated. Total colors: {len(self.color_history)}")  # Debug
+        try:
+            self.color_history.export(file_path)
+            self.status_var.set(f"Exported {len(self.color_history)} colors to {file_path}")
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to export history: {str(e)}")
+    
+    def clear_history(self):
+        if len(self.color_history) and messagebox.askyesno("Clear History", "Remove all captured colors?"):
+            self.color_history.clear()
+            self.update_color_history()
+            self.status_var.set("Color history cleared")
     
     def __del__(self):
-        if self.cap:
-            self.cap.release()
+        self.release_camera()
 
 def main():
+    parser = argparse.ArgumentParser(description="Python Color Detection Tool")
+    parser.add_argument('--source', default='0',
+                        help="Frame source for camera mode: webcam index, video file, "
+                             "image folder/glob or 'synthetic[:WxH]' (default: 0)")
+    parser.add_argument('--debug', action='store_true', help="Show per-update debug output")
+    parser.add_argument('--history', metavar='PATH',
+                        help="Color history database (default: history.sqlite3 in the cache directory)")
+    parser.add_argument('--history-size', type=int,
+                        help="Captured colors kept before the oldest are evicted (default: 1000)")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Time each pipeline stage and show FPS/latency in a metrics bar")
+    parser.add_argument('--metrics-out', metavar='PATH',
+                        help="Also write metrics every second: JSON, or Prometheus text for .prom/.txt "
+                             "(implies --metrics)")
+    parser.add_argument('--palette', metavar='{css3,css4,xkcd,PATH.csv}',
+                        help="Name colors perceptually (CIEDE2000) against this palette: css3, css4, "
+                             "xkcd (needs matplotlib) or a name,#hex / name,r,g,b file")
+    parser.add_argument('--start-camera', action='store_true', help="Start the camera as soon as it can")
+    parser.add_argument('--startup-report', metavar='PATH',
+                        help="Write time to first window / first frame (ms) as JSON, then quit")
+    args = parser.parse_args()
+    # Named palettes are perceptual.named_palette's (not imported before the window is up)
+    if args.palette and args.palette not in ('css3', 'css4', 'xkcd') and not os.path.isfile(args.palette):
+        parser.error(f"--palette: no such palette or file: {args.palette}")
+    
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING,
+                        format='%(levelname)s %(name)s: %(message)s')
+    
     # Check if required packages are installed
     required_packages = {
         'cv2': 'opencv-python',
+        'numpy': 'numpy',
         'PIL': 'pillow',
         'webcolors': 'webcolors'
     }
     
-    missing_packages = []
-    for package, pip_name in required_packages.items():
-        try:
-            __import__(package)
-        except ImportError:
-            missing_packages.append(pip_name)
+    # find_spec locates a package without importing it (the window comes
+    # up first; the packages themselves load in the background)
+    missing_packages = [pip_name for package, pip_name in required_packages.items()
+                        if importlib.util.find_spec(package) is None]
     
     if missing_packages:
         print("❌ Missing required packages!")
@@ -493,14 +1005,27 @@ def main():
     print("🚀 Starting Color Detection App...")
     
     root = tk.Tk()
-    app = ColorDetectionApp(root)
+    metrics = None
+    if args.metrics or args.metrics_out:
+        from metrics import PipelineMetrics
+        metrics = PipelineMetrics()
+    app = ColorDetectionApp(root, source=args.source, metrics=metrics, metrics_path=args.metrics_out,
+                            history_path=args.history, history_size=args.history_size,
+                            autostart_camera=args.start_camera, startup_report=args.startup_report,
+                            palette=args.palette)
     
     # Handle window closing
     def on_closing():
         print("Closing application...")
         app.is_camera_running = False
-        if app.cap:
-            app.cap.release()
+        app.release_camera()
+        if app.metrics is not None and app.metrics_path:
+            try:
+                app.metrics.export(app.metrics_path)
+            except OSError as e:
+                logger.warning("Could not write metrics to %s: %s", app.metrics_path, e)
+        if app.color_history is not None:
+            app.color_history.close()
         root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
@@ -510,6 +1035,11 @@ def main():
     except KeyboardInterrupt:
         print("\n🛑 Application interrupted by user")
         on_closing()
+        return
+    
+    if args.startup_report:
+        # finish_startup_report() left the main loop
+        on_closing()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+"""Headless batch color analysis for directories of images.
+
+Usage:
+    python batch_cli.py photos/ "scans/**/*.png" --format csv -o colors.csv
+
+Never imports tkinter, so it runs on servers without a display.
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from color_lut import ColorLUT
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.tif', '.webp')
+
+CSV_FIELDS = ['path', 'width', 'height', 'rank', 'name', 'hex', 'share', 'error']
+
+# Reduced decoders OpenCV offers, largest reduction first
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# Per-worker state, set by _init_worker
+_lut = None
+
+
+def find_images(patterns, recursive=True):
+    """Expand directories and glob patterns into a sorted list of image paths"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            if recursive:
+                for dirpath, _, filenames in os.walk(pattern):
+                    paths.extend(os.path.join(dirpath, name) for name in filenames)
+            else:
+                paths.extend(os.path.join(pattern, name) for name in os.listdir(pattern))
+        else:
+            paths.extend(glob.glob(pattern, recursive=True))
+
+    return sorted(p for p in set(paths)
+                  if p.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(p))
+
+
+def load_image(path, max_side=None):
+    """Decode an image as BGR, using a reduced-resolution decode when possible.
+
+    Returns (image, (original_width, original_height)).
+    """
+    with Image.open(path) as header:
+        # Only the header is read here; pixels are decoded by OpenCV below
+        width, height = header.size
+
+    flag = cv2.IMREAD_COLOR
+    if max_side:
+        for factor, reduced_flag in _REDUCED_FLAGS:
+            if max(width, height) // factor >= max_side:
+                flag = reduced_flag
+                break
+
+    image = cv2.imread(path, flag)
+    if image is None:
+        raise ValueError("Failed to load image")
+
+    if max_side and max(image.shape[:2]) > max_side:
+        scale = max_side / max(image.shape[:2])
+        size = (max(1, round(image.shape[1] * scale)), max(1, round(image.shape[0] * scale)))
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    return image, (width, height)
+
+
+def named_color_histogram(image, lut, top=5, bgr=True):
+    """Return the `top` named colors of an image with their pixel share and mean color"""
+    labels = lut.label(image, bgr=bgr).ravel()
+    pixels = image.reshape(-1, 3)
+    channels = (2, 1, 0) if bgr else (0, 1, 2)
+
+    minlength = len(lut.names)
+    counts = np.bincount(labels, minlength=minlength)
+    # Per-name channel sums in one pass each, instead of masking per name
+    sums = np.stack([np.bincount(labels, weights=pixels[:, c], minlength=minlength)
+                     for c in channels], axis=1)
+    total = counts.sum()
+
+    colors = []
+    for index in np.argsort(counts)[::-1][:top]:
+        if counts[index] == 0:
+            break
+        r, g, b = (int(round(v)) for v in sums[index] / counts[index])
+        colors.append({
+            'name': lut.names[index],
+            'hex': f"#{r:02x}{g:02x}{b:02x}",
+            'share': round(float(counts[index]) / total, 4),
+        })
+    return colors
+
+
+def _init_worker(bits, cache_dir):
+    global _lut
+    # Parallelism comes from the worker processes; OpenCV's own thread pool
+    # in each of them would only oversubscribe the cores
+    cv2.setNumThreads(1)
+    # The cube is memory-mapped, so every worker shares the same pages
+    _lut = ColorLUT.load_or_build(bits=bits, cache_dir=cache_dir)
+
+
+def analyze_image(path, max_side=512, top=5):
+    """Analyze one image; errors are reported in the result instead of raised"""
+    try:
+        image, (width, height) = load_image(path, max_side)
+        return {
+            'path': path,
+            'width': width,
+            'height': height,
+            'colors': named_color_histogram(image, _lut, top),
+        }
+    except Exception as e:
+        return {'path': path, 'error': str(e)}
+
+
+def _analyze_star(args):
+    return analyze_image(*args)
+
+
+class ResultWriter:
+    """Stream results as JSON lines or CSV rows (one row per named color)"""
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.csv_writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, result):
+        if self.fmt == 'jsonl':
+            self.stream.write(json.dumps(result) + '\n')
+            return
+
+        base = {'path': result['path'], 'width': result.get('width'), 'height': result.get('height')}
+        if 'error' in result:
+            self.csv_writer.writerow({**base, 'error': result['error']})
+            return
+        for rank, color in enumerate(result['colors'], start=1):
+            self.csv_writer.writerow({**base, 'rank': rank, **color})
+
+
+def run_batch(paths, output, fmt='jsonl', workers=None, max_side=512, top=5,
+              bits=8, cache_dir=None, chunksize=16):
+    """Analyze `paths` in a process pool and stream results to `output`.
+
+    Returns (images processed, errors, elapsed seconds).
+    """
+    # Build (or validate) the cache once so workers only ever memory-map it
+    ColorLUT.load_or_build(bits=bits, cache_dir=cache_dir)
+
+    writer = ResultWriter(output, fmt)
+    processed = errors = 0
+    start = time.perf_counter()
+    jobs = ((path, max_side, top) for path in paths)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(bits, cache_dir)) as executor:
+        for result in executor.map(_analyze_star, jobs, chunksize=chunksize):
+            writer.write(result)
+            processed += 1
+            if 'error' in result:
+                errors += 1
+            if processed % 500 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"  {processed}/{len(paths)} images - {processed / elapsed:.1f} images/sec",
+                      file=sys.stderr)
+
+    return processed, errors, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Name and analyze the colors of many images")
+    parser.add_argument('inputs', nargs='+', help="Image files, directories or glob patterns")
+    parser.add_argument('-o', '--output', help="Output file (default: stdout)")
+    parser.add_argument('-f', '--format', choices=('jsonl', 'csv'), default='jsonl')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument('--top', type=int, default=5, help="Named colors reported per image")
+    parser.add_argument('--max-side', type=int, default=512,
+                        help="Downscale images to this longest side before analysis (0 = full size)")
+    parser.add_argument('--bits', type=int, default=8, help="Lookup cube resolution in bits per channel")
+    parser.add_argument('--no-recursive', action='store_true', help="Do not descend into subdirectories")
+    args = parser.parse_args(argv)
+
+    paths = find_images(args.inputs, recursive=not args.no_recursive)
+    if not paths:
+        print("❌ No images found", file=sys.stderr)
+        return 1
+
+    print(f"🔍 Analyzing {len(paths)} images...", file=sys.stderr)
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        processed, errors, elapsed = run_batch(paths, output, args.format, args.workers,
+                                               args.max_side or None, args.top, args.bits)
+    finally:
+        if args.output:
+            output.close()
+
+    rate = processed / elapsed if elapsed else 0.0
+    print(f"✅ {processed} images in {elapsed:.2f}s ({rate:.1f} images/sec), {errors} errors",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+"""Micro-benchmarks for the color detection pipeline.
+
+Usage:
+    python benchmarks.py palette
+    python benchmarks.py display
+    python benchmarks.py startup
+    python benchmarks.py batch --max-workers 8
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from batch_cli import run_batch
+from color_lut import ColorLUT
+from display import DisplayRenderer, fit_size
+from palette import extract_palette
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Color_Detection_Tool.py')
+
+# Measured in a fresh interpreter when the app cannot open a window
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import Color_Detection_Tool as app
+imported = time.perf_counter()
+app.load_backend()
+done = time.perf_counter()
+json.dump({'import_ms': (imported - start) * 1000, 'backend_ms': (done - imported) * 1000}, sys.stdout)
+"""
+
+# (label, width, height)
+IMAGE_SIZES = [
+    ('1 MP', 1280, 800),
+    ('4 MP', 2560, 1600),
+    ('12 MP', 4000, 3000),
+    ('24 MP', 6000, 4000),
+]
+
+
+def synthetic_image(width, height, seed=0):
+    """A blocky multi-color BGR test image with mild noise"""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+    image = np.repeat(np.repeat(blocks, height // 8 + 1, axis=0), width // 8 + 1, axis=1)[:height, :width]
+    noise = rng.integers(-8, 9, (height, 1, 3), dtype=np.int16)
+    return np.clip(image + noise, 0, 255).astype(np.uint8)
+
+
+def best_of(func, repeat=5):
+    """Best wall-clock time of `repeat` calls, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_palette(args):
+    print(f"{'Image':>8} {'k-means':>12} {'median cut':>12}")
+    for label, width, height in IMAGE_SIZES:
+        image = synthetic_image(width, height)
+        kmeans = best_of(lambda: extract_palette(image, args.colors, 'kmeans'), args.repeat)
+        median = best_of(lambda: extract_palette(image, args.colors, 'median_cut'), args.repeat)
+        print(f"{label:>8} {kmeans * 1000:>9.1f} ms {median * 1000:>9.1f} ms")
+
+
+def _open_tk():
+    """Hidden Tk root for PhotoImage benchmarks, or None without a display"""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        return root
+    except Exception:
+        return None
+
+
+def bench_display(args):
+    frame = synthetic_image(args.width, args.height)
+    root = _open_tk()
+    if root is None:
+        print("No display available - PhotoImage creation/paste is not included\n")
+    else:
+        import tkinter as tk
+        from PIL import ImageTk
+        label = tk.Label(root)
+
+    def old_path():
+        # cvtColor on the full frame, PIL LANCZOS resize, new PhotoImage per frame
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        pil_image = Image.fromarray(rgb_frame)
+        size = fit_size(pil_image.width, pil_image.height, 630, 480)
+        pil_image = pil_image.resize(size, Image.Resampling.LANCZOS)
+        if root is not None:
+            photo = ImageTk.PhotoImage(pil_image)
+            label.config(image=photo)
+            label.image = photo
+
+    renderer = DisplayRenderer(630, 480)
+
+    def new_path():
+        rgb_small = renderer.prepare(frame)
+        if root is not None:
+            renderer.show(label, rgb_small)
+
+    print(f"Frame {args.width}x{args.height} -> display 630x480, {args.frames} frames")
+    paths = (('old (LANCZOS + new PhotoImage)', old_path),
+             ('new (cv2 + reused PhotoImage)', new_path))
+    for name, func in paths:
+        func()  # warm up
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for _ in range(args.frames):
+            func()
+        cpu = (time.process_time() - cpu_start) / args.frames
+        wall = (time.perf_counter() - wall_start) / args.frames
+        print(f"  {name:<32} {wall * 1000:7.2f} ms/frame wall {cpu * 1000:7.2f} ms/frame CPU")
+
+    full = frame.nbytes
+    small = 3 * np.prod(fit_size(args.width, args.height, 630, 480))
+    print(f"  Per-frame buffers: old allocates {full + small:,} bytes plus a PhotoImage, "
+          f"new allocates {small:,} bytes")
+
+    if root is not None:
+        root.destroy()
+
+
+def _run_app_startup(source, timeout):
+    """One app launch with --startup-report; returns (report, wall seconds) or None"""
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = os.path.join(tmp, 'startup.json')
+        command = [sys.executable, APP_SCRIPT, '--source', source, '--start-camera',
+                   '--history', os.path.join(tmp, 'history.sqlite3'), '--startup-report', report_path]
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(command, capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return None
+        wall = time.perf_counter() - start
+        if result.returncode != 0 or not os.path.exists(report_path):
+            return None
+        with open(report_path, encoding='utf-8') as f:
+            return json.load(f), wall
+
+
+def bench_startup(args):
+    runs = [_run_app_startup(args.source, args.timeout) for _ in range(args.repeat)]
+    if all(run is not None for run in runs):
+        print(f"{'':>16} {'best':>10} {'median':>10}")
+        for key, label in (('window_ms', 'first window'), ('backend_ms', 'backend loaded'),
+                           ('first_frame_ms', 'first frame')):
+            values = [report[key] for report, _ in runs]
+            print(f"{label:>16} {min(values):>7.0f} ms {np.median(values):>7.0f} ms")
+        walls = [wall * 1000 for _, wall in runs]
+        print(f"{'process total':>16} {min(walls):>7.0f} ms {np.median(walls):>7.0f} ms")
+        return
+
+    # No display (or no camera): time what stands between launch and the window
+    print("Could not launch the app (no display or frame source) - timing imports only\n")
+    print(f"{'':>16} {'best':>10} {'median':>10}")
+    probes = []
+    for _ in range(args.repeat):
+        output = subprocess.run([sys.executable, '-c', _IMPORT_PROBE], capture_output=True, check=True,
+                                cwd=os.path.dirname(APP_SCRIPT), text=True).stdout
+        probes.append(json.loads(output))
+    for key, label in (('import_ms', 'before window'), ('backend_ms', 'backend load')):
+        values = [probe[key] for probe in probes]
+        print(f"{label:>16} {min(values):>7.0f} ms {np.median(values):>7.0f} ms")
+
+
+def bench_batch(args):
+    max_workers = args.max_workers or os.cpu_count() or 1
+    ColorLUT.load_or_build()  # keep a one-time cube build out of the first timing
+    with tempfile.TemporaryDirectory() as tmp:
+        # A fixed corpus of distinct JPEGs, written once and reused for every worker count
+        paths = []
+        for i in range(args.images):
+            path = os.path.join(tmp, f'image_{i:04d}.jpg')
+            cv2.imwrite(path, synthetic_image(args.width, args.height, seed=i))
+            paths.append(path)
+
+        print(f"{args.images} JPEGs of {args.width}x{args.height}, analyzed at --max-side 512 "
+              f"on {os.cpu_count()} CPUs")
+        print(f"{'Workers':>8} {'time':>10} {'images/sec':>12} {'speedup':>9}")
+        baseline = None
+        for workers in range(1, max_workers + 1):
+            def run():
+                with open(os.devnull, 'w', encoding='utf-8') as sink:
+                    run_batch(paths, sink, workers=workers)
+            elapsed = best_of(run, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>8.2f} s {args.images / elapsed:>12.1f} {baseline / elapsed:>8.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Color detection micro-benchmarks")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement (best is reported)")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    palette_parser = subparsers.add_parser('palette', help="Palette extraction time vs image size")
+    palette_parser.add_argument('--colors', type=int, default=5)
+    palette_parser.set_defaults(func=bench_palette)
+
+    display_parser = subparsers.add_parser('display', help="Per-frame display path, old vs new")
+    display_parser.add_argument('--width', type=int, default=1920)
+    display_parser.add_argument('--height', type=int, default=1080)
+    display_parser.add_argument('--frames', type=int, default=200)
+    display_parser.set_defaults(func=bench_display)
+
+    startup_parser = subparsers.add_parser('startup', help="Time to first window and first camera frame")
+    startup_parser.add_argument('--source', default='synthetic',
+                                help="Frame source for the first frame (default: synthetic)")
+    startup_parser.add_argument('--timeout', type=float, default=60.0, help="Seconds before a launch is abandoned")
+    startup_parser.set_defaults(func=bench_startup)
+
+    batch_parser = subparsers.add_parser('batch', help="Batch CLI throughput vs worker count")
+    batch_parser.add_argument('--max-workers', type=int, default=None,
+                              help="Measure 1..N worker processes (default: CPU count)")
+    batch_parser.add_argument('--images', type=int, default=200, help="Images in the corpus")
+    batch_parser.add_argument('--width', type=int, default=1600)
+    batch_parser.add_argument('--height', type=int, default=1200)
+    batch_parser.set_defaults(func=bench_batch)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
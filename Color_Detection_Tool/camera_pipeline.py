@@ -0,0 +1,135 @@
+"""Staged capture -> processing pipeline connected by bounded, drop-old queues"""
+
+import queue
+import threading
+
+
+class DropOldQueue:
+    """Bounded queue that discards the oldest item instead of blocking the producer.
+
+    With maxsize=1 it always holds only the latest item, so a slow consumer
+    never builds up a backlog of stale frames.
+    """
+
+    def __init__(self, maxsize=1):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._lock:
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def get(self, timeout=None):
+        """Block for the next item; raises queue.Empty on timeout"""
+        return self._queue.get(timeout=timeout)
+
+    def get_nowait(self):
+        """Return the next item or None"""
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+
+class FramePipeline:
+    """Capture thread -> processing thread -> result queue polled by the UI.
+
+    `read_frame()` returns (ok, frame) like cv2.VideoCapture.read, and
+    `process(frame)` returns any result object. Neither callable may touch
+    Tk widgets; the UI fetches results with poll() from its own thread
+    (e.g. via root.after). `on_capture_exit` (e.g. the source's release)
+    runs on the capture thread once it has stopped reading, so the device
+    is never released under a read() still in progress.
+    """
+
+    def __init__(self, read_frame, process, queue_size=1, on_capture_exit=None):
+        self.read_frame = read_frame
+        self.process = process
+        self.on_capture_exit = on_capture_exit
+        self.frames = DropOldQueue(queue_size)
+        self.results = DropOldQueue(queue_size)
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.error = None
+        self._stop_event = threading.Event()
+        self._capture_done = threading.Event()
+        self._threads = []
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self._threads)
+
+    @property
+    def finished(self):
+        """True once the processing thread has exited; its last result, if any, is queued"""
+        return bool(self._threads) and not self._threads[-1].is_alive()
+
+    @property
+    def frames_dropped(self):
+        return self.frames.dropped + self.results.dropped
+
+    def start(self):
+        self._stop_event.clear()
+        self._capture_done.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="frame-capture", daemon=True),
+            threading.Thread(target=self._process_loop, name="frame-process", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=1.0):
+        """Signal the threads to stop and wait up to `timeout` each; True if they all exited"""
+        self._stop_event.set()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+        return not self.running
+
+    def poll(self):
+        """Latest processed result, or None if nothing new arrived"""
+        return self.results.get_nowait()
+
+    def _capture_loop(self):
+        try:
+            while not self._stop_event.is_set():
+                ret, frame = self.read_frame()
+                if not ret:
+                    self.error = "Camera stopped delivering frames"
+                    break
+                self.frames_captured += 1
+                self.frames.put(frame)
+        except Exception as e:
+            self.error = f"Capture failed: {e}"
+        finally:
+            if self.on_capture_exit is not None:
+                try:
+                    self.on_capture_exit()
+                except Exception as e:
+                    self.error = self.error or f"Releasing the source failed: {e}"
+            self._capture_done.set()
+
+    def _process_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                frame = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                if self._capture_done.is_set():
+                    break
+                continue
+            try:
+                self.results.put(self.process(frame))
+                self.frames_processed += 1
+            except Exception as e:
+                self.error = f"Processing failed: {e}"
+                break
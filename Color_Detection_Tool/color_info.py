@@ -0,0 +1,96 @@
+"""Memoized per-color derived values (name, hex, HSL, HSV) with LRU eviction"""
+
+import colorsys
+from collections import OrderedDict, namedtuple
+
+# Distinct colors remembered by default (a few hundred bytes each)
+DEFAULT_CACHE_SIZE = 4096
+
+# hsl: (hue degrees, saturation %, lightness %); hsv: (hue degrees, saturation %, value %)
+ColorInfo = namedtuple('ColorInfo', ['rgb', 'hex', 'name', 'hsl', 'hsv'])
+
+
+def pack_rgb(rgb_color):
+    """24-bit integer key for an RGB triple"""
+    r, g, b = rgb_color
+    return (int(r) << 16) | (int(g) << 8) | int(b)
+
+
+def rgb_to_hsl(rgb_color):
+    """(hue degrees, saturation %, lightness %) as integers"""
+    r, g, b = rgb_color
+    # colorsys orders the result hue, lightness, saturation
+    h, l, s = colorsys.rgb_to_hls(r / 255, g / 255, b / 255)
+    return int(h * 360), int(s * 100), int(l * 100)
+
+
+def rgb_to_hsv(rgb_color):
+    """(hue degrees, saturation %, value %) as integers"""
+    r, g, b = rgb_color
+    h, s, v = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+    return int(h * 360), int(s * 100), int(v * 100)
+
+
+class ColorInfoCache:
+    """Bounded cache of ColorInfo keyed by packed 24-bit RGB.
+
+    `namer` is anything with name(rgb) (ColorLUT, ColorNamer,
+    PerceptualMatcher). Up to `max_size` colors are kept; the least recently
+    used is evicted first. `hits`, `misses` and `evictions` count lookups.
+    The cache also has name(rgb), so it can stand in for its namer.
+    """
+
+    def __init__(self, namer, max_size=DEFAULT_CACHE_SIZE):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.namer = namer
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, rgb_color):
+        """ColorInfo for an RGB color, computed once per distinct color"""
+        key = pack_rgb(rgb_color)
+        entries = self._entries
+        info = entries.get(key)
+        if info is not None:
+            entries.move_to_end(key)
+            self.hits += 1
+            return info
+
+        self.misses += 1
+        rgb = (key >> 16, (key >> 8) & 0xFF, key & 0xFF)
+        info = ColorInfo(rgb, f"#{key:06x}", self.namer.name(rgb), rgb_to_hsl(rgb), rgb_to_hsv(rgb))
+        entries[key] = info
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return info
+
+    def name(self, rgb_color):
+        return self.lookup(rgb_color).name
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hit_rate, 4),
+        }
+
+    def clear(self):
+        """Drop all entries (e.g. after the namer changes) and reset the counters"""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
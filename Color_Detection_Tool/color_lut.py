@@ -0,0 +1,178 @@
+"""Precomputed RGB -> color name lookup cube with an on-disk cache"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+from color_names import BASIC_COLORS, ColorNamer, css3_colors
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cube layout or build rules change so old caches are ignored
+LUT_FORMAT_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'color_detection_tool')
+
+
+def default_cache_dir():
+    """Cache directory, overridable with COLOR_DETECTION_CACHE_DIR"""
+    return os.environ.get('COLOR_DETECTION_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+
+class ColorLUT:
+    """Quantized RGB cube of palette indices.
+
+    The cube has 2**bits cells per channel: bits=8 is the full 256**3 cube
+    (16 MB as uint8) and reproduces get_color_name exactly, smaller values
+    (e.g. bits=5 -> 32**3, 32 KB) trade accuracy for memory. Naming a pixel or
+    a whole frame is a single fancy-index into the cube.
+    """
+
+    def __init__(self, cube, names, bits, colors=None):
+        self.cube = cube
+        self.names = list(names)
+        self.bits = bits
+        self.shift = 8 - bits
+        # Representative RGB color per name (used for overlays), if known
+        self.colors = None if colors is None else np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        # Flat view for the packed-index fast path (full-resolution cubes only)
+        self._flat_cube = np.asarray(cube).reshape(-1) if bits == 8 else None
+
+    @staticmethod
+    def name_colors(names, basic_colors, exact_colors):
+        """RGB color for each entry of a names table"""
+        # Basic colors win: most pixels carrying a shared name got it as the nearest basic color
+        lookup = {**exact_colors, **basic_colors}
+        return [lookup[name] for name in names]
+
+    @staticmethod
+    def palette_key(bits, basic_colors, exact_colors):
+        """Hash of everything the cube contents depend on"""
+        payload = json.dumps({
+            'version': LUT_FORMAT_VERSION,
+            'bits': bits,
+            'basic': sorted((name, list(rgb)) for name, rgb in basic_colors.items()),
+            'exact': sorted((name, list(rgb)) for name, rgb in exact_colors.items()),
+        })
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def build(cls, bits=8, basic_colors=None, exact_colors=None):
+        """Build the cube in memory.
+
+        Every cell gets the nearest `basic_colors` entry (measured at the cell
+        centre). At bits=8 the `exact_colors` (CSS3 names by default) then
+        overwrite their own cells, mirroring the webcolors-first lookup.
+        """
+        if not 1 <= bits <= 8:
+            raise ValueError(f"bits must be between 1 and 8, got {bits}")
+        if basic_colors is None:
+            basic_colors = BASIC_COLORS
+        if exact_colors is None:
+            exact_colors = css3_colors()
+
+        names = list(dict.fromkeys(list(basic_colors) + list(exact_colors)))
+        dtype = np.uint8 if len(names) <= 256 else np.uint16
+
+        size = 1 << bits
+        step = 256 / size
+        centers = (np.arange(size) * step + (step - 1) / 2).astype(np.float32)
+        namer = ColorNamer(basic_colors)
+
+        # Label one red slab at a time so the full float grid is never materialized
+        g_plane, b_plane = np.meshgrid(centers, centers, indexing='ij')
+        slab = np.stack([np.empty_like(g_plane), g_plane, b_plane], axis=-1)
+        cube = np.empty((size, size, size), dtype=dtype)
+        for i, r in enumerate(centers):
+            slab[..., 0] = r
+            # Basic names come first in `names`, so namer indices are cube indices
+            cube[i] = namer.label(slab)
+
+        if bits == 8:
+            for name, (r, g, b) in exact_colors.items():
+                cube[r, g, b] = names.index(name)
+
+        return cls(cube, names, bits, cls.name_colors(names, basic_colors, exact_colors))
+
+    @classmethod
+    def load_or_build(cls, bits=8, cache_dir=None, basic_colors=None, exact_colors=None):
+        """Reuse a cached cube (memory-mapped) or build and cache a new one"""
+        if basic_colors is None:
+            basic_colors = BASIC_COLORS
+        if exact_colors is None:
+            exact_colors = css3_colors()
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+
+        key = cls.palette_key(bits, basic_colors, exact_colors)
+        cube_path = os.path.join(cache_dir, f"lut_{key}.npy")
+        names_path = os.path.join(cache_dir, f"lut_{key}.json")
+
+        try:
+            with open(names_path, 'r', encoding='utf-8') as f:
+                names = json.load(f)
+            cube = np.load(cube_path, mmap_mode='r')
+            colors = cls.name_colors(names, basic_colors, exact_colors)
+            return cls(cube, names, bits, colors)
+        except (OSError, ValueError):
+            pass
+
+        lut = cls.build(bits, basic_colors, exact_colors)
+        try:
+            lut.save(cube_path, names_path)
+        except OSError as e:
+            logger.warning("Could not cache color lookup table: %s", e)
+        return lut
+
+    def save(self, cube_path, names_path):
+        """Write the cube and names table atomically"""
+        directory = os.path.dirname(cube_path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_cube = tempfile.mkstemp(dir=directory, suffix='.npy')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, np.ascontiguousarray(self.cube))
+        os.replace(tmp_cube, cube_path)
+
+        # Names are written last: a names file means the cube next to it is complete
+        fd, tmp_names = tempfile.mkstemp(dir=directory, suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.names, f)
+        os.replace(tmp_names, names_path)
+
+    def label(self, pixels, bgr=False):
+        """Return the names-table index for every pixel (last axis = channels)"""
+        pixels = np.asarray(pixels)
+        if pixels.shape[-1] != 3:
+            raise ValueError(f"Expected 3 color channels, got shape {pixels.shape}")
+        if pixels.dtype != np.uint8:
+            pixels = np.clip(pixels, 0, 255).astype(np.uint8)
+
+        if self._flat_cube is not None and sys.byteorder == 'little' and pixels.size:
+            # Pad to 4 bytes per pixel and read each pixel as one uint32, which
+            # yields the packed r << 16 | g << 8 | b cube index directly
+            code = cv2.COLOR_BGR2BGRA if bgr else cv2.COLOR_RGB2BGRA
+            bgra = cv2.cvtColor(np.ascontiguousarray(pixels).reshape(-1, 1, 3), code)
+            packed = bgra.view(np.uint32).reshape(-1) & 0xFFFFFF
+            return self._flat_cube.take(packed).reshape(pixels.shape[:-1])
+
+        if self.shift:
+            pixels = pixels >> self.shift
+        if bgr:
+            return self.cube[pixels[..., 2], pixels[..., 1], pixels[..., 0]]
+        return self.cube[pixels[..., 0], pixels[..., 1], pixels[..., 2]]
+
+    def name_image(self, image, bgr=False):
+        """Label an image and return (label index map, names table)"""
+        return self.label(image, bgr=bgr), self.names
+
+    def name(self, rgb_color):
+        """Name a single RGB color"""
+        r, g, b = (int(c) >> self.shift for c in rgb_color)
+        return self.names[int(self.cube[r, g, b])]
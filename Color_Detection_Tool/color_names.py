@@ -0,0 +1,117 @@
+"""Vectorized color naming engine (no GUI dependencies)"""
+
+import numpy as np
+import webcolors
+
+# Basic colors used as the fallback palette when webcolors has no exact match
+BASIC_COLORS = {
+    'Red': (255, 0, 0),
+    'Green': (0, 255, 0),
+    'Blue': (0, 0, 255),
+    'Yellow': (255, 255, 0),
+    'Orange': (255, 165, 0),
+    'Purple': (128, 0, 128),
+    'Pink': (255, 192, 203),
+    'Brown': (165, 42, 42),
+    'Gray': (128, 128, 128),
+    'Black': (0, 0, 0),
+    'White': (255, 255, 255),
+    'Cyan': (0, 255, 255),
+    'Magenta': (255, 0, 255),
+    'Navy': (0, 0, 128),
+    'Maroon': (128, 0, 0),
+    'Olive': (128, 128, 0),
+    'Lime': (0, 255, 0),
+    'Aqua': (0, 255, 255),
+    'Silver': (192, 192, 192),
+    'Teal': (0, 128, 128),
+    'Fuchsia': (255, 0, 255),
+    'Gold': (255, 215, 0),
+    'Indigo': (75, 0, 130),
+    'Violet': (238, 130, 238),
+    'Turquoise': (64, 224, 208),
+    'Coral': (255, 127, 80),
+    'Salmon': (250, 128, 114),
+    'Khaki': (240, 230, 140),
+    'Crimson': (220, 20, 60)
+}
+
+# Number of pixels compared against the palette at once (bounds temporary memory)
+CHUNK_SIZE = 1 << 18
+
+
+def css3_colors():
+    """Return {Title Name: (r, g, b)} for every CSS3 color webcolors knows.
+
+    Names that share a value (e.g. aqua/cyan) collapse to the one
+    webcolors.rgb_to_name reports, so lookups agree with get_color_name.
+    """
+    if hasattr(webcolors, 'names'):
+        css_names = webcolors.names('css3')
+    else:
+        # webcolors < 1.13
+        css_names = webcolors.CSS3_NAMES_TO_HEX.keys()
+
+    colors = {}
+    for name in css_names:
+        rgb = tuple(webcolors.name_to_rgb(name))
+        colors[webcolors.rgb_to_name(rgb).title()] = rgb
+    return colors
+
+
+class ColorNamer:
+    """Name whole frames or batches of pixels against a precomputed palette.
+
+    The palette is converted to a NumPy array once; every lookup is a
+    vectorized nearest-neighbour search (squared Euclidean distance in RGB),
+    so millions of pixels are labelled per call instead of one per call.
+    """
+
+    def __init__(self, palette=None):
+        if palette is None:
+            palette = BASIC_COLORS
+        if not palette:
+            raise ValueError("Palette must contain at least one color")
+
+        self.names = list(palette.keys())
+        self.colors = np.array(list(palette.values()), dtype=np.int32).reshape(-1, 3)
+        # float32 keeps these integer distances exact (< 2**24) and lets the
+        # dot product run through BLAS
+        self._colors_f = self.colors.astype(np.float32)
+        # Squared norms are constant, so only the dot product is computed per pixel
+        self._colors_sq = (self._colors_f ** 2).sum(axis=1)
+        self._label_dtype = np.uint8 if len(self.names) <= 256 else np.int32
+
+    def __len__(self):
+        return len(self.names)
+
+    def label(self, pixels, bgr=False):
+        """Return the palette index of the closest color for every pixel.
+
+        `pixels` is any array whose last axis holds the 3 channels, e.g. an
+        (H, W, 3) frame or an (N, 3) batch. The result has shape pixels.shape[:-1].
+        Set `bgr=True` for OpenCV frames; the palette is flipped instead of the image.
+        """
+        pixels = np.asarray(pixels)
+        if pixels.shape[-1] != 3:
+            raise ValueError(f"Expected 3 color channels, got shape {pixels.shape}")
+
+        colors = self._colors_f[:, ::-1] if bgr else self._colors_f
+        flat = pixels.reshape(-1, 3)
+        labels = np.empty(flat.shape[0], dtype=self._label_dtype)
+
+        for start in range(0, flat.shape[0], CHUNK_SIZE):
+            chunk = flat[start:start + CHUNK_SIZE].astype(np.float32)
+            # |p - c|^2 = |p|^2 - 2 p.c + |c|^2, and |p|^2 does not change the argmin
+            distances = self._colors_sq - 2 * (chunk @ colors.T)
+            labels[start:start + CHUNK_SIZE] = distances.argmin(axis=1)
+
+        return labels.reshape(pixels.shape[:-1])
+
+    def name_image(self, image, bgr=False):
+        """Label an image and return (label index map, names table)"""
+        return self.label(image, bgr=bgr), self.names
+
+    def name(self, rgb_color):
+        """Name a single RGB color"""
+        return self.names[int(self.label(np.asarray(rgb_color).reshape(1, 3))[0])]
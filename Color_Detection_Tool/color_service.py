@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+"""Local HTTP/JSON color-analysis service (asyncio, standard library only).
+
+Endpoints:
+    GET  /health                 status, batching and cache counters (HEAD too)
+    POST /colors                 {"pixels": [[r, g, b], ...]} or {"rgb": [r, g, b]}
+                                 -> {"colors": [{"rgb", "hex", "name", "hsl"}, ...]}
+    POST /image?palette=5&x=..&y=..&region=5x5+box&statistic=mean&method=kmeans
+                                 body = encoded image bytes (PNG, JPEG, ...);
+                                 palette is 0 (none) to MAX_PALETTE_COLORS
+                                 -> {"width", "height", "palette": [...], "sample": {...}}
+
+Concurrent /colors requests arriving within --batch-delay-ms are merged
+into one vectorized naming call. Usage:
+    python color_service.py --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from core import ColorAnalyzer, decode_image
+
+DEFAULT_PORT = 8765
+
+# Requests larger than this are rejected (413)
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# Pixels per /colors request
+MAX_REQUEST_PIXELS = 1 << 20
+
+# Colors per /image palette (k-means cost grows with it; 0 skips the palette)
+MAX_PALETTE_COLORS = 32
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, allow=None):
+        super().__init__(message)
+        self.status = status
+        # Methods the resource accepts, sent as the Allow header of a 405
+        self.allow = allow
+
+
+class PixelBatcher:
+    """Merge concurrent pixel batches into one describe_pixels call.
+
+    A batch is flushed `max_delay` seconds after its first request arrives,
+    or as soon as it holds `max_pixels` pixels. Batches run one at a time on
+    `executor`, so the event loop keeps accepting requests meanwhile.
+    max_delay=0 disables batching: every request is described on its own.
+    """
+
+    def __init__(self, analyzer, executor, max_delay=0.002, max_pixels=65536):
+        self.analyzer = analyzer
+        self.executor = executor
+        self.max_delay = max_delay
+        self.max_pixels = max_pixels
+        self.batches = 0
+        self.requests = 0
+        self._pending = []
+        self._pending_pixels = 0
+        self._flush_handle = None
+        # Running batches; the loop only keeps weak references to tasks
+        self._tasks = set()
+
+    async def describe(self, pixels):
+        loop = asyncio.get_running_loop()
+        self.requests += 1
+        if not self.max_delay:
+            self.batches += 1
+            return await loop.run_in_executor(self.executor, self.analyzer.describe_pixels, pixels)
+
+        future = loop.create_future()
+        self._pending.append((pixels, future))
+        self._pending_pixels += len(pixels)
+        if self._pending_pixels >= self.max_pixels:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending, self._pending_pixels = self._pending, [], 0
+        if pending:
+            self.batches += 1
+            task = asyncio.get_running_loop().create_task(self._run(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending):
+        loop = asyncio.get_running_loop()
+        pixels = np.concatenate([p for p, _ in pending])
+        try:
+            results = await loop.run_in_executor(self.executor, self.analyzer.describe_pixels, pixels)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for batch, future in pending:
+            if not future.done():
+                future.set_result(results[offset:offset + len(batch)])
+            offset += len(batch)
+
+
+class ColorService:
+    """The HTTP front end: parses requests and dispatches them to a ColorAnalyzer"""
+
+    def __init__(self, analyzer, batch_delay=0.002, max_batch_pixels=65536, workers=4):
+        self.analyzer = analyzer
+        # One thread for pixel batches (so they stay large), a pool for images
+        self.batcher = PixelBatcher(analyzer, ThreadPoolExecutor(1, thread_name_prefix="color-batch"),
+                                    batch_delay, max_batch_pixels)
+        self.image_executor = ThreadPoolExecutor(workers, thread_name_prefix="color-image")
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection (keep-alive aware)"""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    # The stream position is unknown after a bad head; answer and close
+                    await self._respond(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+
+                allow = None
+                try:
+                    status, payload = 200, await self.dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload, allow = e.status, {'error': str(e)}, e.allow
+                except ValueError as e:
+                    status, payload = 400, {'error': str(e)}
+                except Exception as e:
+                    status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+
+                await self._respond(writer, status, payload, keep_alive, allow=allow,
+                                    head_only=method == 'HEAD')
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """(method, target, body, keep_alive), or None once the client is done"""
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return None
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                raise HTTPError(400, "Malformed request line")
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+        except (asyncio.LimitOverrunError, ValueError):
+            # readline() refuses lines longer than the stream limit
+            raise HTTPError(400, "Request line or header too long")
+
+        try:
+            length = int(headers.get('content-length', '0'))
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPError(400, f"Invalid Content-Length: {headers['content-length']!r}")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b''
+
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        return method, target, body, keep_alive
+
+    async def _respond(self, writer, status, payload, keep_alive, allow=None, head_only=False):
+        data = json.dumps(payload).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                + (f"Allow: {allow}\r\n" if allow else "")
+                + f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        # A HEAD reply carries the headers of the GET reply but no body
+        writer.write(head.encode('latin-1') + (b'' if head_only else data))
+        await writer.drain()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if url.path == '/health':
+            if method not in ('GET', 'HEAD'):
+                raise HTTPError(405, "/health expects GET or HEAD", allow='GET, HEAD')
+            return {
+                'status': 'ok',
+                'requests': self.batcher.requests,
+                'batches': self.batcher.batches,
+                'cache': self.analyzer.info.stats(),
+            }
+        if url.path not in ('/colors', '/image'):
+            raise HTTPError(404, f"Unknown endpoint: {url.path}")
+        if method != 'POST':
+            raise HTTPError(405, f"{url.path} expects POST", allow='POST')
+
+        if url.path == '/colors':
+            return {'colors': await self.batcher.describe(_parse_pixels(body))}
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.image_executor, self._analyze_image, body, query)
+
+    def _analyze_image(self, body, query):
+        """Decode, then palette and/or region sample (worker thread)"""
+        if not body:
+            raise ValueError("Expected encoded image bytes in the request body")
+        image = decode_image(body)
+        height, width = image.shape[:2]
+        result = {'width': width, 'height': height}
+
+        n_colors = int(query.get('palette', 5))
+        if not 0 <= n_colors <= MAX_PALETTE_COLORS:
+            raise ValueError(f"palette must be between 0 and {MAX_PALETTE_COLORS}")
+        if n_colors > 0:
+            result['palette'] = self.analyzer.palette(image, n_colors, query.get('method', 'kmeans'))
+        if 'x' in query and 'y' in query:
+            x, y = int(query['x']), int(query['y'])
+            if not (0 <= x < width and 0 <= y < height):
+                raise ValueError(f"Sample point ({x}, {y}) is outside the {width}x{height} image")
+            result['sample'] = self.analyzer.sample(image, x, y, query.get('region', '5x5 box'),
+                                                    query.get('statistic', 'mean'))
+        return result
+
+
+def _parse_pixels(body):
+    """(N, 3) uint8 array from a /colors JSON body"""
+    try:
+        request = json.loads(body or b'{}')
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if not isinstance(request, dict):
+        raise ValueError("Expected a JSON object")
+    if 'rgb' in request:
+        pixels = [request['rgb']]
+    elif 'pixels' in request:
+        pixels = request['pixels']
+    else:
+        raise ValueError("Expected 'pixels' or 'rgb'")
+
+    array = np.asarray(pixels)
+    if array.ndim < 1 or array.shape[-1] != 3 or array.size == 0:
+        raise ValueError("Pixels must be [r, g, b] triples")
+    if not np.issubdtype(array.dtype, np.integer) or array.min() < 0 or array.max() > 255:
+        raise ValueError("Pixel values must be integers in 0-255")
+    array = array.reshape(-1, 3)
+    if len(array) > MAX_REQUEST_PIXELS:
+        raise ValueError(f"At most {MAX_REQUEST_PIXELS} pixels per request")
+    return array.astype(np.uint8)
+
+
+async def serve(args):
+    service = ColorService(ColorAnalyzer(), batch_delay=args.batch_delay_ms / 1000,
+                           max_batch_pixels=args.max_batch_pixels, workers=args.workers)
+    server = await service.start(args.host, args.port)
+    print(f"🚀 Color service listening on http://{args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON color-analysis service")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (default: localhost only)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--batch-delay-ms', type=float, default=2.0,
+                        help="How long /colors requests wait to be batched (0 = no batching)")
+    parser.add_argument('--max-batch-pixels', type=int, default=65536, help="Flush a batch early at this size")
+    parser.add_argument('--workers', type=int, default=4, help="Threads decoding and analyzing images")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\n🛑 Service stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Coalesce color info updates: skip re-rendering colors that barely changed"""
+
+import time
+
+from perceptual import delta_e_2000, rgb_to_lab
+
+
+class ColorUpdateCoalescer:
+    """Decide whether a newly sampled color is worth re-rendering.
+
+    An update is accepted when at least 1 / max_rate_hz seconds have passed
+    since the last accepted one AND the color moved by at least
+    `delta_e_threshold` (CIEDE2000) from it. Identical colors are rejected
+    without any Lab math. Pass max_rate_hz=None for no rate cap and
+    delta_e_threshold=0 to react to every change.
+    """
+
+    def __init__(self, delta_e_threshold=2.0, max_rate_hz=15.0, clock=time.monotonic):
+        self.delta_e_threshold = delta_e_threshold
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz else 0.0
+        self.clock = clock
+        self.accepted = 0
+        self.skipped = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the last color so the next one is always accepted"""
+        self._last_rgb = None
+        self._last_lab = None
+        self._last_time = None
+
+    def should_update(self, rgb_color, force=False):
+        rgb_color = tuple(int(c) for c in rgb_color)
+        now = self.clock()
+
+        if not force and self._last_rgb is not None:
+            if rgb_color == self._last_rgb or now - self._last_time < self.min_interval:
+                self.skipped += 1
+                return False
+            lab = rgb_to_lab(rgb_color)
+            if delta_e_2000(lab, self._last_lab) < self.delta_e_threshold:
+                self.skipped += 1
+                return False
+        else:
+            lab = rgb_to_lab(rgb_color)
+
+        self._last_rgb = rgb_color
+        self._last_lab = lab
+        self._last_time = now
+        self.accepted += 1
+        return True
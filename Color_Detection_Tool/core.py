@@ -0,0 +1,118 @@
+"""GUI-free color analysis: naming, HSL conversion, sampling and palettes.
+
+The Tk app, the HTTP service (color_service.py) and scripts share this
+module; nothing here imports tkinter.
+"""
+
+import threading
+
+import cv2
+import numpy as np
+
+from color_info import ColorInfoCache, rgb_to_hsl
+from color_lut import ColorLUT
+from palette import extract_palette
+from sampling import SAMPLING_PRESETS, sample_window
+
+__all__ = ['ColorAnalyzer', 'decode_image', 'get_color_name', 'rgb_to_hsl', 'rgb_to_hsl_array']
+
+_default_analyzer = None
+
+
+def rgb_to_hsl_array(pixels):
+    """Vectorized rgb_to_hsl: (N, 3) uint8 RGB -> (N, 3) int (hue degrees, saturation %, lightness %).
+
+    Mirrors colorsys.rgb_to_hls step by step, so results match rgb_to_hsl exactly.
+    """
+    rgb = np.asarray(pixels, dtype=np.float64).reshape(-1, 3) / 255.0
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    sumc = maxc + minc
+    rangec = maxc - minc
+    lightness = sumc / 2.0
+
+    # Grays have no hue or saturation; divide by 1 for them and zero them below
+    gray = rangec == 0
+    safe_range = np.where(gray, 1.0, rangec)
+    denominator = np.where(lightness <= 0.5, sumc, 2.0 - maxc - minc)
+    saturation = rangec / np.where(gray, 1.0, denominator)
+    rc = (maxc - r) / safe_range
+    gc = (maxc - g) / safe_range
+    bc = (maxc - b) / safe_range
+    hue = np.select([r == maxc, g == maxc], [bc - gc, 2.0 + rc - bc], 4.0 + gc - rc)
+    hue = (hue / 6.0) % 1.0
+    hue[gray] = 0.0
+    saturation[gray] = 0.0
+
+    return np.stack([hue * 360, saturation * 100, lightness * 100], axis=1).astype(np.int64)
+
+
+def decode_image(data):
+    """Decode encoded image bytes (PNG, JPEG, ...) to a BGR array"""
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode image data")
+    return image
+
+
+class ColorAnalyzer:
+    """Color naming and analysis without any UI.
+
+    `namer` defaults to the cached RGB -> name cube (color_lut.ColorLUT);
+    a perceptual.PerceptualMatcher works too. Single colors go through a
+    ColorInfoCache; pixel batches are named in one vectorized call. Safe to
+    share between threads.
+    """
+
+    def __init__(self, namer=None, cache_size=None):
+        self.namer = namer if namer is not None else ColorLUT.load_or_build(bits=8)
+        options = {'max_size': cache_size} if cache_size else {}
+        self.info = ColorInfoCache(self.namer, **options)
+        self._info_lock = threading.Lock()
+
+    def lookup(self, rgb_color):
+        """Cached color_info.ColorInfo for one RGB color"""
+        with self._info_lock:
+            return self.info.lookup(rgb_color)
+
+    def get_color_name(self, rgb_color):
+        return self.lookup(rgb_color).name
+
+    def describe(self, rgb_color):
+        """{'rgb', 'hex', 'name', 'hsl'} for one RGB color"""
+        info = self.lookup(rgb_color)
+        return {'rgb': list(info.rgb), 'hex': info.hex, 'name': info.name, 'hsl': list(info.hsl)}
+
+    def describe_pixels(self, pixels):
+        """describe() for an (N, 3) RGB batch, vectorized"""
+        pixels = np.ascontiguousarray(np.asarray(pixels, dtype=np.uint8).reshape(-1, 3))
+        labels = self.namer.label(pixels, bgr=False)
+        names = self.namer.names
+        hsl = rgb_to_hsl_array(pixels).tolist()
+        packed = (pixels[:, 0].astype(np.int64) << 16) | (pixels[:, 1].astype(np.int64) << 8) | pixels[:, 2]
+        return [{'rgb': rgb, 'hex': f"#{key:06x}", 'name': names[label], 'hsl': h}
+                for rgb, key, label, h in zip(pixels.tolist(), packed.tolist(), labels.tolist(), hsl)]
+
+    def sample(self, image, x, y, region='5x5 box', statistic='mean', bgr=True):
+        """Sample a named region (see sampling.SAMPLING_PRESETS) of an image around (x, y)"""
+        if region not in SAMPLING_PRESETS or SAMPLING_PRESETS[region].kind == 'rect':
+            raise ValueError(f"Unknown sampling region: {region}")
+        rgb = sample_window(image, SAMPLING_PRESETS[region], x, y, statistic=statistic, bgr=bgr)
+        return self.describe(rgb)
+
+    def palette(self, image, n_colors=5, method='kmeans', bgr=True):
+        """Dominant colors of an image (see palette.extract_palette), with HSL"""
+        colors = extract_palette(image, n_colors, method, bgr=bgr, namer=self.namer)
+        for color in colors:
+            color['rgb'] = list(color['rgb'])
+            color['hsl'] = list(rgb_to_hsl(color['rgb']))
+        return colors
+
+
+def get_color_name(rgb_color):
+    """Name of an RGB color using a shared default ColorAnalyzer"""
+    global _default_analyzer
+    if _default_analyzer is None:
+        _default_analyzer = ColorAnalyzer()
+    return _default_analyzer.get_color_name(rgb_color)
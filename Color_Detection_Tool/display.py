@@ -0,0 +1,87 @@
+"""Fast frame display: cheap resize and a reused Tk PhotoImage"""
+
+import cv2
+from PIL import Image
+
+
+def fit_size(width, height, max_width, max_height, upscale=True):
+    """Largest (width, height) with the source aspect ratio that fits the box.
+
+    With upscale=False an image already inside the box keeps its size.
+    """
+    if min(width, height, max_width, max_height) <= 0:
+        raise ValueError(f"Cannot fit a {width}x{height} image into {max_width}x{max_height}")
+    if not upscale and width <= max_width and height <= max_height:
+        return width, height
+    aspect_ratio = width / height
+    if aspect_ratio > max_width / max_height:
+        # Image is wider, scale by width
+        return max_width, max(1, int(max_width / aspect_ratio))
+    # Image is taller, scale by height
+    return max(1, int(max_height * aspect_ratio)), max_height
+
+
+class DisplayRenderer:
+    """Turn BGR frames into display-sized RGB buffers and show them in one PhotoImage.
+
+    prepare() touches no Tk state and can run in the processing thread;
+    show() must run on the Tk main loop. The target size is computed once per source
+    resolution, frames are resized with cv2 on the NumPy buffer and converted
+    to RGB in place on the small result, and the PhotoImage is only recreated
+    when the display size changes. `interpolation` defaults to INTER_AREA when
+    shrinking and INTER_LINEAR when enlarging; upscale=False shows small
+    frames at their own size.
+    """
+
+    def __init__(self, max_width, max_height, interpolation=None, upscale=True):
+        self.max_width = max_width
+        self.max_height = max_height
+        self.interpolation = interpolation
+        self.upscale = upscale
+        self.photo = None
+        self._source_shape = None
+        self._target_size = None
+        self._resize_flag = cv2.INTER_AREA
+
+    def target_size(self, frame):
+        shape = frame.shape[:2]
+        if shape != self._source_shape:
+            self._source_shape = shape
+            self._target_size = fit_size(shape[1], shape[0], self.max_width, self.max_height,
+                                         upscale=self.upscale)
+            if self.interpolation is not None:
+                self._resize_flag = self.interpolation
+            elif self._target_size[0] < shape[1]:
+                self._resize_flag = cv2.INTER_AREA  # best quality when shrinking
+            else:
+                self._resize_flag = cv2.INTER_LINEAR
+        return self._target_size
+
+    def prepare(self, bgr_frame):
+        """Resize a BGR frame to the display size and return it as RGB"""
+        size = self.target_size(bgr_frame)
+        if (bgr_frame.shape[1], bgr_frame.shape[0]) == size:
+            resized = bgr_frame.copy()
+        else:
+            resized = cv2.resize(bgr_frame, size, interpolation=self._resize_flag)
+        # Convert only the small buffer, in place
+        cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=resized)
+        return resized
+
+    def show(self, label, rgb_frame):
+        """Paste a prepared frame into the label's PhotoImage (Tk main loop only)"""
+        # Imported here so headless users of prepare() never load tkinter
+        from PIL import ImageTk
+
+        image = Image.fromarray(rgb_frame)
+        if self.photo is None or (self.photo.width(), self.photo.height()) != image.size:
+            self.photo = ImageTk.PhotoImage(image)
+            label.config(image=self.photo, text="")
+            label.place(relx=0.5, rely=0.5, anchor='center')
+            label.image = self.photo  # Keep reference
+        else:
+            self.photo.paste(image)
+
+    def reset(self):
+        """Forget the current PhotoImage (e.g. after the label was cleared)"""
+        self.photo = None
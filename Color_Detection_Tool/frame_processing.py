@@ -0,0 +1,123 @@
+"""GUI-free camera frame processing stages shared by the app and the headless runner"""
+
+import time
+from collections import namedtuple
+
+import cv2
+
+from sampling import SAMPLING_PRESETS, sample_window
+from segmentation import area_stats, overlay, segment_image
+from smoothing import TemporalFilter
+from tracking import draw_boxes
+
+# Result of processing one frame; areas is the top named-color area stats
+# when the segmentation overlay is on, tracked a tracking.TrackResult when
+# a color is being tracked
+FrameResult = namedtuple('FrameResult', ['display_frame', 'rgb_color', 'stable', 'areas', 'tracked'])
+FrameResult.__new__.__defaults__ = (None, None)
+
+# Names reported per frame by the segmentation overlay
+OVERLAY_TOP_NAMES = 3
+
+CROSSHAIR_COLOR = (0, 255, 0)
+CROSSHAIR_RADIUS = 20
+
+
+class CameraFrameProcessor:
+    """Flip, sample, smooth, draw and prepare one camera frame for display.
+
+    Runs in the processing thread, so it never touches Tk. Each stage can be
+    timed by passing `on_stage(name, seconds)`. `renderer` is a
+    display.DisplayRenderer; without one the 'display' stage is skipped and
+    the drawn BGR frame is returned as is. Setting `overlay_lut` to a
+    color_lut.ColorLUT tints the (already downscaled) display frame with its
+    named-color segmentation; setting `tracker` to a tracking.ColorTracker
+    boxes every region of its color.
+    """
+
+    STAGES = ('flip', 'sample', 'smooth', 'track', 'draw', 'display', 'segment')
+
+    def __init__(self, renderer=None, temporal_filter=None, mirror=True, on_stage=None):
+        self.renderer = renderer
+        self.temporal_filter = temporal_filter or TemporalFilter()
+        self.mirror = mirror
+        self.on_stage = on_stage
+        # Plain attributes so the UI thread can change them between frames
+        self.sampling_region = SAMPLING_PRESETS['Circle (20 px)']
+        self.sampling_statistic = 'mean'
+        self.overlay_lut = None
+        self.tracker = None
+
+    def reset(self):
+        self.temporal_filter.reset()
+
+    def process(self, frame):
+        on_stage = self.on_stage
+        clock = time.perf_counter
+        t = clock() if on_stage else 0.0
+
+        # Flip frame horizontally for mirror effect
+        if self.mirror:
+            frame = cv2.flip(frame, 1)
+        if on_stage:
+            t = self._lap('flip', t)
+
+        h, w = frame.shape[:2]
+        center_x, center_y = w // 2, h // 2
+
+        # Sample the region around the center before the crosshair is drawn over it
+        region = self.sampling_region
+        if region.kind == 'rect':
+            # Rectangles are dragged on still images; the camera uses the drawn circle
+            region = SAMPLING_PRESETS['Circle (20 px)']
+        # One region per frame: integrate only its bounding box, not the whole frame
+        rgb_color = sample_window(frame, region, center_x, center_y, statistic=self.sampling_statistic)
+        if on_stage:
+            t = self._lap('sample', t)
+
+        # Smooth over recent frames so jitter neither flickers the UI nor gets captured
+        rgb_color = self.temporal_filter.update(rgb_color)
+        stable = self.temporal_filter.stable
+        if on_stage:
+            t = self._lap('smooth', t)
+
+        # Find the tracked color on the clean frame, before anything is drawn
+        tracked = None
+        tracker = self.tracker
+        if tracker is not None:
+            tracked = tracker.detect(frame)
+            if on_stage:
+                t = self._lap('track', t)
+
+        # Draw tracked boxes and the crosshair
+        if tracked is not None:
+            draw_boxes(frame, tracked.boxes)
+        cv2.line(frame, (center_x - 15, center_y), (center_x + 15, center_y), CROSSHAIR_COLOR, 2)
+        cv2.line(frame, (center_x, center_y - 15), (center_x, center_y + 15), CROSSHAIR_COLOR, 2)
+        cv2.circle(frame, (center_x, center_y), CROSSHAIR_RADIUS, CROSSHAIR_COLOR, 2)
+        if on_stage:
+            t = self._lap('draw', t)
+
+        # Resize to fit the display area and convert to RGB
+        if self.renderer is not None:
+            frame = self.renderer.prepare(frame)
+            if on_stage:
+                t = self._lap('display', t)
+
+        # Segment the display-sized frame rather than the full capture
+        areas = None
+        lut = self.overlay_lut
+        if lut is not None:
+            bgr = self.renderer is None
+            segmentation = segment_image(frame, lut, bgr=bgr)
+            frame = overlay(frame, segmentation.labels, lut.colors, bgr=bgr)
+            areas = area_stats(segmentation, top=OVERLAY_TOP_NAMES)
+            if on_stage:
+                self._lap('segment', t)
+
+        return FrameResult(frame, rgb_color, stable, areas, tracked)
+
+    def _lap(self, name, start):
+        now = time.perf_counter()
+        self.on_stage(name, now - start)
+        return now
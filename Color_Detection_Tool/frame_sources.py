@@ -0,0 +1,195 @@
+"""Pluggable frame sources: webcam, video file, image sequence or synthetic frames.
+
+Every source has the cv2.VideoCapture interface the pipeline uses
+(read() -> (ok, frame), isOpened(), release()), so the camera pipeline can
+run without a webcam.
+"""
+
+import abc
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v', '.mpg', '.mpeg')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.tif', '.webp')
+
+
+class FrameSource(abc.ABC):
+    """Base class; subclasses implement _read() -> frame or None
+
+    `last_wait` is the time the last read() slept to pace playback, so
+    callers timing read() can tell idle time from capture work.
+    """
+
+    def __init__(self, fps=None, realtime=False):
+        self.fps = fps
+        self.realtime = realtime
+        self.last_wait = 0.0
+        self._next_frame_time = None
+
+    @property
+    def paced(self):
+        """True when read() sleeps to deliver frames at `fps`"""
+        return bool(self.realtime and self.fps)
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        self.last_wait = 0.0
+        if self.paced:
+            # Pace playback like a live camera
+            now = time.perf_counter()
+            if self._next_frame_time is None:
+                self._next_frame_time = now
+            elif now < self._next_frame_time:
+                self.last_wait = self._next_frame_time - now
+                time.sleep(self.last_wait)
+            self._next_frame_time = max(now, self._next_frame_time) + 1.0 / self.fps
+
+        frame = self._read()
+        return frame is not None, frame
+
+    @abc.abstractmethod
+    def _read(self):
+        """The next frame, or None when the source has no more"""
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class CameraSource(FrameSource):
+    """A webcam, by device index"""
+
+    def __init__(self, index=0):
+        super().__init__()
+        self.cap = cv2.VideoCapture(index)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _read(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """A video file, optionally looped and paced at its native frame rate"""
+
+    def __init__(self, path, loop=False, realtime=False):
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(fps=self.cap.get(cv2.CAP_PROP_FPS) or None, realtime=realtime)
+        self.path = path
+        self.loop = loop
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """Images from a directory (sorted by name) or a glob pattern"""
+
+    def __init__(self, pattern, loop=False, fps=30.0, realtime=False):
+        super().__init__(fps=fps, realtime=realtime)
+        if os.path.isdir(pattern):
+            paths = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            paths = glob.glob(pattern)
+        self.paths = sorted(p for p in paths if p.lower().endswith(IMAGE_EXTENSIONS))
+        self.loop = loop
+        self._position = 0
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def _read(self):
+        while self._position < len(self.paths) or (self.loop and self.paths):
+            if self._position >= len(self.paths):
+                self._position = 0
+            path = self.paths[self._position]
+            self._position += 1
+            frame = cv2.imread(path)
+            if frame is not None:
+                return frame
+        return None
+
+
+class SyntheticSource(FrameSource):
+    """Generated BGR frames: colored tiles drifting across a noisy background.
+
+    Deterministic for a given seed; `frames=None` generates forever.
+    """
+
+    def __init__(self, width=1280, height=720, frames=None, fps=30.0, realtime=False, seed=0):
+        super().__init__(fps=fps, realtime=realtime)
+        self.width = width
+        self.height = height
+        self.frames = frames
+        self._rng = np.random.default_rng(seed)
+        tiles = self._rng.integers(0, 256, (4, 6, 3), dtype=np.uint8)
+        tile_h = -(-height // tiles.shape[0])
+        tile_w = -(-width // tiles.shape[1])
+        base = np.repeat(np.repeat(tiles, tile_h, axis=0), tile_w, axis=1)[:height]
+        # Two copies side by side, so every drift offset is a plain slice
+        self._strip = np.ascontiguousarray(np.concatenate([base, base], axis=1))
+        self._period = base.shape[1]
+        self._noise = self._rng.integers(0, 12, (height, width, 3), dtype=np.uint8)
+        self._index = 0
+
+    def _read(self):
+        if self.frames is not None and self._index >= self.frames:
+            return None
+        # Drift horizontally a few pixels per frame
+        shift = (self._index * 4) % self._period
+        frame = cv2.add(self._strip[:, shift:shift + self.width], self._noise)
+        self._index += 1
+        return frame
+
+
+def open_source(spec, loop=False, realtime=False):
+    """Open a frame source from a string spec.
+
+    '0', '1', ...            webcam index
+    'synthetic[:WxH]'        generated frames, e.g. 'synthetic:1920x1080'
+    path to a video file     VideoFileSource
+    directory or glob        ImageSequenceSource
+    """
+    spec = str(spec)
+    if spec.isdigit():
+        return CameraSource(int(spec))
+    if spec == 'synthetic' or spec.startswith('synthetic:'):
+        width, height = 1280, 720
+        if ':' in spec:
+            width, height = (int(v) for v in spec.split(':', 1)[1].lower().split('x'))
+        return SyntheticSource(width, height, realtime=realtime)
+    if os.path.isfile(spec) and spec.lower().endswith(VIDEO_EXTENSIONS):
+        return VideoFileSource(spec, loop=loop, realtime=realtime)
+    if os.path.isdir(spec) or any(ch in spec for ch in '*?['):
+        return ImageSequenceSource(spec, loop=loop, realtime=realtime)
+    if os.path.isfile(spec):
+        # Unknown extension: let OpenCV try it as a video
+        return VideoFileSource(spec, loop=loop, realtime=realtime)
+    raise ValueError(f"Unknown frame source: {spec}")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+"""Run the camera detection stages headless and report per-stage timings.
+
+Usage:
+    python headless_runner.py --source synthetic:1920x1080 --frames 300
+    python headless_runner.py --source footage.mp4 --threaded --json timings.json
+
+Never imports tkinter, so it runs on machines without a display or camera.
+With --threaded, file and synthetic sources are paced at their frame rate
+like a camera; unpaced, the capture thread outruns processing and most
+frames are dropped, so the timings describe a different workload.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from camera_pipeline import FramePipeline
+from color_info import DEFAULT_CACHE_SIZE, ColorInfoCache
+from color_lut import ColorLUT
+from display import DisplayRenderer
+from frame_processing import CameraFrameProcessor
+from frame_sources import open_source
+from metrics import PipelineMetrics
+from tracking import ColorTracker
+
+
+def timed_read(source, timings):
+    """source.read() timed as 'read', with a paced source's sleep recorded as 'pace'"""
+    start = time.perf_counter()
+    result = source.read()
+    elapsed = time.perf_counter() - start
+    if source.paced:
+        timings.record('pace', source.last_wait)
+    timings.record('read', elapsed - source.last_wait)
+    return result
+
+
+def run_sequential(source, processor, namer, max_frames, timings, on_result=None):
+    """Read -> process -> name, one frame at a time; returns frames processed"""
+    frames = 0
+    while max_frames is None or frames < max_frames:
+        start = time.perf_counter()
+        ret, frame = timed_read(source, timings)
+        # 'total' is the work per frame, without the pacing sleep
+        start += source.last_wait
+        if not ret:
+            break
+
+        result = processor.process(frame)
+
+        t = time.perf_counter()
+        namer.name(result.rgb_color)
+        now = time.perf_counter()
+        timings.record('name', now - t)
+        timings.record('total', now - start)
+        timings.frame()
+        if on_result is not None:
+            on_result(result)
+        frames += 1
+    return frames
+
+
+def run_threaded(source, processor, namer, max_frames, timings, on_result=None):
+    """The GUI's threaded pipeline, with naming in the consumer; returns (frames, pipeline).
+
+    The capture thread releases `source` once it has stopped reading.
+    """
+    pipeline = FramePipeline(lambda: timed_read(source, timings), processor.process,
+                             on_capture_exit=source.release)
+    pipeline.start()
+    frames = 0
+    try:
+        while max_frames is None or frames < max_frames:
+            result = pipeline.poll()
+            if result is None:
+                if not pipeline.running:
+                    break
+                time.sleep(0.001)
+                continue
+            t = time.perf_counter()
+            namer.name(result.rgb_color)
+            timings.record('name', time.perf_counter() - t)
+            timings.frame()
+            if on_result is not None:
+                on_result(result)
+            frames += 1
+    finally:
+        # Files and generators end their read() promptly, so wait for the release
+        pipeline.stop(timeout=None)
+    return frames, pipeline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless camera pipeline benchmark")
+    parser.add_argument('--source', default='synthetic',
+                        help="Webcam index, video file, image folder/glob or 'synthetic[:WxH]'")
+    parser.add_argument('--frames', type=int, default=300, help="Frames to process (0 = until the source ends)")
+    parser.add_argument('--threaded', action='store_true',
+                        help="Use the GUI's capture/processing threads (reports dropped frames)")
+    parser.add_argument('--realtime', action='store_true',
+                        help="Pace file and synthetic sources at their native FPS (always on with --threaded)")
+    parser.add_argument('--unpaced', action='store_true',
+                        help="With --threaded, read file/synthetic sources as fast as possible "
+                             "(a stress test: most frames are dropped)")
+    parser.add_argument('--no-display', action='store_true', help="Skip the display resize stage")
+    parser.add_argument('--segment', action='store_true', help="Add the named-color segmentation overlay stage")
+    parser.add_argument('--track', metavar='R,G,B',
+                        help="Track regions of this color (HSV inRange + contours) and report object counts")
+    parser.add_argument('--name-cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help="Distinct colors kept by the naming cache")
+    parser.add_argument('--json', help="Write the timing summary to this JSON file")
+    parser.add_argument('--prometheus', help="Write the timings in Prometheus text format to this file")
+    args = parser.parse_args(argv)
+
+    paced = args.realtime or (args.threaded and not args.unpaced)
+    source = open_source(args.source, realtime=paced)
+    if not source.isOpened():
+        print(f"❌ Cannot open frame source: {args.source}", file=sys.stderr)
+        return 1
+
+    # Keep every sample: the run is finite and the summary covers all of it
+    timings = PipelineMetrics(window=None)
+    renderer = None if args.no_display else DisplayRenderer(630, 480)
+    processor = CameraFrameProcessor(renderer=renderer, on_stage=timings.record)
+    lut = ColorLUT.load_or_build()
+    if args.segment:
+        processor.overlay_lut = lut
+    object_counts = []
+    on_result = None
+    if args.track:
+        processor.tracker = ColorTracker([int(c) for c in args.track.split(',')])
+        on_result = lambda result: object_counts.append(len(result.tracked.boxes))
+    # Same memoized naming as the GUI
+    namer = ColorInfoCache(lut, max_size=args.name_cache_size)
+    max_frames = args.frames or None
+
+    start = time.perf_counter()
+    if args.threaded:
+        frames, pipeline = run_threaded(source, processor, namer, max_frames, timings, on_result)
+    else:
+        try:
+            frames, pipeline = run_sequential(source, processor, namer, max_frames, timings, on_result), None
+        finally:
+            source.release()
+    elapsed = time.perf_counter() - start
+
+    report = {
+        'source': args.source,
+        'mode': 'threaded' if args.threaded else 'sequential',
+        'paced': paced,
+        'frames': frames,
+        'seconds': round(elapsed, 3),
+        'fps': round(frames / elapsed, 2) if elapsed else 0.0,
+        'stages': timings.summary(),
+        'name_cache': namer.stats(),
+    }
+    if pipeline is not None:
+        report['frames_captured'] = pipeline.frames_captured
+        report['frames_dropped'] = pipeline.frames_dropped
+        report['drop_ratio'] = round(pipeline.frames_dropped / max(1, pipeline.frames_captured), 3)
+    if object_counts:
+        report['tracked_objects'] = {
+            'mean': round(float(np.mean(object_counts)), 2),
+            'min': int(min(object_counts)),
+            'max': int(max(object_counts)),
+        }
+
+    print(f"📊 {frames} frames in {elapsed:.2f}s ({report['fps']} FPS, {report['mode']})")
+    print(f"{'stage':<10}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stats in report['stages'].items():
+        print(f"{name:<10}{stats['count']:>8}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}"
+              f"{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['max_ms']:>10.3f}")
+    if pipeline is not None:
+        print(f"Captured {pipeline.frames_captured} frames, dropped {pipeline.frames_dropped} "
+              f"({report['drop_ratio'] * 100:.0f}%)")
+        if not paced and report['drop_ratio'] > 0.5:
+            print("⚠️ Unpaced source: most frames were dropped, so these timings are not those of "
+                  "a live camera (drop --unpaced to pace the source)", file=sys.stderr)
+    cache = report['name_cache']
+    print(f"Name cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate'] * 100:.1f}% hit rate)")
+    if object_counts:
+        objects = report['tracked_objects']
+        print(f"Tracked objects per frame: mean {objects['mean']}, min {objects['min']}, max {objects['max']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.prometheus:
+        timings.set_counter('frames_processed', frames)
+        if pipeline is not None:
+            timings.set_counter('frames_dropped', pipeline.frames_dropped)
+        with open(args.prometheus, 'w', encoding='utf-8') as f:
+            f.write(timings.to_prometheus())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
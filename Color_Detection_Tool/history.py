@@ -0,0 +1,197 @@
+"""Persistent, capped color history with ΔE deduplication and palette export"""
+
+import csv
+import json
+import os
+import sqlite3
+import struct
+import time
+
+import numpy as np
+
+from perceptual import delta_e_2000, rgb_to_lab
+
+# Oldest captures are evicted beyond this many entries
+DEFAULT_MAX_ENTRIES = 1000
+
+# Captures closer than this (CIEDE2000) to a recent one count as the same color
+DEFAULT_DEDUP_DELTA_E = 2.0
+
+# How many of the most recent captures a new one is compared against
+DEFAULT_DEDUP_WINDOW = 50
+
+EXPORT_FORMATS = ('.csv', '.json', '.gpl', '.ase')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS colors (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    r INTEGER NOT NULL, g INTEGER NOT NULL, b INTEGER NOT NULL,
+    lab_l REAL NOT NULL, lab_a REAL NOT NULL, lab_b REAL NOT NULL,
+    name TEXT NOT NULL,
+    captured_at REAL NOT NULL,
+    count INTEGER NOT NULL DEFAULT 1
+)
+"""
+
+_COLUMNS = "id, r, g, b, name, captured_at, count"
+
+
+def _entry(row):
+    entry_id, r, g, b, name, captured_at, count = row
+    return {
+        'id': entry_id,
+        'rgb': (r, g, b),
+        'hex': f"#{r:02x}{g:02x}{b:02x}",
+        'name': name,
+        'captured_at': captured_at,
+        'count': count,
+    }
+
+
+class ColorHistory:
+    """Captured colors in a SQLite table, oldest first.
+
+    `path=None` keeps the history in memory only. At most `max_entries`
+    are kept (the oldest are evicted). A capture within `dedup_delta_e`
+    (CIEDE2000) of one of the last `dedup_window` captures is not stored
+    again; that entry's count is bumped instead (dedup_delta_e=0 disables
+    this). Lab values are stored with each row so deduplication never
+    recomputes them.
+    """
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES, dedup_delta_e=DEFAULT_DEDUP_DELTA_E,
+                 dedup_window=DEFAULT_DEDUP_WINDOW):
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.dedup_delta_e = dedup_delta_e
+        self.dedup_window = dedup_window
+        self._db = sqlite3.connect(path if path is not None else ':memory:')
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM colors").fetchone()[0]
+
+    def __getitem__(self, index):
+        """Entry by position (0 = oldest, -1 = newest)"""
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+        return self.page(index, 1)[0]
+
+    def __iter__(self):
+        return iter(self.entries())
+
+    def add(self, rgb_color, name, captured_at=None):
+        """Store a capture; returns (entry, is_new)"""
+        rgb_color = tuple(int(c) for c in rgb_color)
+        lab = rgb_to_lab(rgb_color)
+
+        duplicate = self._find_duplicate(lab)
+        if duplicate is not None:
+            with self._db:
+                self._db.execute("UPDATE colors SET count = count + 1 WHERE id = ?", (duplicate,))
+            return self.get(duplicate), False
+
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT INTO colors (r, g, b, lab_l, lab_a, lab_b, name, captured_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*rgb_color, *(float(v) for v in lab), name, captured_at or time.time()))
+            self._evict()
+        return self.get(cursor.lastrowid), True
+
+    def _find_duplicate(self, lab):
+        if not self.dedup_delta_e or not self.dedup_window:
+            return None
+        rows = self._db.execute(
+            "SELECT id, lab_l, lab_a, lab_b FROM colors ORDER BY id DESC LIMIT ?",
+            (self.dedup_window,)).fetchall()
+        if not rows:
+            return None
+        recent = np.array(rows, dtype=np.float64)
+        distances = delta_e_2000(lab, recent[:, 1:])
+        closest = int(np.argmin(distances))
+        if distances[closest] < self.dedup_delta_e:
+            return int(recent[closest, 0])
+        return None
+
+    def _evict(self):
+        if self.max_entries is None:
+            return
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._db.execute("DELETE FROM colors WHERE id IN (SELECT id FROM colors ORDER BY id LIMIT ?)",
+                             (excess,))
+
+    def get(self, entry_id):
+        row = self._db.execute(f"SELECT {_COLUMNS} FROM colors WHERE id = ?", (entry_id,)).fetchone()
+        return _entry(row) if row else None
+
+    def page(self, offset, limit):
+        """`limit` entries starting at position `offset` (oldest first)"""
+        rows = self._db.execute(f"SELECT {_COLUMNS} FROM colors ORDER BY id LIMIT ? OFFSET ?",
+                                (limit, offset)).fetchall()
+        return [_entry(row) for row in rows]
+
+    def recent(self, limit):
+        """The newest `limit` entries, newest first"""
+        rows = self._db.execute(f"SELECT {_COLUMNS} FROM colors ORDER BY id DESC LIMIT ?",
+                                (limit,)).fetchall()
+        return [_entry(row) for row in rows]
+
+    def entries(self):
+        return self.page(0, -1)
+
+    def clear(self):
+        with self._db:
+            self._db.execute("DELETE FROM colors")
+
+    def close(self):
+        self._db.close()
+
+    def export(self, path, title="Color Detection Tool"):
+        """Write every entry as .csv, .json, .gpl (GIMP) or .ase (Adobe) by extension"""
+        ext = os.path.splitext(path)[1].lower()
+        writers = {'.csv': write_csv, '.json': write_json, '.gpl': write_gpl, '.ase': write_ase}
+        if ext not in writers:
+            raise ValueError(f"Unsupported export format: {ext} (use one of {', '.join(EXPORT_FORMATS)})")
+        writers[ext](path, self.entries(), title)
+
+
+def write_csv(path, entries, title=None):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'hex', 'r', 'g', 'b', 'captured_at', 'count'])
+        for e in entries:
+            writer.writerow([e['name'], e['hex'], *e['rgb'], e['captured_at'], e['count']])
+
+
+def write_json(path, entries, title=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([{**e, 'rgb': list(e['rgb'])} for e in entries], f, indent=2)
+
+
+def write_gpl(path, entries, title="Color Detection Tool"):
+    """GIMP/Inkscape palette"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"GIMP Palette\nName: {title}\nColumns: 8\n#\n")
+        for e in entries:
+            r, g, b = e['rgb']
+            f.write(f"{r:3d} {g:3d} {b:3d}\t{e['name']} {e['hex']}\n")
+
+
+def write_ase(path, entries, title=None):
+    """Adobe Swatch Exchange (version 1.0, RGB global colors)"""
+    blocks = []
+    for e in entries:
+        name = f"{e['name']} {e['hex']}".encode('utf-16-be') + b'\x00\x00'
+        r, g, b = e['rgb']
+        body = (struct.pack('>H', len(name) // 2) + name + b'RGB '
+                + struct.pack('>fffH', r / 255, g / 255, b / 255, 0))
+        blocks.append(struct.pack('>HI', 0x0001, len(body)) + body)
+    with open(path, 'wb') as f:
+        f.write(b'ASEF' + struct.pack('>HHI', 1, 0, len(blocks)) + b''.join(blocks))
@@ -0,0 +1,90 @@
+"""Virtualized Tk list of captured colors: only the visible rows are drawn"""
+
+import tkinter as tk
+from tkinter import ttk
+
+ROW_HEIGHT = 24
+SWATCH_SIZE = 16
+
+
+class HistoryView(tk.Frame):
+    """Scrollable view over a history.ColorHistory, newest first.
+
+    The canvas only ever holds the rows that fit in the window, fetched as
+    one page from the store, so scrolling and memory stay constant however
+    many colors have been captured. `on_select(entry)` is called when a row
+    is clicked.
+    """
+
+    def __init__(self, parent, history, on_select=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.history = history
+        self.on_select = on_select
+        self._first = 0          # index (newest first) of the top visible row
+        self._rows = []          # entries currently drawn
+
+        self.canvas = tk.Canvas(self, bg='white', highlightthickness=0, relief=tk.SUNKEN, bd=1,
+                                width=200, height=10 * ROW_HEIGHT)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", lambda event: self.refresh())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda event: self.scroll(-1))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll(1))
+
+    def _visible_rows(self):
+        return max(1, self.canvas.winfo_height() // ROW_HEIGHT)
+
+    def scroll(self, rows):
+        self._first += rows
+        self.refresh()
+
+    def yview(self, *args):
+        """Scrollbar callback ('moveto', fraction) / ('scroll', n, 'units'|'pages')"""
+        total = len(self.history)
+        if args[0] == 'moveto':
+            self._first = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (self._visible_rows() if args[2] == 'pages' else 1)
+            self._first += step
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the visible window of rows (call after the history changes)"""
+        total = len(self.history)
+        visible = self._visible_rows()
+        self._first = max(0, min(self._first, total - visible))
+
+        # Newest first: row i shows history position total - 1 - i
+        start = max(0, total - self._first - visible)
+        self._rows = self.history.page(start, total - self._first - start)[::-1]
+
+        canvas = self.canvas
+        canvas.delete("all")
+        if not total:
+            canvas.create_text(8, 8, anchor='nw', text="Captured colors will appear here...",
+                               font=('Arial', 9), fill='gray')
+        width = canvas.winfo_width()
+        for i, entry in enumerate(self._rows):
+            y = i * ROW_HEIGHT
+            number = total - self._first - i
+            canvas.create_rectangle(6, y + 4, 6 + SWATCH_SIZE, y + 4 + SWATCH_SIZE,
+                                    fill=entry['hex'], outline='#888')
+            label = f"#{number:02d} {entry['name']}  {entry['hex'].upper()}"
+            if entry['count'] > 1:
+                label += f"  ×{entry['count']}"
+            canvas.create_text(30, y + ROW_HEIGHT // 2, anchor='w', text=label, font=('Arial', 9))
+            canvas.create_line(0, y + ROW_HEIGHT - 1, width, y + ROW_HEIGHT - 1, fill='#eee')
+
+        if total:
+            self.scrollbar.set(self._first / total, min(1.0, (self._first + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_click(self, event):
+        index = event.y // ROW_HEIGHT
+        if self.on_select is not None and 0 <= index < len(self._rows):
+            self.on_select(self._rows[index])
@@ -0,0 +1,351 @@
+"""Memory-bounded access to huge images: reduced previews and lazy full-resolution tiles"""
+
+import contextlib
+import math
+import mmap
+import os
+import tempfile
+import weakref
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from sampling import IntegralImage
+
+try:
+    import tifffile
+except ImportError:  # tifffile is optional, TIFFs are then decoded like any other image
+    tifffile = None
+
+# Images up to this many pixels are simply decoded into memory
+DEFAULT_MAX_RESIDENT_PIXELS = 16_000_000
+
+# Rows processed at once when streaming over a non-resident image
+DEFAULT_BAND_HEIGHT = 512
+
+# Pixels kept by subsample(); matches palette.DEFAULT_SAMPLE_SIZE
+DEFAULT_SUBSAMPLE_PIXELS = 50000
+
+# Cap on the window read for a single region query (larger regions are streamed)
+_MAX_WINDOW_PIXELS = 4_000_000
+
+# Compressed TIFF bytes read per pass when decoding strip by strip
+_SEGMENT_BUFFER_BYTES = 16 * 1024 * 1024
+
+# PIL's decompression-bomb limit while LargeImage reads headers and previews of
+# huge scans; the process-wide default stays in place everywhere else
+LARGE_IMAGE_MAX_PIXELS = 4_000_000_000
+
+
+class LargeImage:
+    """A loaded image whose pixels may not all be in memory.
+
+    Small images are decoded once into `array` (BGR) as before. Larger ones
+    keep only a reduced `preview` for display; full-resolution pixels are
+    read lazily by region. NPY (H, W, 3 RGB uint8), raw RGB and uncompressed
+    TIFF (with tifffile) inputs are memory-mapped and streamed band by band,
+    so peak RSS stays bounded regardless of image size. Compressed RGB TIFFs
+    (with tifffile) are decoded strip by strip (or tile by tile) into a
+    temporary .npy on open, which bounds RSS the same way. Other compressed
+    formats (JPEG, PNG, ...) cannot be decoded by region with PIL or OpenCV:
+    on the first full-resolution access they are decoded once into a
+    temporary .npy, so that one conversion does hold the whole frame.
+    """
+
+    def __init__(self, width, height, preview, array=None, mapped=None, spool_source=None, path=None):
+        self.width = width
+        self.height = height
+        self.preview = preview
+        self.array = array          # resident BGR pixels of small images
+        self._mapped = mapped       # memory-mapped RGB pixels, if any
+        self._spool_source = spool_source  # compressed file converted to .npy on demand
+        self._spool_cleanup = None
+        self.path = path
+        self.resident = array is not None
+        self._sampler = None
+
+    # -- Opening -----------------------------------------------------------
+
+    @classmethod
+    def open(cls, path, preview_size=(1260, 960), max_resident_pixels=DEFAULT_MAX_RESIDENT_PIXELS,
+             raw_shape=None):
+        """Open an image file.
+
+        `preview_size` bounds the preview; `raw_shape=(height, width)` is
+        required for headerless .raw/.rgb files.
+        """
+        ext = os.path.splitext(path)[1].lower()
+
+        if ext == '.npy':
+            return cls._from_mapped(np.load(path, mmap_mode='r'), preview_size, path)
+        if ext in ('.raw', '.rgb'):
+            if raw_shape is None:
+                raise ValueError("raw_shape=(height, width) is required for raw images")
+            mapped = np.memmap(path, dtype=np.uint8, mode='r', shape=(raw_shape[0], raw_shape[1], 3))
+            return cls._from_mapped(mapped, preview_size, path)
+        if ext in ('.tif', '.tiff') and tifffile is not None:
+            try:
+                mapped = tifffile.memmap(path, mode='r')
+            except ValueError:
+                mapped = None  # compressed or tiled TIFF
+            if mapped is not None and mapped.ndim == 3 and mapped.shape[2] >= 3 and mapped.dtype == np.uint8:
+                return cls._from_mapped(mapped[..., :3], preview_size, path)
+            spooled = _spool_tiff_segments(path, max_resident_pixels)
+            if spooled is not None:
+                image = cls._from_mapped(spooled[0], preview_size, path)
+                image._spool_cleanup = weakref.finalize(image, _remove_spool, spooled[1])
+                return image
+
+        with _pil_pixel_limit(LARGE_IMAGE_MAX_PIXELS):
+            with Image.open(path) as header:
+                width, height = header.size
+
+            if width * height <= max_resident_pixels:
+                array = cv2.imread(path)
+                if array is None:
+                    raise ValueError("Failed to load image")
+                return cls(width, height, _fit_preview(array, preview_size), array=array, path=path)
+
+            preview = _decode_preview(path, preview_size)
+        return cls(width, height, preview, path=path, spool_source=path)
+
+    @classmethod
+    def from_array(cls, array, preview_size=(1260, 960)):
+        """Wrap an in-memory BGR array"""
+        height, width = array.shape[:2]
+        return cls(width, height, _fit_preview(array, preview_size), array=array)
+
+    @classmethod
+    def _from_mapped(cls, mapped, preview_size, path):
+        if mapped.ndim != 3 or mapped.shape[2] != 3 or mapped.dtype != np.uint8:
+            raise ValueError(f"Expected an (H, W, 3) uint8 array, got {mapped.shape} {mapped.dtype}")
+        height, width = mapped.shape[:2]
+        step = max(1, int(max(width / preview_size[0], height / preview_size[1])))
+        preview = _strided_read(mapped, step)
+        return cls(width, height, _fit_preview(preview, preview_size), mapped=mapped, path=path)
+
+    # -- Pixel access ------------------------------------------------------
+
+    @property
+    def shape(self):
+        return (self.height, self.width, 3)
+
+    def _pixels(self):
+        """Memory-mapped RGB pixels of a non-resident image, spooling compressed files first"""
+        if self._mapped is None:
+            self._mapped, spool_path = _spool_to_npy(self._spool_source)
+            self._spool_cleanup = weakref.finalize(self, _remove_spool, spool_path)
+        return self._mapped
+
+    def read_region(self, x0, y0, x1, y1):
+        """Full-resolution BGR pixels of [x0, x1) x [y0, y1)"""
+        x0, x1 = max(0, int(x0)), min(self.width, int(x1))
+        y0, y1 = max(0, int(y0)), min(self.height, int(y1))
+        if self.resident:
+            return self.array[y0:y1, x0:x1]
+        return np.ascontiguousarray(self._pixels()[y0:y1, x0:x1, ::-1])
+
+    def close(self):
+        """Unmap the pixels and delete the temporary .npy of a spooled image"""
+        self._mapped = None
+        if self._spool_cleanup is not None:
+            self._spool_cleanup()
+
+    def pixel(self, x, y):
+        """RGB tuple of one full-resolution pixel"""
+        b, g, r = self.read_region(x, y, x + 1, y + 1)[0, 0]
+        return int(r), int(g), int(b)
+
+    def iter_bands(self, band_height=DEFAULT_BAND_HEIGHT):
+        """Yield (y0, BGR band) over the full image, releasing mapped pages as it goes"""
+        for y0 in range(0, self.height, band_height):
+            yield y0, self.read_region(0, y0, self.width, y0 + band_height)
+            if not self.resident:
+                _release_pages(self._mapped)
+
+    def subsample(self, target_pixels=DEFAULT_SUBSAMPLE_PIXELS):
+        """Roughly `target_pixels` full-resolution BGR pixels on a strided grid"""
+        step = max(1, int(math.sqrt(self.width * self.height / target_pixels)))
+        if self.resident:
+            return self.array[::step, ::step]
+        return _strided_read(self._pixels(), step)
+
+    def sample(self, region, cx=0, cy=0, bounds=None, statistic='mean'):
+        """Sample a region's RGB color (see sampling.IntegralImage.sample)"""
+        if self.resident:
+            # One summed-area table for the whole image, built on first use
+            if self._sampler is None:
+                self._sampler = IntegralImage(self.array)
+            return self._sampler.sample(region, cx, cy, bounds, statistic)
+
+        if region.kind == 'rect':
+            x0, y0, x1, y1 = bounds
+        else:
+            half = region.size + 1
+            x0, y0, x1, y1 = cx - half, cy - half, cx + half + 1, cy + half + 1
+        x0, x1 = sorted((max(0, x0), min(self.width, x1)))
+        y0, y1 = sorted((max(0, y0), min(self.height, y1)))
+
+        if (x1 - x0) * (y1 - y0) > _MAX_WINDOW_PIXELS:
+            return self._streamed_region_stat(x0, y0, x1, y1, statistic)
+
+        window = IntegralImage(self.read_region(x0, y0, x1, y1))
+        local_bounds = None
+        if bounds is not None:
+            local_bounds = (bounds[0] - x0, bounds[1] - y0, bounds[2] - x0, bounds[3] - y0)
+        return window.sample(region, cx - x0, cy - y0, local_bounds, statistic)
+
+    def _streamed_region_stat(self, x0, y0, x1, y1, statistic):
+        if statistic == 'median':
+            # Median of a strided subsample keeps memory bounded
+            step = max(1, int(math.sqrt((x1 - x0) * (y1 - y0) / DEFAULT_SUBSAMPLE_PIXELS)))
+            pixels = _strided_read(self._pixels(), step, x0, y0, x1, y1)
+            b, g, r = np.median(pixels.reshape(-1, 3), axis=0)
+        else:
+            total = np.zeros(3, dtype=np.float64)
+            for y in range(y0, y1, DEFAULT_BAND_HEIGHT):
+                band = self.read_region(x0, y, x1, min(y + DEFAULT_BAND_HEIGHT, y1))
+                total += band.reshape(-1, 3).sum(axis=0, dtype=np.uint64)
+                _release_pages(self._mapped)
+            b, g, r = total / ((x1 - x0) * (y1 - y0))
+        return int(round(r)), int(round(g)), int(round(b))
+
+
+@contextlib.contextmanager
+def _pil_pixel_limit(max_pixels):
+    """Temporarily raise PIL's decompression-bomb limit"""
+    previous = Image.MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        yield
+    finally:
+        Image.MAX_IMAGE_PIXELS = previous
+
+
+def _spool_to_npy(path, band_height=DEFAULT_BAND_HEIGHT):
+    """Decode a compressed image once into a temporary RGB .npy; returns (memory map, .npy path)
+
+    The whole frame is decoded in memory first: neither OpenCV nor PIL can
+    decode JPEG or PNG by region.
+    """
+    bgr = cv2.imread(path)
+    if bgr is None:
+        raise ValueError("Failed to load image")
+
+    def fill(spool):
+        for y in range(0, bgr.shape[0], band_height):
+            spool[y:y + band_height] = bgr[y:y + band_height, :, ::-1]
+
+    return _write_spool(bgr.shape, fill)
+
+
+def _spool_tiff_segments(path, max_resident_pixels):
+    """Decode a compressed RGB TIFF strip by strip into a temporary .npy.
+
+    Returns (memory map, .npy path), or None when the first page is small
+    enough to decode in memory or is not chunky 8-bit RGB(A).
+    """
+    with tifffile.TiffFile(path) as tif:
+        page = tif.pages[0]
+        shape = page.shape
+        if (len(shape) != 3 or shape[2] not in (3, 4) or page.dtype != np.uint8
+                or shape[0] * shape[1] <= max_resident_pixels):
+            return None
+        height, width = shape[:2]
+
+        def fill(spool):
+            # One strip or tile in memory at a time; edge tiles come back padded
+            for segment, (_, _, y, x, _), _ in page.segments(maxworkers=1, buffersize=_SEGMENT_BUFFER_BYTES):
+                if x == 0:
+                    _release_pages(spool)  # written rows stay in the page cache
+                if segment is None:
+                    continue  # missing tile, left black
+                rows, cols = min(segment.shape[1], height - y), min(segment.shape[2], width - x)
+                spool[y:y + rows, x:x + cols] = segment[0, :rows, :cols, :3]
+
+        return _write_spool((height, width, 3), fill)
+
+
+def _write_spool(shape, fill):
+    """Create a temporary RGB .npy of `shape`, let `fill(memmap)` write it, reopen read-only"""
+    fd, spool_path = tempfile.mkstemp(prefix='large_image_', suffix='.npy')
+    os.close(fd)
+    try:
+        spool = np.lib.format.open_memmap(spool_path, mode='w+', dtype=np.uint8, shape=shape)
+        fill(spool)
+        spool.flush()
+        del spool
+        return np.load(spool_path, mmap_mode='r'), spool_path
+    except BaseException:
+        _remove_spool(spool_path)
+        raise
+
+
+def _remove_spool(spool_path):
+    try:
+        os.remove(spool_path)
+    except OSError:
+        pass  # still mapped (Windows); the temp directory is cleaned up eventually
+
+
+def _fit_preview(bgr, preview_size):
+    h, w = bgr.shape[:2]
+    scale = min(preview_size[0] / w, preview_size[1] / h, 1.0)
+    if scale >= 1.0:
+        return bgr
+    size = (max(1, int(w * scale)), max(1, int(h * scale)))
+    return cv2.resize(bgr, size, interpolation=cv2.INTER_AREA)
+
+
+def _decode_preview(path, preview_size):
+    """Reduced-resolution decode: JPEG DCT scaling via PIL draft, else reduced OpenCV decode"""
+    with Image.open(path) as image:
+        if image.format == 'JPEG':
+            image.draft('RGB', preview_size)
+            image = image.convert('RGB')
+            image.thumbnail(preview_size)
+            return cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
+        width, height = image.size
+
+    factor = max(width / preview_size[0], height / preview_size[1])
+    flag = cv2.IMREAD_COLOR
+    for reduction, reduced_flag in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                    (2, cv2.IMREAD_REDUCED_COLOR_2)):
+        if factor >= reduction:
+            flag = reduced_flag
+            break
+    preview = cv2.imread(path, flag)
+    if preview is None:
+        raise ValueError("Failed to load image")
+    return _fit_preview(preview, preview_size)
+
+
+def _strided_read(mapped, step, x0=0, y0=0, x1=None, y1=None, band_height=DEFAULT_BAND_HEIGHT):
+    """BGR copy of every `step`-th pixel of (a window of) a mapped RGB image.
+
+    Page faults map whole neighbourhoods of the file, so even a strided read
+    would end up with most of it resident; releasing pages after each band
+    keeps RSS bounded.
+    """
+    y1 = mapped.shape[0] if y1 is None else y1
+    x1 = mapped.shape[1] if x1 is None else x1
+    rows_per_band = max(1, band_height // step) * step
+    bands = []
+    for y in range(y0, y1, rows_per_band):
+        bands.append(np.ascontiguousarray(mapped[y:min(y + rows_per_band, y1):step, x0:x1:step, ::-1]))
+        _release_pages(mapped)
+    return np.concatenate(bands)
+
+
+def _release_pages(mapped):
+    """Drop the resident pages of a memory map (they are re-read from disk if needed)"""
+    mm = getattr(mapped, '_mmap', None)
+    if mm is None:
+        base = getattr(mapped, 'base', None)
+        mm = getattr(base, '_mmap', None) if base is not None else None
+    if mm is not None and hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_DONTNEED'):
+        try:
+            mm.madvise(mmap.MADV_DONTNEED)
+        except (OSError, ValueError):
+            pass
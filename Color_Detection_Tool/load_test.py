@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+"""Load test for color_service.py: requests/sec and latency percentiles.
+
+Opens --concurrency keep-alive connections to the service and sends
+--requests requests in total. Usage:
+    python color_service.py &
+    python load_test.py --concurrency 32 --requests 5000 --pixels 64
+    python load_test.py --image photo.jpg --requests 200 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from color_service import DEFAULT_PORT
+
+
+class Connection:
+    """Minimal keep-alive HTTP/1.1 client for one connection"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=b'', content_type='application/json'):
+        """(status, parsed JSON body)"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n")
+        self.writer.write(head.encode('latin-1') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        parts = status_line.split()
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise ValueError(f"Malformed status line: {status_line!r}")
+        status = int(parts[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+async def run(args):
+    if args.image:
+        with open(args.image, 'rb') as f:
+            body = f.read()
+        path, content_type = f"/image?palette={args.palette}", 'application/octet-stream'
+        bodies = [body]
+    else:
+        path, content_type = '/colors', 'application/json'
+        rng = random.Random(0)
+        # A few distinct payloads so requests are not all identical
+        bodies = [json.dumps({'pixels': [[rng.randrange(256) for _ in range(3)] for _ in range(args.pixels)]})
+                  .encode('utf-8') for _ in range(16)]
+
+    remaining = args.requests
+    latencies = []
+    errors = 0
+
+    async def client(index):
+        nonlocal remaining, errors
+        connection = Connection(args.host, args.port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                body = bodies[(remaining + index) % len(bodies)]
+                start = time.perf_counter()
+                try:
+                    status, _ = await connection.request('POST', path, body, content_type)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    status = None
+                    connection.close()
+                latencies.append((time.perf_counter() - start) * 1000)
+                if status != 200:
+                    errors += 1
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    health_connection = Connection(args.host, args.port)
+    try:
+        _, health = await health_connection.request('GET', '/health')
+    finally:
+        health_connection.close()
+
+    return {
+        'endpoint': path,
+        'requests': len(latencies),
+        'concurrency': args.concurrency,
+        'pixels_per_request': None if args.image else args.pixels,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'max': round(max(latencies, default=0.0), 2),
+        },
+        'server': health,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the local color service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--concurrency', type=int, default=32, help="Concurrent keep-alive connections")
+    parser.add_argument('--requests', type=int, default=2000, help="Total requests to send")
+    parser.add_argument('--pixels', type=int, default=64, help="Pixels per /colors request")
+    parser.add_argument('--image', help="POST this image file to /image instead of pixels to /colors")
+    parser.add_argument('--palette', type=int, default=5, help="Palette size for --image")
+    parser.add_argument('--json', help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        result = asyncio.run(run(args))
+    except OSError as e:
+        print(f"❌ Cannot reach the service at {args.host}:{args.port}: {e}")
+        return 1
+
+    latency = result['latency_ms']
+    server = result['server']
+    print(f"📊 {result['requests']} requests to {result['endpoint']} "
+          f"({result['concurrency']} connections) in {result['seconds']:.2f}s")
+    print(f"   {result['requests_per_sec']:.1f} requests/sec, {result['errors']} errors")
+    print(f"   latency p50 {latency['p50']:.2f} ms, p95 {latency['p95']:.2f} ms, "
+          f"p99 {latency['p99']:.2f} ms, max {latency['max']:.2f} ms")
+    if server.get('batches'):
+        print(f"   server: {server['requests'] / server['batches']:.1f} /colors requests per batch")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Per-stage timers, rolling FPS and latency percentiles for the detection pipeline.
+
+Instrumentation is opt-in: code paths hold a PipelineMetrics or None and only
+time a stage when it is set, so disabled metrics cost one attribute check.
+"""
+
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Samples kept per stage (and frame timestamps kept for FPS) by default
+DEFAULT_WINDOW = 300
+
+PERCENTILES = (50, 95, 99)
+
+
+class PipelineMetrics:
+    """Rolling per-stage durations, frame rate, counters and gauges.
+
+    Each stage keeps its last `window` durations (all of them with
+    window=None), so percentiles track recent behaviour, plus a running
+    count and sum of every sample for the cumulative export. `counters` only
+    ever grow (frames, drops, cache hits); `gauges` are values that can also
+    go down (cache size). Safe to record from the capture, processing and Tk
+    threads at once.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, clock=time.perf_counter):
+        self.window = window
+        self.clock = clock
+        self._stages = defaultdict(lambda: deque(maxlen=window))
+        self._totals = defaultdict(lambda: [0, 0.0])
+        self._frame_times = deque(maxlen=window)
+        self.counters = defaultdict(int)
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        """Add one duration (seconds) for a stage; usable as an on_stage callback"""
+        with self._lock:
+            self._stages[stage].append(seconds)
+            totals = self._totals[stage]
+            totals[0] += 1
+            totals[1] += seconds
+
+    @contextmanager
+    def time(self, stage):
+        """Time the enclosed block as one sample of `stage`"""
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.record(stage, self.clock() - start)
+
+    def frame(self):
+        """Mark one displayed frame (drives the FPS estimate)"""
+        with self._lock:
+            self._frame_times.append(self.clock())
+            self.counters['frames'] += 1
+
+    def set_counter(self, name, value):
+        """Set a cumulative count (exported as a Prometheus counter)"""
+        self.counters[name] = value
+
+    def set_gauge(self, name, value):
+        """Set a value that can go up and down"""
+        self.gauges[name] = value
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._totals.clear()
+            self._frame_times.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+    @property
+    def fps(self):
+        """Frames per second over the recent window"""
+        with self._lock:
+            times = list(self._frame_times)
+        if len(times) < 2 or times[-1] == times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def summary(self):
+        """{stage: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}"""
+        with self._lock:
+            stages = {name: list(values) for name, values in self._stages.items()}
+        result = {}
+        for name, values in stages.items():
+            if not values:
+                continue
+            ms = np.asarray(values) * 1000
+            stats = {'count': len(ms), 'mean_ms': round(float(ms.mean()), 3)}
+            for p, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+                stats[f'p{p}_ms'] = round(float(value), 3)
+            stats['max_ms'] = round(float(ms.max()), 3)
+            result[name] = stats
+        return result
+
+    def totals(self):
+        """{stage: {count, sum_s}} over every sample since creation or reset()"""
+        with self._lock:
+            return {name: {'count': count, 'sum_s': round(total, 6)}
+                    for name, (count, total) in self._totals.items()}
+
+    def snapshot(self):
+        """Everything in one JSON-serialisable dict"""
+        return {
+            'fps': round(self.fps, 2),
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+            'stages': self.summary(),
+            'totals': self.totals(),
+        }
+
+    def status_text(self, stages=('total',)):
+        """Short status-bar summary: FPS, p95 of the given stages and dropped frames"""
+        summary = self.summary()
+        parts = [f"{self.fps:.1f} FPS"]
+        for name in stages:
+            if name in summary:
+                parts.append(f"{name} p95 {summary[name]['p95_ms']:.1f} ms")
+        if self.counters.get('frames_dropped'):
+            parts.append(f"dropped {self.counters['frames_dropped']}")
+        return " | ".join(parts)
+
+    def to_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def to_prometheus(self, prefix='color_detection'):
+        """Prometheus text exposition format (summaries in seconds, counters and gauges)
+
+        Quantiles come from the recent window; the summaries' _sum and _count
+        are running totals, so rate() over them is meaningful.
+        """
+        lines = [
+            f"# HELP {prefix}_fps Frames per second over the recent window",
+            f"# TYPE {prefix}_fps gauge",
+            f"{prefix}_fps {self.fps:.3f}",
+        ]
+        for name, value in sorted(self.counters.items()):
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+        for name, value in sorted(self.gauges.items()):
+            lines += [f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name} {value}"]
+
+        metric = f"{prefix}_stage_seconds"
+        lines += [f"# HELP {metric} Per-stage duration (quantiles over the recent window)",
+                  f"# TYPE {metric} summary"]
+        summary = self.summary()
+        for name, totals in sorted(self.totals().items()):
+            stats = summary.get(name)
+            if stats:
+                for p in PERCENTILES:
+                    lines.append(f'{metric}{{stage="{name}",quantile="{p / 100:g}"}} {stats[f"p{p}_ms"] / 1000:.6f}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {totals["sum_s"]:.6f}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {totals["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write JSON, or Prometheus text for .prom/.txt paths"""
+        if path.endswith(('.prom', '.txt')):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+        else:
+            self.to_json(path)
@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+"""Run several frame sources concurrently and sample colors per stream.
+
+Each source gets its own capture thread; frames are processed on one
+shared worker pool (OpenCV releases the GIL, so the pool uses several
+cores). Usage:
+    python multi_stream.py --sources 0 1 2                    # camera grid window
+    python multi_stream.py --sources a.mp4 b.mp4 --headless --seconds 10
+    python multi_stream.py --sources synthetic --scale 8      # CPU scaling, 1..8 streams
+
+File and synthetic sources are paced at their nominal frame rate, like
+cameras, so scaling runs measure the cost of N live streams; --unpaced reads
+them as fast as possible instead (capture threads then spin and inflate the
+CPU numbers).
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from camera_pipeline import DropOldQueue
+from display import DisplayRenderer
+from frame_processing import CameraFrameProcessor
+from frame_sources import open_source
+
+# Size of each cell in the grid window
+CELL_WIDTH, CELL_HEIGHT = 320, 240
+
+GRID_RENDER_INTERVAL_MS = 15
+
+
+class Stream:
+    """One frame source with its own processor and latest-result slot"""
+
+    def __init__(self, name, source, processor):
+        self.name = name
+        self.source = source
+        self.processor = processor
+        self.results = DropOldQueue(1)
+        self.frames_captured = 0
+        self.frames_processed = 0
+        # Frames skipped because the previous one was still being processed
+        self.frames_skipped = 0
+        self.error = None
+        # Held while a frame of this stream is in the pool, so one stream's
+        # frames are processed in order and never pile up
+        self._in_flight = threading.Lock()
+
+    @property
+    def frames_dropped(self):
+        return self.frames_skipped + self.results.dropped
+
+
+class StreamManager:
+    """Capture thread per stream, shared ThreadPoolExecutor for processing.
+
+    `streams` is a list of Stream. A capture thread hands a frame to the
+    pool only when its stream has none in flight; otherwise the frame is
+    dropped, so slow processing lowers the per-stream frame rate instead of
+    adding latency. Results are fetched from the UI thread with poll().
+    """
+
+    def __init__(self, streams, workers=None):
+        self.streams = streams
+        self.workers = workers or min(len(streams), os.cpu_count() or 1)
+        self._pool = None
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    @classmethod
+    def from_specs(cls, specs, make_processor, loop=True, realtime=True, workers=None):
+        """Open each source spec (see frame_sources.open_source)"""
+        streams = []
+        for spec in specs:
+            source = open_source(spec, loop=loop, realtime=realtime)
+            if not source.isOpened():
+                for stream in streams:
+                    stream.source.release()
+                raise ValueError(f"Cannot open frame source: {spec}")
+            streams.append(Stream(str(spec), source, make_processor()))
+        return cls(streams, workers)
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self):
+        self._stop_event.clear()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stream-worker")
+        self._threads = [threading.Thread(target=self._capture_loop, args=(stream,),
+                                          name=f"stream-capture-{i}", daemon=True)
+                         for i, stream in enumerate(self.streams)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop capturing, finish the frames in flight and shut the pool down.
+
+        Each capture thread releases its own source once it has stopped
+        reading; returns True if they all exited within `timeout`.
+        """
+        self._stop_event.set()
+        if not self._threads:
+            # Never started: nothing else will release the sources
+            for stream in self.streams:
+                stream.source.release()
+        for thread in self._threads:
+            thread.join(timeout)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        return not self.running
+
+    def poll(self):
+        """{stream index: latest new result} for streams with something new"""
+        results = {}
+        for i, stream in enumerate(self.streams):
+            result = stream.results.get_nowait()
+            if result is not None:
+                results[i] = result
+        return results
+
+    def stats(self):
+        return [{
+            'name': stream.name,
+            'captured': stream.frames_captured,
+            'processed': stream.frames_processed,
+            'skipped': stream.frames_skipped,
+            'dropped': stream.frames_dropped,
+            'error': stream.error,
+        } for stream in self.streams]
+
+    def _capture_loop(self, stream):
+        try:
+            while not self._stop_event.is_set():
+                ret, frame = stream.source.read()
+                if not ret:
+                    stream.error = "Source stopped delivering frames"
+                    break
+                stream.frames_captured += 1
+                if not stream._in_flight.acquire(blocking=False):
+                    stream.frames_skipped += 1
+                    continue
+                try:
+                    self._pool.submit(self._process, stream, frame)
+                except RuntimeError:  # pool shut down while stopping
+                    stream._in_flight.release()
+                    break
+        except Exception as e:
+            stream.error = f"Capture failed: {e}"
+        finally:
+            stream.source.release()
+
+    @staticmethod
+    def _process(stream, frame):
+        try:
+            stream.results.put(stream.processor.process(frame))
+            stream.frames_processed += 1
+        except Exception as e:
+            stream.error = f"Processing failed: {e}"
+        finally:
+            stream._in_flight.release()
+
+
+def run_grid(manager, namer, columns=None):
+    """Tk window showing every stream in a grid with its sampled color"""
+    import tkinter as tk
+
+    root = tk.Tk()
+    root.title("🎨 Color Detection - Camera Grid")
+    root.configure(bg='#f0f0f0')
+    columns = columns or math.ceil(math.sqrt(len(manager.streams)))
+
+    cells = []
+    for i, stream in enumerate(manager.streams):
+        frame = tk.LabelFrame(root, text=stream.name, font=('Arial', 10, 'bold'), bg='#f0f0f0')
+        frame.grid(row=i // columns, column=i % columns, padx=5, pady=5)
+        # Fixed-size holder, like the main window's image frame
+        holder = tk.Frame(frame, bg='white', width=CELL_WIDTH, height=CELL_HEIGHT)
+        holder.pack(padx=5, pady=5)
+        holder.pack_propagate(False)
+        image_label = tk.Label(holder, bg='white')
+        image_label.place(relx=0.5, rely=0.5, anchor='center')
+        info = tk.Frame(frame, bg='#f0f0f0')
+        info.pack(fill=tk.X, padx=5, pady=(0, 5))
+        swatch = tk.Label(info, text="", width=3, relief=tk.RAISED, bg='white')
+        swatch.pack(side=tk.LEFT)
+        text = tk.StringVar(value="Waiting for frames...")
+        tk.Label(info, textvariable=text, font=('Arial', 9), bg='#f0f0f0', anchor='w').pack(side=tk.LEFT, padx=5)
+        cells.append((image_label, swatch, text, stream.processor.renderer))
+
+    status_var = tk.StringVar(value="")
+    tk.Label(root, textvariable=status_var, relief=tk.SUNKEN, anchor=tk.W, font=('Arial', 10),
+             bg='#e0e0e0').grid(row=math.ceil(len(cells) / columns), column=0, columnspan=columns, sticky='we')
+
+    start = time.perf_counter()
+
+    def render():
+        for i, result in manager.poll().items():
+            image_label, swatch, text, renderer = cells[i]
+            info = namer.lookup(result.rgb_color)
+            swatch.config(bg=info.hex)
+            text.set(f"{info.name} {info.hex.upper()}{'' if result.stable else ' ...'}")
+            renderer.show(image_label, result.display_frame)
+        elapsed = time.perf_counter() - start
+        processed = sum(s['processed'] for s in manager.stats())
+        status_var.set(f"{len(cells)} streams, {manager.workers} workers - {processed / elapsed:.1f} frames/s total")
+        root.after(GRID_RENDER_INTERVAL_MS, render)
+
+    def on_closing():
+        manager.stop()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", on_closing)
+    root.after(0, render)
+    manager.start()
+    root.mainloop()
+
+
+def measure(manager, seconds):
+    """Run headless for `seconds`; returns throughput and CPU use"""
+    cpu_start, start = time.process_time(), time.perf_counter()
+    manager.start()
+    time.sleep(seconds)
+    # Drain the result slots like a UI would
+    manager.poll()
+    manager.stop()
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    stats = manager.stats()
+    processed = sum(s['processed'] for s in stats)
+    return {
+        'streams': len(stats),
+        'workers': manager.workers,
+        'seconds': round(wall, 3),
+        'fps_total': round(processed / wall, 2),
+        'fps_per_stream': round(processed / wall / len(stats), 2),
+        'cpu_cores': round(cpu / wall, 2),
+        'skipped': sum(s['skipped'] for s in stats),
+        'per_stream': stats,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent multi-camera color detection")
+    parser.add_argument('--sources', nargs='+', default=['synthetic'],
+                        help="Frame sources: webcam indexes, video files, image folders or 'synthetic[:WxH]'")
+    parser.add_argument('--workers', type=int, help="Processing threads shared by all streams "
+                                                    "(default: one per stream, up to the CPU count)")
+    parser.add_argument('--headless', action='store_true', help="No window; print per-stream throughput")
+    parser.add_argument('--seconds', type=float, default=5.0, help="Headless/scaling run length per measurement")
+    parser.add_argument('--scale', type=int, metavar='N',
+                        help="Measure CPU scaling with 1..N streams (sources are reused round-robin)")
+    parser.add_argument('--unpaced', action='store_true',
+                        help="Headless/scaling: read file/synthetic sources as fast as possible instead of "
+                             "at their frame rate (busy capture threads skew the CPU numbers)")
+    parser.add_argument('--json', help="Write the headless/scaling results to this JSON file")
+    args = parser.parse_args(argv)
+
+    def make_processor():
+        return CameraFrameProcessor(renderer=DisplayRenderer(CELL_WIDTH, CELL_HEIGHT))
+
+    if not args.headless and not args.scale:
+        from color_info import ColorInfoCache
+        from color_lut import ColorLUT
+        manager = StreamManager.from_specs(args.sources, make_processor, workers=args.workers)
+        run_grid(manager, ColorInfoCache(ColorLUT.load_or_build()))
+        return 0
+
+    counts = range(1, args.scale + 1) if args.scale else [len(args.sources)]
+    results = []
+    print(f"{'streams':>8}{'workers':>9}{'total FPS':>11}{'FPS/stream':>12}{'CPU cores':>11}{'skipped':>9}")
+    for count in counts:
+        specs = [args.sources[i % len(args.sources)] for i in range(count)]
+        manager = StreamManager.from_specs(specs, make_processor, realtime=not args.unpaced,
+                                           workers=args.workers)
+        result = measure(manager, args.seconds)
+        result['paced'] = not args.unpaced
+        results.append(result)
+        print(f"{result['streams']:>8}{result['workers']:>9}{result['fps_total']:>11.1f}"
+              f"{result['fps_per_stream']:>12.1f}{result['cpu_cores']:>11.2f}{result['skipped']:>9}")
+        for stream in result['per_stream']:
+            if stream['error']:
+                print(f"  ⚠️ {stream['name']}: {stream['error']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Dominant color (palette) extraction"""
+
+import math
+
+import numpy as np
+
+from color_names import ColorNamer
+
+# Pixels kept after subsampling; plenty for stable palettes, cheap for any image size
+DEFAULT_SAMPLE_SIZE = 50000
+
+_default_namer = None
+
+
+def subsample_pixels(image, sample_size=DEFAULT_SAMPLE_SIZE, bgr=True):
+    """Return roughly `sample_size` RGB pixels from an (H, W, 3) image as (N, 3) uint8.
+
+    Uses a strided grid, so only the sampled pixels are ever copied.
+    """
+    image = np.asarray(image)
+    h, w = image.shape[:2]
+    step = max(1, int(math.sqrt(h * w / sample_size)))
+    pixels = image[::step, ::step].reshape(-1, 3)
+    return pixels[:, ::-1] if bgr else pixels
+
+
+def _check_clusters(points, k):
+    if k < 1:
+        raise ValueError(f"Number of colors must be at least 1, got {k}")
+    if len(points) == 0:
+        raise ValueError("No pixels to cluster")
+
+
+def _nearest_center(points, centers):
+    # |p|^2 is constant per row, so it does not affect the argmin
+    distances = (centers ** 2).sum(axis=1) - 2 * (points @ centers.T)
+    return distances.argmin(axis=1)
+
+
+def _kmeans_plus_plus(points, k, rng):
+    centers = np.empty((k, 3), dtype=np.float32)
+    centers[0] = points[rng.integers(len(points))]
+    closest = ((points - centers[0]) ** 2).sum(axis=1)
+    for i in range(1, k):
+        total = closest.sum()
+        if total > 0:
+            index = rng.choice(len(points), p=closest / total)
+        else:
+            index = rng.integers(len(points))
+        centers[i] = points[index]
+        closest = np.minimum(closest, ((points - centers[i]) ** 2).sum(axis=1))
+    return centers
+
+
+def minibatch_kmeans(points, k, iterations=50, batch_size=2048, seed=0):
+    """Mini-batch k-means (Sculley 2010) on (N, 3) points; returns (k, 3) centers"""
+    points = np.asarray(points, dtype=np.float32)
+    _check_clusters(points, k)
+    rng = np.random.default_rng(seed)
+    k = min(k, len(points))
+    centers = _kmeans_plus_plus(points, k, rng)
+    seen = np.zeros(k)
+
+    for _ in range(iterations):
+        batch = points[rng.integers(0, len(points), min(batch_size, len(points)))]
+        labels = _nearest_center(batch, centers)
+        batch_counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=batch[:, c], minlength=k) for c in range(3)], axis=1)
+
+        updated = batch_counts > 0
+        seen[updated] += batch_counts[updated]
+        # Per-center learning rate decays with the number of points it has seen
+        rate = (batch_counts[updated] / seen[updated])[:, None]
+        batch_means = sums[updated] / batch_counts[updated][:, None]
+        centers[updated] += (rate * (batch_means - centers[updated])).astype(np.float32)
+
+    return centers
+
+
+def median_cut(points, k, bits=5):
+    """Median cut over a quantized uint8 color histogram; returns (k, 3) centers"""
+    points = np.asarray(points, dtype=np.uint8)
+    _check_clusters(points, k)
+    shift = 8 - bits
+    q = (points >> shift).astype(np.int64)
+    size = 1 << bits
+    bins = (q[:, 0] * size + q[:, 1]) * size + q[:, 2]
+
+    counts = np.bincount(bins, minlength=size ** 3)
+    sums = np.stack([np.bincount(bins, weights=points[:, c], minlength=size ** 3) for c in range(3)], axis=1)
+    occupied = np.flatnonzero(counts)
+    coords = np.stack([occupied // (size * size), (occupied // size) % size, occupied % size], axis=1)
+    weights = counts[occupied]
+
+    boxes = [np.arange(len(occupied))]
+    while len(boxes) < k:
+        # Split the box with the widest channel range
+        ranges = [np.ptp(coords[box], axis=0).max() if len(box) > 1 else -1 for box in boxes]
+        widest = int(np.argmax(ranges))
+        if ranges[widest] <= 0:
+            break
+        box = boxes.pop(widest)
+        channel = int(np.argmax(np.ptp(coords[box], axis=0)))
+        box = box[np.argsort(coords[box, channel], kind='stable')]
+        cumulative = np.cumsum(weights[box])
+        split = int(np.searchsorted(cumulative, cumulative[-1] / 2))
+        split = min(max(split, 1), len(box) - 1)
+        boxes.extend([box[:split], box[split:]])
+
+    return np.array([sums[occupied[box]].sum(axis=0) / weights[box].sum() for box in boxes],
+                    dtype=np.float32)
+
+
+def extract_palette(image, n_colors=5, method='kmeans', bgr=True,
+                    sample_size=DEFAULT_SAMPLE_SIZE, namer=None, seed=0):
+    """Return the `n_colors` dominant colors of an image, most common first.
+
+    Each entry is a dict with 'rgb', 'hex', 'share' (fraction of sampled
+    pixels) and 'name'. `method` is 'kmeans' (mini-batch k-means) or
+    'median_cut'. `namer` is any object with a name(rgb) method, e.g. a
+    ColorLUT or PerceptualMatcher; the basic palette is used by default.
+    An empty image has an empty palette.
+    """
+    global _default_namer
+    if n_colors < 1:
+        raise ValueError(f"Number of colors must be at least 1, got {n_colors}")
+    if namer is None:
+        if _default_namer is None:
+            _default_namer = ColorNamer()
+        namer = _default_namer
+
+    pixels = subsample_pixels(image, sample_size, bgr)
+    if len(pixels) == 0:
+        return []
+    if method == 'kmeans':
+        centers = minibatch_kmeans(pixels, n_colors, seed=seed)
+    elif method == 'median_cut':
+        centers = median_cut(pixels, n_colors)
+    else:
+        raise ValueError(f"Unknown palette method: {method}")
+
+    # Final assignment over the whole sample gives shares and refined means
+    labels = _nearest_center(pixels.astype(np.float32), centers)
+    counts = np.bincount(labels, minlength=len(centers))
+    sums = np.stack([np.bincount(labels, weights=pixels[:, c], minlength=len(centers)) for c in range(3)], axis=1)
+
+    palette = []
+    for index in np.argsort(counts)[::-1]:
+        if counts[index] == 0:
+            continue
+        r, g, b = (int(round(v)) for v in sums[index] / counts[index])
+        palette.append({
+            'rgb': (r, g, b),
+            'hex': f"#{r:02x}{g:02x}{b:02x}",
+            'share': float(counts[index]) / len(labels),
+            'name': namer.name((r, g, b)),
+        })
+    return palette
@@ -0,0 +1,236 @@
+"""Perceptual (CIELAB / CIEDE2000) color matching over large palettes"""
+
+import csv
+
+import numpy as np
+
+from color_names import css3_colors
+
+# sRGB (D65) -> XYZ
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+], dtype=np.float64)
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+# Upper bound on pixel x palette distance entries held in memory by the fallback search
+_BRUTE_FORCE_BLOCK = 1 << 22
+
+
+def rgb_to_lab(rgb):
+    """Convert sRGB values in 0-255 (last axis = channels) to CIELAB"""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    xyz = (linear @ _RGB_TO_XYZ.T) / _D65_WHITE
+
+    eps = (6 / 29) ** 3
+    f = np.where(xyz > eps, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    lab = np.empty_like(f)
+    lab[..., 0] = 116 * f[..., 1] - 16
+    lab[..., 1] = 500 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200 * (f[..., 1] - f[..., 2])
+    return lab
+
+
+def delta_e_2000(lab1, lab2):
+    """CIEDE2000 color difference, broadcasting over leading axes"""
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    c_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    c_bar7 = c_bar ** 7
+    g = 0.5 * (1 - np.sqrt(c_bar7 / (c_bar7 + 25 ** 7)))
+    a1p, a2p = (1 + g) * a1, (1 + g) * a2
+    c1p, c2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    chroma_product = c1p * c2p
+    dh = h2p - h1p
+    dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+    dh = np.where(chroma_product == 0, 0, dh)
+
+    dL = L2 - L1
+    dC = c2p - c1p
+    dH = 2 * np.sqrt(chroma_product) * np.sin(np.radians(dh) / 2)
+
+    L_bar = (L1 + L2) / 2
+    cp_bar = (c1p + c2p) / 2
+    h_sum = h1p + h2p
+    h_bar = np.where(np.abs(h1p - h2p) <= 180, h_sum / 2,
+                     np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2))
+    h_bar = np.where(chroma_product == 0, h_sum, h_bar)
+
+    t = (1 - 0.17 * np.cos(np.radians(h_bar - 30))
+         + 0.24 * np.cos(np.radians(2 * h_bar))
+         + 0.32 * np.cos(np.radians(3 * h_bar + 6))
+         - 0.20 * np.cos(np.radians(4 * h_bar - 63)))
+    d_theta = 30 * np.exp(-((h_bar - 275) / 25) ** 2)
+    cp_bar7 = cp_bar ** 7
+    r_c = 2 * np.sqrt(cp_bar7 / (cp_bar7 + 25 ** 7))
+    s_l = 1 + 0.015 * (L_bar - 50) ** 2 / np.sqrt(20 + (L_bar - 50) ** 2)
+    s_c = 1 + 0.045 * cp_bar
+    s_h = 1 + 0.015 * cp_bar * t
+    r_t = -np.sin(np.radians(2 * d_theta)) * r_c
+
+    dL, dC, dH = dL / s_l, dC / s_c, dH / s_h
+    return np.sqrt(dL ** 2 + dC ** 2 + dH ** 2 + r_t * dC * dH)
+
+
+def css4_palette():
+    """CSS Color Module Level 4 named colors"""
+    palette = css3_colors()
+    # The only name CSS4 added on top of CSS3
+    palette['Rebeccapurple'] = (102, 51, 153)
+    return palette
+
+
+def xkcd_palette():
+    """The ~950 XKCD color survey names (requires matplotlib)"""
+    try:
+        from matplotlib._color_data import XKCD_COLORS
+    except ImportError:
+        raise ImportError("xkcd_palette requires matplotlib: pip install matplotlib "
+                          "(or load the survey's rgb.txt with load_palette_csv)")
+    return {name[len('xkcd:'):].title(): _parse_hex(value)
+            for name, value in XKCD_COLORS.items()}
+
+
+def named_palette(spec):
+    """{name: (r, g, b)} for 'css3', 'css4', 'xkcd' or the path of a palette CSV"""
+    if spec == 'css3':
+        return css3_colors()
+    if spec == 'css4':
+        return css4_palette()
+    if spec == 'xkcd':
+        return xkcd_palette()
+    return load_palette_csv(spec)
+
+
+def load_palette_csv(path, delimiter=None):
+    """Load a palette file with rows of `name,#hex` or `name,r,g,b`.
+
+    Header and comment rows are skipped. When no delimiter is given the first
+    of tab, comma or semicolon found in the file is used, so tab-separated
+    files such as the XKCD rgb.txt also load.
+    """
+    palette = {}
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if delimiter is None:
+            sample = f.read(4096)
+            f.seek(0)
+            delimiter = next((d for d in '\t,;' if d in sample), ',')
+
+        for row in csv.reader(f, delimiter=delimiter):
+            row = [cell.strip() for cell in row if cell.strip()]
+            if not row or row[0].startswith('#'):
+                continue
+            try:
+                if len(row) >= 4:
+                    rgb = tuple(int(v) for v in row[1:4])
+                else:
+                    rgb = _parse_hex(row[1])
+            except (IndexError, ValueError):
+                continue  # header or malformed row
+            if all(0 <= v <= 255 for v in rgb):
+                palette[row[0]] = rgb
+
+    if not palette:
+        raise ValueError(f"No colors found in palette file: {path}")
+    return palette
+
+
+def _kd_tree(points):
+    """scipy cKDTree over the points, or None without scipy.
+
+    Imported here rather than at module level: scipy.spatial takes longer
+    to import than everything else the app needs at startup.
+    """
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:  # scipy is optional, a brute-force search is used instead
+        return None
+    return cKDTree(points)
+
+
+def _parse_hex(value):
+    value = value.lstrip('#')
+    if len(value) != 6:
+        raise ValueError(f"Invalid hex color: {value}")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+class PerceptualMatcher:
+    """Nearest named color by CIEDE2000 over an arbitrarily large palette.
+
+    The palette is converted to Lab once and indexed with a KD-tree
+    (scipy.spatial.cKDTree when installed, a blocked brute-force search
+    otherwise). Each query takes the `k` nearest candidates by Euclidean Lab
+    distance and re-ranks them with ΔE2000. Batches are deduplicated first,
+    so a frame costs one lookup per distinct color rather than per pixel.
+    """
+
+    def __init__(self, palette=None, k=8):
+        if palette is None:
+            palette = css4_palette()
+        if not palette:
+            raise ValueError("Palette must contain at least one color")
+
+        self.names = list(palette.keys())
+        self.colors = np.array(list(palette.values()), dtype=np.uint8).reshape(-1, 3)
+        self.lab = rgb_to_lab(self.colors)
+        self.k = max(1, min(k, len(self.names)))
+        self._tree = _kd_tree(self.lab)
+        self._label_dtype = np.uint16 if len(self.names) <= 65536 else np.int32
+
+    def __len__(self):
+        return len(self.names)
+
+    def _candidates(self, lab):
+        """Indices of the k nearest palette entries (Euclidean Lab) per row"""
+        if self._tree is not None:
+            _, idx = self._tree.query(lab, k=self.k)
+            return idx.reshape(len(lab), self.k)
+
+        palette_sq = (self.lab ** 2).sum(axis=1)
+        block = max(1, _BRUTE_FORCE_BLOCK // len(self.names))
+        idx = np.empty((len(lab), self.k), dtype=np.intp)
+        for start in range(0, len(lab), block):
+            chunk = lab[start:start + block]
+            distances = palette_sq - 2 * (chunk @ self.lab.T)
+            if self.k < len(self.names):
+                idx[start:start + block] = np.argpartition(distances, self.k - 1, axis=1)[:, :self.k]
+            else:
+                idx[start:start + block] = np.arange(self.k)
+        return idx
+
+    def label(self, pixels, bgr=False):
+        """Return the palette index of the perceptually closest color per pixel"""
+        pixels = np.asarray(pixels)
+        if pixels.shape[-1] != 3:
+            raise ValueError(f"Expected 3 color channels, got shape {pixels.shape}")
+
+        flat = pixels.reshape(-1, 3).astype(np.uint32)
+        if bgr:
+            flat = flat[:, ::-1]
+        packed = (flat[:, 0] << 16) | (flat[:, 1] << 8) | flat[:, 2]
+        unique, inverse = np.unique(packed, return_inverse=True)
+
+        unique_rgb = np.stack([(unique >> 16) & 0xFF, (unique >> 8) & 0xFF, unique & 0xFF], axis=1)
+        lab = rgb_to_lab(unique_rgb)
+        candidates = self._candidates(lab)
+        scores = delta_e_2000(lab[:, None, :], self.lab[candidates])
+        best = candidates[np.arange(len(candidates)), scores.argmin(axis=1)]
+
+        return best.astype(self._label_dtype)[inverse].reshape(pixels.shape[:-1])
+
+    def name_image(self, image, bgr=False):
+        """Label an image and return (label index map, names table)"""
+        return self.label(image, bgr=bgr), self.names
+
+    def name(self, rgb_color):
+        """Name a single RGB color"""
+        return self.names[int(self.label(np.asarray(rgb_color).reshape(1, 3))[0])]
@@ -0,0 +1,173 @@
+"""Region-of-interest color sampling backed by an integral image (summed-area table)"""
+
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Largest region whose uint32 sum cannot wrap around (255 * area < 2**32)
+_MAX_EXACT_AREA = (2 ** 32 - 1) // 255
+
+# kind: 'point', 'box' (size = side length), 'circle' (size = radius)
+# or 'rect' (size unused, bounds come from the caller)
+SamplingRegion = namedtuple('SamplingRegion', ['kind', 'size'])
+
+# Presets offered in the GUI
+SAMPLING_PRESETS = {
+    'Single pixel': SamplingRegion('point', 1),
+    '5x5 box': SamplingRegion('box', 5),
+    '11x11 box': SamplingRegion('box', 11),
+    'Circle (20 px)': SamplingRegion('circle', 20),
+    'Drag rectangle': SamplingRegion('rect', 0),
+}
+
+
+class IntegralImage:
+    """Mean color of any axis-aligned box in O(1), circles in O(radius).
+
+    Built once per frame or loaded image with cv2.integral. Sums are kept
+    as 32-bit integers and differenced with wrap-around arithmetic, which is
+    exact for every region up to ~16.8 M pixels. Medians need the actual
+    pixels and are computed directly from the region.
+    """
+
+    def __init__(self, image, bgr=True):
+        self.image = np.asarray(image)
+        self.bgr = bgr
+        self.height, self.width = self.image.shape[:2]
+        self.sat = cv2.integral(self.image, sdepth=cv2.CV_32S).view(np.uint32)
+
+    def _clip_box(self, x0, y0, x1, y1):
+        x0, x1 = sorted((int(x0), int(x1)))
+        y0, y1 = sorted((int(y0), int(y1)))
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width, x1), min(self.height, y1)
+        if x1 <= x0 or y1 <= y0:
+            raise ValueError("Sampling region lies outside the image")
+        return x0, y0, x1, y1
+
+    def _to_rgb(self, color):
+        color = tuple(int(round(float(c))) for c in color)
+        return tuple(reversed(color)) if self.bgr else color
+
+    def box_sum(self, x0, y0, x1, y1):
+        """Per-channel sum over [x0, x1) x [y0, y1) (already clipped)"""
+        sat = self.sat
+        return sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0]
+
+    def rect_mean(self, x0, y0, x1, y1):
+        """Mean RGB color of the rectangle with corners (x0, y0) and (x1, y1), end exclusive"""
+        x0, y0, x1, y1 = self._clip_box(x0, y0, x1, y1)
+        area = (x1 - x0) * (y1 - y0)
+        if area > _MAX_EXACT_AREA:
+            return self._to_rgb(self.image[y0:y1, x0:x1].reshape(-1, 3).mean(axis=0))
+        return self._to_rgb(self.box_sum(x0, y0, x1, y1) / area)
+
+    def box_mean(self, cx, cy, size):
+        """Mean RGB color of a size x size box centered on (cx, cy)"""
+        half = size // 2
+        return self.rect_mean(cx - half, cy - half, cx - half + size, cy - half + size)
+
+    def circle_mean(self, cx, cy, radius):
+        """Mean RGB color of the disc of `radius` around (cx, cy), one row span per row"""
+        dy = np.arange(-radius, radius + 1)
+        half_width = np.floor(np.sqrt(radius * radius - dy * dy)).astype(np.int64)
+        rows = cy + dy
+        x0 = np.clip(cx - half_width, 0, self.width)
+        x1 = np.clip(cx + half_width + 1, 0, self.width)
+        keep = (rows >= 0) & (rows < self.height) & (x1 > x0)
+        if not keep.any():
+            raise ValueError("Sampling region lies outside the image")
+        rows, x0, x1 = rows[keep], x0[keep], x1[keep]
+
+        sat = self.sat
+        spans = sat[rows + 1, x1] - sat[rows, x1] - sat[rows + 1, x0] + sat[rows, x0]
+        return self._to_rgb(spans.sum(axis=0, dtype=np.uint64) / (x1 - x0).sum())
+
+    def region_pixels(self, region, cx, cy, bounds=None):
+        """The (N, 3) pixels covered by a region (used for medians)"""
+        if region.kind == 'circle':
+            r = region.size
+            x0, y0, x1, y1 = self._clip_box(cx - r, cy - r, cx + r + 1, cy + r + 1)
+            yy, xx = np.mgrid[y0:y1, x0:x1]
+            mask = (xx - cx) ** 2 + (yy - cy) ** 2 <= r * r
+            return self.image[y0:y1, x0:x1][mask]
+        x0, y0, x1, y1 = self._region_box(region, cx, cy, bounds)
+        return self.image[y0:y1, x0:x1].reshape(-1, 3)
+
+    def _region_box(self, region, cx, cy, bounds):
+        if region.kind == 'rect':
+            if bounds is None:
+                raise ValueError("A 'rect' region needs bounds")
+            return self._clip_box(*bounds)
+        size = 1 if region.kind == 'point' else region.size
+        half = size // 2
+        return self._clip_box(cx - half, cy - half, cx - half + size, cy - half + size)
+
+    def sample(self, region, cx=0, cy=0, bounds=None, statistic='mean'):
+        """Sample a region's color as an RGB tuple.
+
+        `region` is a SamplingRegion centered on (cx, cy); 'rect' regions use
+        `bounds` = (x0, y0, x1, y1) instead. `statistic` is 'mean' or 'median'.
+        """
+        if statistic == 'median':
+            return self._to_rgb(np.median(self.region_pixels(region, cx, cy, bounds), axis=0))
+        if statistic != 'mean':
+            raise ValueError(f"Unknown statistic: {statistic}")
+
+        if region.kind == 'circle':
+            return self.circle_mean(cx, cy, region.size)
+        return self.rect_mean(*self._region_box(region, cx, cy, bounds))
+
+    def box_means(self, boxes):
+        """Mean RGB colors of many (x0, y0, x1, y1) boxes at once, as an (N, 3) array"""
+        boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        x0 = np.clip(boxes[:, [0, 2]].min(axis=1), 0, self.width)
+        x1 = np.clip(boxes[:, [0, 2]].max(axis=1), 0, self.width)
+        y0 = np.clip(boxes[:, [1, 3]].min(axis=1), 0, self.height)
+        y1 = np.clip(boxes[:, [1, 3]].max(axis=1), 0, self.height)
+        area = (x1 - x0) * (y1 - y0)
+        if (area == 0).any():
+            raise ValueError("Sampling region lies outside the image")
+
+        sat = self.sat
+        sums = sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0]
+        means = sums / area[:, None]
+        return means[:, ::-1] if self.bgr else means
+
+
+def region_bounds(region, cx=0, cy=0, bounds=None):
+    """(x0, y0, x1, y1) box enclosing a region, end exclusive and not clipped to the image"""
+    if region.kind == 'rect':
+        if bounds is None:
+            raise ValueError("A 'rect' region needs bounds")
+        x0, x1 = sorted((int(bounds[0]), int(bounds[2])))
+        y0, y1 = sorted((int(bounds[1]), int(bounds[3])))
+        return x0, y0, x1, y1
+    if region.kind == 'circle':
+        r = region.size
+        return cx - r, cy - r, cx + r + 1, cy + r + 1
+    size = 1 if region.kind == 'point' else region.size
+    half = size // 2
+    return cx - half, cy - half, cx - half + size, cy - half + size
+
+
+def sample_window(image, region, cx=0, cy=0, bounds=None, statistic='mean', bgr=True):
+    """IntegralImage.sample with the summed-area table built over the region's bounding box only.
+
+    For a single region per image (one camera frame, one click) this avoids
+    integrating the whole frame; build an IntegralImage when sampling the
+    same image many times.
+    """
+    height, width = image.shape[:2]
+    x0, y0, x1, y1 = region_bounds(region, cx, cy, bounds)
+    x0, y0 = max(0, x0), max(0, y0)
+    x1, y1 = min(width, x1), min(height, y1)
+    if x1 <= x0 or y1 <= y0:
+        raise ValueError("Sampling region lies outside the image")
+
+    window = IntegralImage(image[y0:y1, x0:x1], bgr=bgr)
+    local_bounds = None
+    if bounds is not None:
+        local_bounds = (bounds[0] - x0, bounds[1] - y0, bounds[2] - x0, bounds[3] - y0)
+    return window.sample(region, cx - x0, cy - y0, local_bounds, statistic)
@@ -0,0 +1,72 @@
+"""Full-image named-color segmentation and area statistics"""
+
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from large_image import LargeImage
+
+# labels: (H, W) names-table indices (None when streamed); counts: pixels per name
+Segmentation = namedtuple('Segmentation', ['labels', 'names', 'counts'])
+
+
+def segment_image(image, lut, bgr=True):
+    """Label every pixel of an image with a named color.
+
+    `image` is an (H, W, 3) array or a large_image.LargeImage; `lut` is a
+    ColorLUT (or anything with label() and names). Non-resident large images
+    are streamed band by band and only the counts are kept.
+    """
+    if isinstance(image, LargeImage):
+        if image.resident:
+            image = image.array
+        else:
+            counts = np.zeros(len(lut.names), dtype=np.int64)
+            for _, band in image.iter_bands():
+                counts += np.bincount(lut.label(band, bgr=True).ravel(), minlength=len(lut.names))
+            return Segmentation(None, lut.names, counts)
+
+    labels = lut.label(image, bgr=bgr)
+    counts = np.bincount(labels.ravel(), minlength=len(lut.names)).astype(np.int64)
+    return Segmentation(labels, lut.names, counts)
+
+
+def area_stats(segmentation, top=None):
+    """Per-name pixel counts and percentages, largest first (names with no pixels omitted)"""
+    counts = segmentation.counts
+    total = int(counts.sum())
+    stats = []
+    for index in np.argsort(counts)[::-1]:
+        if counts[index] == 0 or (top is not None and len(stats) >= top):
+            break
+        stats.append({
+            'name': segmentation.names[index],
+            'pixels': int(counts[index]),
+            'percent': 100.0 * int(counts[index]) / total,
+        })
+    return stats
+
+
+def name_mask(segmentation, name):
+    """Boolean (H, W) mask of the pixels labelled `name`"""
+    if segmentation.labels is None:
+        raise ValueError("Masks need per-pixel labels; segment a resident image or a preview")
+    return segmentation.labels == segmentation.names.index(name)
+
+
+def overlay(image, labels, colors, alpha=0.6, bgr=True, highlight=None):
+    """Blend each pixel with the representative color of its name.
+
+    `colors` is the (N, 3) RGB color table matching the labels (ColorLUT.colors).
+    With `highlight` (a names-table index) only that name's pixels are tinted.
+    """
+    colors = np.asarray(colors, dtype=np.uint8)
+    if bgr:
+        colors = colors[:, ::-1]
+    tint = colors[labels]
+    blended = cv2.addWeighted(image, 1.0 - alpha, tint, alpha, 0)
+    if highlight is not None:
+        keep = labels != highlight
+        blended[keep] = image[keep]
+    return blended
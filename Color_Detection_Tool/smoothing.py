@@ -0,0 +1,56 @@
+"""Temporal smoothing and stability detection for per-frame color readings"""
+
+import numpy as np
+
+
+class TemporalFilter:
+    """Smooth a stream of RGB readings and report when they have settled.
+
+    Readings are kept in a preallocated ring buffer of the last `window`
+    frames. `mode` is 'ema' (exponential moving average with weight `alpha`
+    for the newest reading) or 'median' (per-channel median of the buffer).
+    The reading is `stable` once the buffer is full and every channel's
+    standard deviation over it is at most `stable_std` (in 0-255 units).
+    """
+
+    def __init__(self, mode='ema', window=8, alpha=0.3, stable_std=3.0):
+        if mode not in ('ema', 'median'):
+            raise ValueError(f"Unknown smoothing mode: {mode}")
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.mode = mode
+        self.window = window
+        self.alpha = alpha
+        self.stable_std = stable_std
+        self._buffer = np.zeros((window, 3), dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        self._count = 0
+        self._index = 0
+        self._ema = None
+
+    def update(self, rgb_color):
+        """Add a reading and return the smoothed RGB color"""
+        reading = np.asarray(rgb_color, dtype=np.float32)
+        self._buffer[self._index] = reading
+        self._index = (self._index + 1) % self.window
+        self._count = min(self._count + 1, self.window)
+
+        if self.mode == 'ema':
+            if self._ema is None:
+                self._ema = reading.copy()
+            else:
+                self._ema += self.alpha * (reading - self._ema)
+            smoothed = self._ema
+        else:
+            smoothed = np.median(self._buffer[:self._count], axis=0)
+
+        return tuple(int(round(float(c))) for c in smoothed)
+
+    @property
+    def stable(self):
+        """True when the last `window` readings vary less than `stable_std`"""
+        if self._count < self.window:
+            return False
+        return bool(self._buffer.std(axis=0).max() <= self.stable_std)
@@ -0,0 +1,26 @@
+"""Shared test setup.
+
+The tool's modules import each other flat (`from color_lut import ...`), as
+when its scripts are run from this directory, so that directory goes on
+sys.path here.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    """Keep lookup cubes and history files out of the user's cache directory"""
+    monkeypatch.setenv('COLOR_DETECTION_CACHE_DIR', str(tmp_path / 'cache'))
+
+
+@pytest.fixture(scope='session')
+def lut():
+    """The full-resolution RGB -> name cube (built once per test run)"""
+    from color_lut import ColorLUT
+    return ColorLUT.build(bits=8)
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from batch_cli import ResultWriter, find_images, load_image, named_color_histogram, run_batch
+
+
+def write_image(path, bgr, size=(20, 10)):
+    image = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    image[:] = bgr
+    cv2.imwrite(str(path), image)
+    return str(path)
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    (tmp_path / 'nested').mkdir()
+    write_image(tmp_path / 'red.png', (0, 0, 255))
+    write_image(tmp_path / 'nested' / 'blue.PNG', (255, 0, 0))
+    (tmp_path / 'notes.txt').write_text("not an image", encoding='utf-8')
+    (tmp_path / 'broken.jpg').write_bytes(b'not a jpeg')
+    return tmp_path
+
+
+def test_find_images_expands_directories_and_globs(image_dir):
+    root = str(image_dir)
+    found = find_images([root])
+    assert [os.path.relpath(p, root) for p in found] == ['broken.jpg', os.path.join('nested', 'blue.PNG'), 'red.png']
+    assert [os.path.basename(p) for p in find_images([root], recursive=False)] == ['broken.jpg', 'red.png']
+    # Overlapping inputs are deduplicated
+    assert find_images([os.path.join(root, '*.png'), root]) == found
+
+
+def test_named_color_histogram(lut):
+    image = np.zeros((10, 10, 3), dtype=np.uint8)
+    image[:, :3] = (0, 0, 255)
+    image[:, 3:] = (255, 0, 0)
+    assert named_color_histogram(image, lut) == [
+        {'name': 'Blue', 'hex': '#0000ff', 'share': 0.7},
+        {'name': 'Red', 'hex': '#ff0000', 'share': 0.3},
+    ]
+    assert named_color_histogram(image[..., ::-1], lut, top=1, bgr=False) == [
+        {'name': 'Blue', 'hex': '#0000ff', 'share': 0.7}]
+
+
+def test_load_image_downscales_to_max_side(tmp_path):
+    path = write_image(tmp_path / 'wide.png', (10, 20, 30), size=(2000, 500))
+    image, size = load_image(path, max_side=512)
+    assert size == (2000, 500)
+    assert image.shape == (128, 512, 3)
+
+
+def test_result_writer_formats():
+    results = [{'path': 'a.png', 'width': 4, 'height': 2,
+                'colors': [{'name': 'Red', 'hex': '#ff0000', 'share': 0.5},
+                           {'name': 'Blue', 'hex': '#0000ff', 'share': 0.5}]},
+               {'path': 'b.png', 'error': 'Failed to load image'}]
+
+    stream = io.StringIO()
+    writer = ResultWriter(stream, 'jsonl')
+    for result in results:
+        writer.write(result)
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == results
+
+    stream = io.StringIO()
+    writer = ResultWriter(stream, 'csv')
+    for result in results:
+        writer.write(result)
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert [(r['path'], r['rank'], r['name'], r['error']) for r in rows] == [
+        ('a.png', '1', 'Red', ''), ('a.png', '2', 'Blue', ''), ('b.png', '', '', 'Failed to load image')]
+
+
+def test_run_batch_reports_unreadable_files(image_dir):
+    paths = find_images([str(image_dir)])
+    output = io.StringIO()
+    processed, errors, elapsed = run_batch(paths, output, workers=1, bits=5)
+    assert (processed, errors) == (3, 1) and elapsed > 0
+
+    results = {os.path.basename(r['path']): r for r in map(json.loads, output.getvalue().splitlines())}
+    assert 'error' in results['broken.jpg']
+    assert results['red.png']['colors'][0]['name'] == 'Red'
+    assert results['blue.PNG']['colors'] == [{'name': 'Blue', 'hex': '#0000ff', 'share': 1.0}]
+    assert (results['red.png']['width'], results['red.png']['height']) == (20, 10)
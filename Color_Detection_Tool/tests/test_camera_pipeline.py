@@ -0,0 +1,122 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from camera_pipeline import DropOldQueue, FramePipeline
+
+
+class FakeReader:
+    """read() -> (True, n) for n in 0..frames-1, then (False, None)"""
+
+    def __init__(self, frames=None, fail_at=None):
+        self.frames = frames
+        self.fail_at = fail_at
+        self.count = 0
+        self.released = []
+
+    def read(self):
+        if self.fail_at is not None and self.count == self.fail_at:
+            raise IOError("device unplugged")
+        if self.frames is not None and self.count >= self.frames:
+            return False, None
+        self.count += 1
+        time.sleep(0.001)
+        return True, self.count - 1
+
+    def release(self):
+        # Record whether a read could still be in progress on another thread
+        self.released.append(threading.current_thread().name)
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def drain(pipeline):
+    results = []
+    wait_until(lambda: pipeline.finished)
+    while (result := pipeline.poll()) is not None:
+        results.append(result)
+    return results
+
+
+def test_drop_old_queue_keeps_the_newest_items():
+    q = DropOldQueue(maxsize=2)
+    for item in range(5):
+        q.put(item)
+    assert q.dropped == 3
+    assert [q.get_nowait(), q.get_nowait(), q.get_nowait()] == [3, 4, None]
+
+
+def test_drop_old_queue_get_times_out():
+    q = DropOldQueue()
+    with pytest.raises(queue.Empty):
+        q.get(timeout=0.01)
+    q.put('frame')
+    assert q.get(timeout=0.01) == 'frame'
+
+
+def test_pipeline_delivers_results_and_stops():
+    reader = FakeReader()
+    pipeline = FramePipeline(reader.read, lambda frame: frame * 10, on_capture_exit=reader.release)
+    pipeline.start()
+    wait_until(lambda: pipeline.frames_processed >= 3)
+    assert pipeline.stop()
+    assert not pipeline.running and pipeline.finished
+    assert pipeline.error is None
+    # Released once, by the capture thread after its last read
+    assert reader.released == ['frame-capture']
+    assert pipeline.frames_processed + pipeline.frames.dropped <= pipeline.frames_captured
+
+
+def test_end_of_source_keeps_the_last_result_and_reports_the_error():
+    reader = FakeReader(frames=3)
+    pipeline = FramePipeline(reader.read, lambda frame: frame * 10, queue_size=3,
+                             on_capture_exit=reader.release)
+    pipeline.start()
+    assert drain(pipeline) == [0, 10, 20]
+    assert pipeline.error == "Camera stopped delivering frames"
+    assert reader.released == ['frame-capture']
+
+
+def test_read_exception_is_reported():
+    reader = FakeReader(fail_at=2)
+    pipeline = FramePipeline(reader.read, lambda frame: frame, on_capture_exit=reader.release)
+    pipeline.start()
+    drain(pipeline)
+    assert pipeline.error == "Capture failed: device unplugged"
+    assert reader.released == ['frame-capture']
+
+
+def test_process_exception_is_reported():
+    def process(frame):
+        raise ValueError("bad frame")
+
+    reader = FakeReader()
+    pipeline = FramePipeline(reader.read, process, on_capture_exit=reader.release)
+    pipeline.start()
+    wait_until(lambda: pipeline.finished)
+    assert pipeline.error == "Processing failed: bad frame"
+    # The capture thread keeps reading until stopped, then releases
+    assert pipeline.stop()
+    assert reader.released == ['frame-capture']
+
+
+def test_release_failure_is_reported_without_hiding_the_first_error():
+    def release():
+        raise RuntimeError("busy")
+
+    pipeline = FramePipeline(FakeReader(frames=1).read, lambda frame: frame, on_capture_exit=release)
+    pipeline.start()
+    drain(pipeline)
+    assert pipeline.error == "Camera stopped delivering frames"
+
+    pipeline = FramePipeline(FakeReader().read, lambda frame: frame, on_capture_exit=release)
+    pipeline.start()
+    assert pipeline.stop()
+    assert pipeline.error == "Releasing the source failed: busy"
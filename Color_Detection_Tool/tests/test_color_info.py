@@ -0,0 +1,63 @@
+import colorsys
+
+import numpy as np
+import pytest
+
+from color_info import ColorInfoCache, pack_rgb, rgb_to_hsl, rgb_to_hsv
+from color_names import ColorNamer
+
+
+def test_hsl_is_hue_saturation_lightness():
+    assert rgb_to_hsl((255, 0, 0)) == (0, 100, 50)
+    assert rgb_to_hsl((0, 0, 128)) == (240, 100, 25)
+    # Saturation and lightness differ here, so a swapped order would show
+    assert rgb_to_hsl((255, 128, 128)) == (0, 100, 75)
+    assert rgb_to_hsl((64, 64, 64)) == (0, 0, 25)
+    assert rgb_to_hsv((255, 128, 128)) == (0, 49, 100)
+
+
+def test_lookup_fills_every_field():
+    info = ColorInfoCache(ColorNamer()).lookup((200, 100, 50))
+    h, l, s = colorsys.rgb_to_hls(200 / 255, 100 / 255, 50 / 255)
+    assert info.rgb == (200, 100, 50)
+    assert info.hex == '#c86432'
+    assert info.name == ColorNamer().name((200, 100, 50))
+    assert info.hsl == (int(h * 360), int(s * 100), int(l * 100))
+    assert info.hsv == rgb_to_hsv((200, 100, 50))
+
+
+def test_hits_misses_and_numpy_keys():
+    cache = ColorInfoCache(ColorNamer())
+    first = cache.lookup((1, 2, 3))
+    assert cache.lookup(np.array([1, 2, 3], dtype=np.uint8)) is first
+    assert cache.name((1, 2, 3)) == first.name
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.hit_rate == pytest.approx(2 / 3)
+    assert pack_rgb((1, 2, 3)) == 0x010203
+
+
+def test_least_recently_used_is_evicted():
+    cache = ColorInfoCache(ColorNamer(), max_size=2)
+    cache.lookup((1, 0, 0))
+    cache.lookup((2, 0, 0))
+    cache.lookup((1, 0, 0))        # now (2, 0, 0) is the least recently used
+    cache.lookup((3, 0, 0))
+    assert len(cache) == 2 and cache.evictions == 1
+
+    misses = cache.misses
+    cache.lookup((1, 0, 0))
+    cache.lookup((3, 0, 0))
+    assert cache.misses == misses
+    cache.lookup((2, 0, 0))
+    assert cache.misses == misses + 1
+
+
+def test_stats_and_clear():
+    cache = ColorInfoCache(ColorNamer(), max_size=8)
+    cache.lookup((5, 5, 5))
+    cache.lookup((5, 5, 5))
+    assert cache.stats() == {'size': 1, 'max_size': 8, 'hits': 1, 'misses': 1, 'evictions': 0, 'hit_rate': 0.5}
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == cache.misses == 0
+    with pytest.raises(ValueError):
+        ColorInfoCache(ColorNamer(), max_size=0)
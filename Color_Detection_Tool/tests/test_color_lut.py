@@ -0,0 +1,69 @@
+import numpy as np
+import webcolors
+
+from color_lut import ColorLUT
+from color_names import BASIC_COLORS, ColorNamer
+
+
+def reference_name(rgb):
+    """The original per-pixel lookup: exact CSS3 name, else the nearest basic color"""
+    try:
+        return webcolors.rgb_to_name(tuple(int(c) for c in rgb)).title()
+    except ValueError:
+        return ColorNamer().name(rgb)
+
+
+def random_pixels(n, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (n, 3), dtype=np.uint8)
+
+
+def test_full_cube_reproduces_reference_names(lut):
+    pixels = np.concatenate([random_pixels(2000), np.array(list(BASIC_COLORS.values()), dtype=np.uint8),
+                             np.array([webcolors.name_to_rgb(n) for n in ('coral', 'teal', 'papayawhip')],
+                                      dtype=np.uint8)])
+    names = [lut.names[i] for i in lut.label(pixels)]
+    assert names == [reference_name(p) for p in pixels]
+
+
+def test_packed_path_matches_direct_indexing(lut):
+    image = random_pixels(120 * 80, seed=1).reshape(120, 80, 3)
+    direct = lut.cube[image[..., 0], image[..., 1], image[..., 2]]
+    assert lut._flat_cube is not None
+    labels = lut.label(image)
+    assert labels.shape == (120, 80)
+    assert (labels == direct).all()
+    assert (lut.label(image[..., ::-1], bgr=True) == direct).all()
+
+
+def test_label_non_contiguous_and_non_uint8_input(lut):
+    image = random_pixels(64 * 64, seed=2).reshape(64, 64, 3)
+    view = image[::2, 1::3]
+    assert (lut.label(view) == lut.cube[view[..., 0], view[..., 1], view[..., 2]]).all()
+
+    wide = np.array([[-5, 300, 128]])
+    assert lut.label(wide)[0] == lut.cube[0, 255, 128]
+    assert lut.label(np.empty((0, 3), dtype=np.uint8)).shape == (0,)
+
+
+def test_name_agrees_with_label(lut):
+    for rgb in random_pixels(200, seed=3):
+        assert lut.name(rgb) == lut.names[lut.label(rgb.reshape(1, 3))[0]]
+
+
+def test_reduced_cube_uses_cell_lookup():
+    small = ColorLUT.build(bits=5)
+    assert small.cube.shape == (32, 32, 32)
+    pixels = random_pixels(500, seed=4)
+    cells = pixels >> 3
+    assert (small.label(pixels) == small.cube[cells[:, 0], cells[:, 1], cells[:, 2]]).all()
+
+
+def test_load_or_build_caches_and_memory_maps(tmp_path):
+    first = ColorLUT.load_or_build(bits=6, cache_dir=str(tmp_path))
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == ['.json', '.npy']
+
+    second = ColorLUT.load_or_build(bits=6, cache_dir=str(tmp_path))
+    assert isinstance(second.cube, np.memmap)
+    assert second.names == first.names
+    pixels = random_pixels(300, seed=5)
+    assert (second.label(pixels) == first.label(pixels)).all()
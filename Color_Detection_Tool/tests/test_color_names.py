@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import color_names
+from color_names import BASIC_COLORS, ColorNamer
+
+
+def nearest_basic(pixels):
+    """Reference nearest-neighbour search in exact integer arithmetic"""
+    colors = np.array(list(BASIC_COLORS.values()), dtype=np.int64)
+    pixels = np.asarray(pixels, dtype=np.int64).reshape(-1, 3)
+    distances = ((pixels[:, None, :] - colors[None, :, :]) ** 2).sum(axis=2)
+    return distances.argmin(axis=1)
+
+
+def test_label_matches_brute_force():
+    pixels = np.random.default_rng(0).integers(0, 256, (5000, 3), dtype=np.uint8)
+    labels = ColorNamer().label(pixels)
+    assert labels.shape == (5000,)
+    assert (labels == nearest_basic(pixels)).all()
+
+
+def test_palette_colors_name_themselves():
+    namer = ColorNamer()
+    for name, rgb in BASIC_COLORS.items():
+        # Duplicated values (Lime/Green, Aqua/Cyan, ...) resolve to the first name
+        assert BASIC_COLORS[namer.name(rgb)] == rgb
+
+
+def test_bgr_flag_matches_flipped_pixels():
+    image = np.random.default_rng(1).integers(0, 256, (40, 60, 3), dtype=np.uint8)
+    namer = ColorNamer()
+    assert (namer.label(image[..., ::-1], bgr=True) == namer.label(image)).all()
+
+
+def test_label_keeps_leading_shape_across_chunks(monkeypatch):
+    monkeypatch.setattr(color_names, 'CHUNK_SIZE', 97)
+    image = np.random.default_rng(2).integers(0, 256, (31, 17, 3), dtype=np.uint8)
+    labels = ColorNamer().label(image)
+    assert labels.shape == (31, 17)
+    assert (labels.ravel() == nearest_basic(image)).all()
+
+
+def test_custom_palette_and_name_image():
+    namer = ColorNamer({'Dark': (10, 10, 10), 'Light': (240, 240, 240)})
+    labels, names = namer.name_image(np.array([[[0, 0, 0], [200, 210, 220]]], dtype=np.uint8))
+    assert [names[i] for i in labels.ravel()] == ['Dark', 'Light']
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        ColorNamer({})
+    with pytest.raises(ValueError):
+        ColorNamer().label(np.zeros((4, 4), dtype=np.uint8))
@@ -0,0 +1,224 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+import color_service
+from color_service import ColorService, PixelBatcher, _parse_pixels
+from core import ColorAnalyzer
+from load_test import Connection
+
+
+@pytest.mark.parametrize('body', [
+    b'{not json',
+    b'[1, 2, 3]',
+    b'{"colors": []}',
+    b'{"pixels": []}',
+    b'{"pixels": [[1, 2]]}',
+    b'{"pixels": [[1, 2, 3, 4]]}',
+    b'{"pixels": [[1.5, 2, 3]]}',
+    b'{"pixels": [["a", "b", "c"]]}',
+    b'{"rgb": [0, 0, 256]}',
+    b'{"rgb": [-1, 0, 0]}',
+])
+def test_parse_pixels_rejects_bad_bodies(body):
+    with pytest.raises(ValueError):
+        _parse_pixels(body)
+
+
+def test_parse_pixels_shapes_and_limit(monkeypatch):
+    assert _parse_pixels(b'{"rgb": [1, 2, 3]}').tolist() == [[1, 2, 3]]
+    pixels = _parse_pixels(b'{"pixels": [[[1, 2, 3], [4, 5, 6]]]}')
+    assert pixels.dtype == np.uint8 and pixels.tolist() == [[1, 2, 3], [4, 5, 6]]
+
+    monkeypatch.setattr(color_service, 'MAX_REQUEST_PIXELS', 2)
+    with pytest.raises(ValueError):
+        _parse_pixels(json.dumps({'pixels': [[0, 0, 0]] * 3}).encode())
+
+
+class RecordingAnalyzer:
+    """Describes each pixel by its red value and records the batch sizes"""
+
+    def __init__(self):
+        self.calls = []
+
+    def describe_pixels(self, pixels):
+        self.calls.append(len(pixels))
+        return [int(r) for r, _, _ in pixels]
+
+
+def describe_all(batcher, sizes):
+    async def run():
+        requests = [np.full((size, 3), index, dtype=np.uint8) for index, size in enumerate(sizes)]
+        return await asyncio.gather(*(batcher.describe(pixels) for pixels in requests))
+
+    return asyncio.run(run())
+
+
+def test_batcher_splits_merged_batch_back_to_requests():
+    analyzer = RecordingAnalyzer()
+    with ThreadPoolExecutor(1) as executor:
+        batcher = PixelBatcher(analyzer, executor, max_delay=0.01)
+        results = describe_all(batcher, [3, 1, 5])
+    assert results == [[0] * 3, [1], [2] * 5]
+    assert analyzer.calls == [9]
+    assert (batcher.batches, batcher.requests) == (1, 3)
+
+
+def test_batcher_flushes_at_max_pixels_and_can_be_disabled():
+    analyzer = RecordingAnalyzer()
+    with ThreadPoolExecutor(1) as executor:
+        # The timer would never fire in time: only max_pixels triggers these flushes
+        batcher = PixelBatcher(analyzer, executor, max_delay=60, max_pixels=4)
+        assert describe_all(batcher, [2, 2, 4]) == [[0] * 2, [1] * 2, [2] * 4]
+        assert batcher.batches == 2
+
+        unbatched = PixelBatcher(analyzer, executor, max_delay=0)
+        assert describe_all(unbatched, [1, 2]) == [[0], [1] * 2]
+        assert (unbatched.batches, unbatched.requests) == (2, 2)
+    assert analyzer.calls == [4, 4, 1, 2]
+
+
+@pytest.fixture
+def service(lut):
+    service = ColorService(ColorAnalyzer(lut), batch_delay=0.001)
+    yield service
+    service.batcher.executor.shutdown()
+    service.image_executor.shutdown()
+
+
+def serve(service, client):
+    """Run `client(port)` against the service on an ephemeral port"""
+    async def run():
+        server = await service.start('127.0.0.1', 0)
+        try:
+            return await asyncio.wait_for(client(server.sockets[0].getsockname()[1]), 10)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(run())
+
+
+async def raw_request(port, data):
+    """Status line and JSON body of the reply to raw request bytes"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(data)
+    await writer.drain()
+    reply = await reader.read()
+    writer.close()
+    head, _, body = reply.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_round_trip_on_one_keep_alive_connection(service):
+    image = np.zeros((40, 60, 3), dtype=np.uint8)
+    image[:, :30] = (0, 0, 255)
+    image[:, 30:] = (255, 0, 0)
+    png = cv2.imencode('.png', image)[1].tobytes()
+
+    async def client(port):
+        connection = Connection('127.0.0.1', port)
+        try:
+            return [
+                await connection.request('POST', '/colors', b'{"pixels": [[255, 0, 0], [0, 0, 128]]}'),
+                await connection.request('POST', '/colors', b'{"rgb": [0, 128, 0]}'),
+                await connection.request('POST', '/image?palette=2&x=5&y=5', png, 'image/png'),
+                await connection.request('POST', '/colors', b'{"pixels": [[1, 2]]}'),
+                await connection.request('GET', '/colors'),
+                await connection.request('GET', '/nowhere'),
+                await connection.request('GET', '/health'),
+            ]
+        finally:
+            connection.close()
+
+    colors, single, analyzed, bad, wrong_method, missing, health = serve(service, client)
+    assert colors == (200, {'colors': [
+        {'rgb': [255, 0, 0], 'hex': '#ff0000', 'name': 'Red', 'hsl': [0, 100, 50]},
+        {'rgb': [0, 0, 128], 'hex': '#000080', 'name': 'Navy', 'hsl': [240, 100, 25]}]})
+    assert single[0] == 200 and single[1]['colors'][0]['name'] == 'Green'
+
+    status, result = analyzed
+    assert status == 200 and (result['width'], result['height']) == (60, 40)
+    assert sorted(c['name'] for c in result['palette']) == ['Blue', 'Red']
+    assert result['sample']['rgb'] == [255, 0, 0]
+
+    assert bad[0] == 400 and 'error' in bad[1]
+    assert wrong_method[0] == 405
+    assert missing[0] == 404
+    assert health[0] == 200 and health[1]['status'] == 'ok'
+    # The malformed body is rejected before it reaches the batcher
+    assert (health[1]['requests'], health[1]['batches']) == (2, 2)
+
+
+def test_malformed_requests_get_400_and_close(service):
+    png = cv2.imencode('.png', np.zeros((8, 8, 3), dtype=np.uint8))[1].tobytes()
+
+    async def client(port):
+        return [
+            await raw_request(port, b'POST /colors HTTP/1.1\r\nContent-Length: abc\r\n\r\n'),
+            await raw_request(port, b'POST /colors HTTP/1.1\r\nContent-Length: -5\r\n\r\n'),
+            await raw_request(port, b'garbage\r\n\r\n'),
+            await raw_request(port, b'GET /health HTTP/1.1\r\nX-Long: ' + b'a' * 100_000 + b'\r\n\r\n'),
+            await raw_request(port, b'POST /image HTTP/1.1\r\nConnection: close\r\nContent-Length: 3\r\n\r\nabc'),
+            await raw_request(port, b'POST /image?palette=5000 HTTP/1.1\r\nConnection: close\r\n'
+                                    b'Content-Length: ' + str(len(png)).encode() + b'\r\n\r\n' + png),
+        ]
+
+    for status, payload in serve(service, client):
+        assert status == 400 and 'error' in payload
+
+
+def test_health_accepts_only_get_and_head(service):
+    async def client(port):
+        replies = []
+        for method in (b'POST', b'PUT', b'DELETE', b'HEAD'):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(method + b' /health HTTP/1.1\r\nConnection: close\r\nContent-Length: 0\r\n\r\n')
+            await writer.drain()
+            replies.append(await reader.read())
+            writer.close()
+        return replies
+
+    *rejected, head = serve(service, client)
+    for reply in rejected:
+        assert reply.startswith(b'HTTP/1.1 405 ')
+        assert b'\r\nAllow: GET, HEAD\r\n' in reply
+    # Same headers as GET, no body
+    assert head.startswith(b'HTTP/1.1 200 ') and head.endswith(b'\r\n\r\n')
+    assert int(head.split(b'Content-Length: ')[1].split(b'\r\n')[0]) > 0
+
+
+def test_oversized_body_gets_413(service, monkeypatch):
+    monkeypatch.setattr(color_service, 'MAX_BODY_BYTES', 16)
+
+    async def client(port):
+        body = json.dumps({'pixels': [[0, 0, 0]] * 10}).encode()
+        return await raw_request(port, b'POST /colors HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(body) + body)
+
+    status, payload = serve(service, client)
+    assert status == 413 and 'error' in payload
+
+
+@pytest.mark.parametrize('reply, error', [(b'', ConnectionError), (b'garbage\r\n', ValueError)])
+def test_load_test_connection_rejects_closed_or_bad_status_line(reply, error):
+    async def handle(reader, writer):
+        await reader.readuntil(b'\r\n\r\n')
+        writer.write(reply)
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        connection = Connection('127.0.0.1', server.sockets[0].getsockname()[1])
+        try:
+            with pytest.raises(error):
+                await connection.request('GET', '/health')
+        finally:
+            connection.close()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(run())
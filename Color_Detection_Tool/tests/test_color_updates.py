@@ -0,0 +1,57 @@
+from color_updates import ColorUpdateCoalescer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make(**options):
+    clock = FakeClock()
+    return ColorUpdateCoalescer(clock=clock, **options), clock
+
+
+def test_first_color_is_always_accepted():
+    coalescer, _ = make()
+    assert coalescer.should_update((10, 20, 30))
+    assert (coalescer.accepted, coalescer.skipped) == (1, 0)
+
+
+def test_change_below_delta_e_threshold_is_dropped():
+    coalescer, clock = make(delta_e_threshold=2.0, max_rate_hz=None)
+    coalescer.should_update((120, 60, 40))
+    clock.now += 1.0
+    assert not coalescer.should_update((120, 60, 40))     # identical
+    assert not coalescer.should_update((121, 60, 40))     # ΔE00 well under 2
+    assert coalescer.should_update((140, 60, 40))
+    assert (coalescer.accepted, coalescer.skipped) == (2, 2)
+
+
+def test_small_drifts_are_measured_from_the_last_accepted_color():
+    coalescer, _ = make(delta_e_threshold=2.0, max_rate_hz=None)
+    coalescer.should_update((120, 60, 40))
+    # Each step is tiny, but the drift adds up against the accepted color
+    results = [coalescer.should_update((120 + step, 60, 40)) for step in range(1, 12)]
+    assert not results[0] and any(results)
+
+
+def test_rate_cap_suppresses_then_accepts():
+    coalescer, clock = make(delta_e_threshold=0, max_rate_hz=10.0)
+    assert coalescer.should_update((0, 0, 0))
+    clock.now += 0.05
+    assert not coalescer.should_update((255, 255, 255))   # big change, but too soon
+    clock.now += 0.06
+    assert coalescer.should_update((255, 255, 255))
+    assert (coalescer.accepted, coalescer.skipped) == (2, 1)
+
+
+def test_force_and_reset_bypass_both_checks():
+    coalescer, _ = make(max_rate_hz=10.0)
+    coalescer.should_update((50, 50, 50))
+    assert coalescer.should_update((50, 50, 50), force=True)
+    assert not coalescer.should_update((51, 50, 50))
+    coalescer.reset()
+    assert coalescer.should_update((50, 50, 50))
@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+import pytest
+
+from color_info import rgb_to_hsl
+from core import ColorAnalyzer, decode_image, rgb_to_hsl_array
+from sampling import SAMPLING_PRESETS, IntegralImage
+
+
+@pytest.fixture(scope='module')
+def analyzer(lut):
+    return ColorAnalyzer(lut)
+
+
+def test_rgb_to_hsl_array_matches_scalar_conversion():
+    pixels = np.random.default_rng(0).integers(0, 256, (20000, 3), dtype=np.uint8)
+    # Grays, primaries and the lightness = 50% boundary exercise every branch
+    edges = np.array([[0, 0, 0], [255, 255, 255], [128, 128, 128], [255, 0, 0], [0, 255, 0],
+                      [0, 0, 255], [127, 128, 128], [128, 127, 127], [255, 0, 255], [1, 0, 0]], dtype=np.uint8)
+    pixels = np.concatenate([pixels, edges])
+    expected = np.array([rgb_to_hsl(p) for p in pixels.tolist()])
+    assert (rgb_to_hsl_array(pixels) == expected).all()
+
+
+def test_describe_pixels_matches_describe(analyzer):
+    pixels = np.random.default_rng(1).integers(0, 256, (500, 3), dtype=np.uint8)
+    batch = analyzer.describe_pixels(pixels)
+    assert batch == [analyzer.describe(tuple(p)) for p in pixels.tolist()]
+    assert batch[0].keys() == {'rgb', 'hex', 'name', 'hsl'}
+    assert analyzer.describe((255, 0, 0)) == {'rgb': [255, 0, 0], 'hex': '#ff0000', 'name': 'Red', 'hsl': [0, 100, 50]}
+    assert analyzer.get_color_name((0, 0, 128)) == 'Navy'
+
+
+def test_sample_matches_integral_image(analyzer):
+    image = np.random.default_rng(2).integers(0, 256, (90, 120, 3), dtype=np.uint8)
+    for region in ('5x5 box', 'Circle (20 px)', 'Single pixel'):
+        for statistic in ('mean', 'median'):
+            expected = IntegralImage(image).sample(SAMPLING_PRESETS[region], 10, 85, statistic=statistic)
+            assert analyzer.sample(image, 10, 85, region, statistic)['rgb'] == list(expected)
+    with pytest.raises(ValueError):
+        analyzer.sample(image, 10, 10, 'Drag rectangle')
+
+
+def test_palette_adds_hsl(analyzer):
+    image = np.zeros((60, 60, 3), dtype=np.uint8)
+    image[:, :40] = (0, 0, 255)     # BGR red, two thirds
+    image[:, 40:] = (255, 0, 0)     # BGR blue
+    palette = analyzer.palette(image, n_colors=2)
+    assert [c['name'] for c in palette] == ['Red', 'Blue']
+    assert palette[0]['hsl'] == [0, 100, 50]
+    assert palette[0]['share'] == pytest.approx(2 / 3, abs=0.01)
+
+
+def test_decode_image():
+    image = np.random.default_rng(3).integers(0, 256, (20, 30, 3), dtype=np.uint8)
+    ok, encoded = cv2.imencode('.png', image)
+    assert ok
+    assert (decode_image(encoded.tobytes()) == image).all()
+    with pytest.raises(ValueError):
+        decode_image(b'not an image')
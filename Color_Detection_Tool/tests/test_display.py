@@ -0,0 +1,126 @@
+import cv2
+import numpy as np
+import pytest
+from PIL import ImageTk
+
+import display
+from display import DisplayRenderer, fit_size
+
+
+class StubPhotoImage:
+    created = 0
+
+    def __init__(self, image):
+        StubPhotoImage.created += 1
+        self.size = image.size
+        self.pasted = 0
+
+    def width(self):
+        return self.size[0]
+
+    def height(self):
+        return self.size[1]
+
+    def paste(self, image):
+        assert image.size == self.size
+        self.pasted += 1
+
+
+class StubLabel:
+    def __init__(self):
+        self.image = None
+
+    def config(self, **options):
+        self.options = options
+
+    def place(self, **options):
+        pass
+
+
+@pytest.fixture
+def photo_images(monkeypatch):
+    StubPhotoImage.created = 0
+    monkeypatch.setattr(ImageTk, 'PhotoImage', StubPhotoImage)
+    return StubPhotoImage
+
+
+@pytest.mark.parametrize("size, box, expected", [
+    ((1920, 1080), (630, 480), (630, 354)),    # wider than the box
+    ((1080, 1920), (630, 480), (270, 480)),    # taller than the box
+    ((640, 480), (640, 480), (640, 480)),      # exact fit
+    ((320, 240), (630, 480), (630, 472)),      # enlarged to fill the box
+    ((10000, 1), (630, 480), (630, 1)),        # never collapses to zero
+    ((1, 10000), (630, 480), (1, 480)),
+])
+def test_fit_size_preserves_aspect_ratio(size, box, expected):
+    assert fit_size(*size, *box) == expected
+
+
+@pytest.mark.parametrize("size, expected", [
+    ((320, 240), (320, 240)),
+    ((630, 100), (630, 100)),
+    ((1920, 1080), (630, 354)),
+])
+def test_fit_size_without_upscaling(size, expected):
+    assert fit_size(*size, 630, 480, upscale=False) == expected
+
+
+@pytest.mark.parametrize("args", [(0, 480, 630, 480), (640, 0, 630, 480), (640, 480, 0, 480)])
+def test_fit_size_rejects_degenerate_sizes(args):
+    with pytest.raises(ValueError):
+        fit_size(*args)
+
+
+def test_target_size_is_cached_per_source_resolution(monkeypatch):
+    calls = []
+    original = display.fit_size
+    monkeypatch.setattr(display, 'fit_size', lambda *a, **k: calls.append(a) or original(*a, **k))
+    renderer = DisplayRenderer(630, 480)
+    big = np.zeros((1080, 1920, 3), np.uint8)
+    for _ in range(3):
+        assert renderer.target_size(big) == (630, 354)
+    assert len(calls) == 1
+    assert renderer.target_size(np.zeros((240, 320, 3), np.uint8)) == (630, 472)
+    assert len(calls) == 2
+
+
+def test_interpolation_depends_on_the_direction():
+    renderer = DisplayRenderer(630, 480)
+    renderer.target_size(np.zeros((1080, 1920, 3), np.uint8))
+    assert renderer._resize_flag == cv2.INTER_AREA
+    renderer.target_size(np.zeros((240, 320, 3), np.uint8))
+    assert renderer._resize_flag == cv2.INTER_LINEAR
+
+    forced = DisplayRenderer(630, 480, interpolation=cv2.INTER_NEAREST)
+    forced.target_size(np.zeros((1080, 1920, 3), np.uint8))
+    assert forced._resize_flag == cv2.INTER_NEAREST
+
+
+def test_prepare_resizes_and_converts_to_rgb():
+    frame = np.zeros((1080, 1920, 3), np.uint8)
+    frame[:] = (255, 0, 0)  # BGR blue
+    rgb = DisplayRenderer(630, 480).prepare(frame)
+    assert rgb.shape == (354, 630, 3)
+    assert tuple(rgb[0, 0]) == (0, 0, 255)
+    # Frames already at the display size are copied, not converted in place
+    small = np.zeros((100, 200, 3), np.uint8)
+    small[:] = (255, 0, 0)
+    DisplayRenderer(630, 480, upscale=False).prepare(small)
+    assert tuple(small[0, 0]) == (255, 0, 0)
+
+
+def test_show_reuses_the_photo_image_until_the_size_changes(photo_images):
+    renderer = DisplayRenderer(630, 480)
+    label = StubLabel()
+    big = np.zeros((1080, 1920, 3), np.uint8)
+    for _ in range(3):
+        renderer.show(label, renderer.prepare(big))
+    assert photo_images.created == 1
+    assert renderer.photo.pasted == 2
+    assert label.image is renderer.photo
+
+    renderer.show(label, renderer.prepare(np.zeros((1920, 1080, 3), np.uint8)))
+    assert photo_images.created == 2
+    renderer.reset()
+    renderer.show(label, renderer.prepare(big))
+    assert photo_images.created == 3
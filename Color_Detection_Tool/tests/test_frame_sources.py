@@ -0,0 +1,83 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+import headless_runner
+from frame_sources import ImageSequenceSource, SyntheticSource, VideoFileSource, open_source
+
+
+@pytest.fixture
+def frames_dir(tmp_path):
+    directory = tmp_path / 'synthetic'     # named like the generator spec on purpose
+    directory.mkdir()
+    for i, value in enumerate((10, 20, 30)):
+        cv2.imwrite(str(directory / f'frame_{i}.png'), np.full((4, 6, 3), value, dtype=np.uint8))
+    (directory / 'broken.png').write_bytes(b'not a png')     # sorts first, skipped
+    return directory
+
+
+def test_open_source_spec_parsing(frames_dir, tmp_path, monkeypatch):
+    source = open_source('synthetic')
+    assert isinstance(source, SyntheticSource) and (source.width, source.height) == (1280, 720)
+    source = open_source('synthetic:64x48', realtime=True)
+    assert (source.width, source.height, source.realtime) == (64, 48, True)
+
+    # Paths that merely start with 'synthetic' are files and directories, not the generator
+    monkeypatch.chdir(tmp_path)
+    assert isinstance(open_source('synthetic/'), ImageSequenceSource)
+    (tmp_path / 'synthetic_clip.mp4').write_bytes(b'')
+    assert isinstance(open_source('synthetic_clip.mp4'), VideoFileSource)
+    sequence = open_source(str(frames_dir / '*.png'))
+    assert isinstance(sequence, ImageSequenceSource) and len(sequence.paths) == 4
+
+    with pytest.raises(ValueError):
+        open_source('no_such_source.mp4')
+
+
+def test_synthetic_source_is_deterministic_and_ends():
+    source = SyntheticSource(32, 24, frames=3)
+    frames = [source.read() for _ in range(4)]
+    assert [ok for ok, _ in frames] == [True, True, True, False]
+    assert frames[0][1].shape == (24, 32, 3) and frames[3][1] is None
+    again = SyntheticSource(32, 24, frames=3).read()[1]
+    assert np.array_equal(frames[0][1], again)
+    assert not np.array_equal(frames[0][1], frames[1][1])     # the tiles drift
+
+
+def test_image_sequence_eof_and_loop(frames_dir):
+    once = ImageSequenceSource(str(frames_dir))
+    values = [frame[0, 0, 0] if ok else None for ok, frame in (once.read() for _ in range(4))]
+    assert values == [10, 20, 30, None]
+
+    looped = ImageSequenceSource(str(frames_dir), loop=True)
+    assert [looped.read()[1][0, 0, 0] for _ in range(7)] == [10, 20, 30, 10, 20, 30, 10]
+    assert not ImageSequenceSource(str(frames_dir / '*.jpg')).isOpened()
+
+
+def test_paced_reads_report_their_sleep():
+    source = SyntheticSource(8, 8, fps=50.0, realtime=True)
+    assert source.paced and not SyntheticSource(8, 8).paced
+    source.read()
+    assert source.last_wait == 0.0
+    source.read()
+    assert 0.0 < source.last_wait <= 0.02
+
+
+@pytest.mark.parametrize('threaded', [False, True])
+def test_headless_runner_report(tmp_path, threaded):
+    path = tmp_path / 'timings.json'
+    argv = ['--source', 'synthetic:64x48', '--frames', '5', '--json', str(path)]
+    assert headless_runner.main(argv + (['--threaded'] if threaded else [])) == 0
+
+    report = json.loads(path.read_text(encoding='utf-8'))
+    assert report['frames'] == 5 and report['paced'] == threaded
+    assert {'read', 'sample', 'name'} <= set(report['stages'])
+    if threaded:
+        # The pacing sleep is its own stage, so 'read' stays far below the 33 ms frame interval
+        assert report['stages']['pace']['count'] >= 5
+        assert report['stages']['read']['p50_ms'] < 20
+        assert 'drop_ratio' in report
+    else:
+        assert 'pace' not in report['stages']
@@ -0,0 +1,130 @@
+import csv
+import json
+import struct
+
+import pytest
+
+from history import ColorHistory
+
+
+@pytest.fixture
+def history():
+    h = ColorHistory()
+    yield h
+    h.close()
+
+
+def test_near_duplicates_bump_the_existing_entry(history):
+    entry, is_new = history.add((200, 30, 40), 'Crimson')
+    assert is_new and entry['hex'] == '#c81e28' and entry['count'] == 1
+
+    # ΔE2000 well under 2: same color
+    again, is_new = history.add((201, 31, 40), 'Crimson')
+    assert not is_new
+    assert again['id'] == entry['id'] and again['count'] == 2 and again['rgb'] == (200, 30, 40)
+
+    _, is_new = history.add((30, 40, 200), 'Blue')
+    assert is_new
+    assert len(history) == 2
+
+
+def test_dedup_can_be_disabled_and_is_windowed():
+    plain = ColorHistory(dedup_delta_e=0)
+    plain.add((10, 10, 10), 'Black')
+    assert plain.add((10, 10, 10), 'Black')[1]
+    assert len(plain) == 2
+
+    windowed = ColorHistory(dedup_window=1)
+    windowed.add((255, 0, 0), 'Red')
+    windowed.add((0, 0, 255), 'Blue')
+    # Red is no longer among the last capture, so it is stored again
+    assert windowed.add((255, 0, 0), 'Red')[1]
+    assert [e['name'] for e in windowed.recent(3)] == ['Red', 'Blue', 'Red']
+
+
+def test_oldest_entries_are_evicted():
+    history = ColorHistory(max_entries=3, dedup_delta_e=0)
+    for value in range(5):
+        history.add((value * 50, 0, 0), f"C{value}")
+    assert [e['name'] for e in history.entries()] == ['C2', 'C3', 'C4']
+    assert history[0]['name'] == 'C2' and history[-1]['name'] == 'C4'
+    assert [e['name'] for e in history.page(1, 5)] == ['C3', 'C4']
+    with pytest.raises(IndexError):
+        history[3]
+
+
+def test_persists_across_reopen(tmp_path):
+    path = str(tmp_path / 'history' / 'colors.sqlite3')
+    history = ColorHistory(path)
+    history.add((12, 34, 56), 'Navy')
+    history.close()
+
+    reopened = ColorHistory(path)
+    assert [(e['rgb'], e['name']) for e in reopened] == [((12, 34, 56), 'Navy')]
+    # Dedup also sees captures from the earlier session
+    assert not reopened.add((12, 34, 57), 'Navy')[1]
+    reopened.clear()
+    assert len(reopened) == 0
+    reopened.close()
+
+
+@pytest.fixture
+def filled(history):
+    history.add((255, 0, 0), 'Red', captured_at=1000.0)
+    history.add((0, 128, 128), 'Teal', captured_at=1001.0)
+    history.add((255, 1, 1), 'Red', captured_at=1002.0)
+    return history
+
+
+def test_export_csv_round_trip(filled, tmp_path):
+    path = tmp_path / 'colors.csv'
+    filled.export(str(path))
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [(r['name'], r['hex'], int(r['r']), int(r['g']), int(r['b']), int(r['count'])) for r in rows] == [
+        ('Red', '#ff0000', 255, 0, 0, 2), ('Teal', '#008080', 0, 128, 128, 1)]
+
+
+def test_export_json_round_trip(filled, tmp_path):
+    path = tmp_path / 'colors.json'
+    filled.export(str(path))
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    assert data == [{**e, 'rgb': list(e['rgb'])} for e in filled.entries()]
+
+
+def test_export_gpl(filled, tmp_path):
+    path = tmp_path / 'colors.gpl'
+    filled.export(str(path), title="Test")
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert lines[:2] == ['GIMP Palette', 'Name: Test']
+    swatches = [line.split('\t') for line in lines[4:]]
+    assert [tuple(int(v) for v in values.split()) for values, _ in swatches] == [(255, 0, 0), (0, 128, 128)]
+    assert [label for _, label in swatches] == ['Red #ff0000', 'Teal #008080']
+
+
+def test_export_ase_round_trip(filled, tmp_path):
+    path = tmp_path / 'colors.ase'
+    filled.export(str(path))
+    data = path.read_bytes()
+    assert data[:4] == b'ASEF'
+    major, minor, count = struct.unpack('>HHI', data[4:12])
+    assert (major, minor, count) == (1, 0, 2)
+
+    swatches, offset = [], 12
+    for _ in range(count):
+        block_type, length = struct.unpack('>HI', data[offset:offset + 6])
+        body = data[offset + 6:offset + 6 + length]
+        name_length = struct.unpack('>H', body[:2])[0] * 2
+        name = body[2:2 + name_length].decode('utf-16-be').rstrip('\x00')
+        model = body[2 + name_length:6 + name_length]
+        r, g, b, _ = struct.unpack('>fffH', body[6 + name_length:])
+        swatches.append((block_type, name, model, round(r * 255), round(g * 255), round(b * 255)))
+        offset += 6 + length
+    assert offset == len(data)
+    assert swatches == [(1, 'Red #ff0000', b'RGB ', 255, 0, 0), (1, 'Teal #008080', b'RGB ', 0, 128, 128)]
+
+
+def test_export_rejects_unknown_formats(filled, tmp_path):
+    with pytest.raises(ValueError):
+        filled.export(str(tmp_path / 'colors.txt'))
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import cv2
+import numpy as np
+import pytest
+
+from large_image import LargeImage
+
+tifffile = pytest.importorskip('tifffile')
+
+
+@pytest.fixture(scope='module')
+def rgb():
+    return np.random.default_rng(0).integers(0, 256, (300, 250, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize('layout', [{'rowsperstrip': 32}, {'tile': (64, 64)}])
+def test_compressed_tiff_is_spooled_segment_by_segment(tmp_path, rgb, layout):
+    path = str(tmp_path / 'scan.tif')
+    tifffile.imwrite(path, rgb, compression='zlib', **layout)
+
+    image = LargeImage.open(path, preview_size=(50, 50), max_resident_pixels=0)
+    assert not image.resident and max(image.preview.shape[:2]) == 50
+    assert np.array_equal(image.read_region(0, 0, 250, 300), rgb[..., ::-1])
+    assert image.pixel(249, 299) == tuple(int(c) for c in rgb[299, 249])
+
+    spool_path = image._mapped.filename
+    image.close()
+    assert not os.path.exists(spool_path)
+
+
+def test_small_compressed_tiff_stays_resident(tmp_path, rgb):
+    path = str(tmp_path / 'scan.tif')
+    tifffile.imwrite(path, rgb, compression='zlib', rowsperstrip=32)
+    image = LargeImage.open(path)
+    assert image.resident and np.array_equal(image.array, cv2.imread(path))
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="ru_maxrss is in KiB on Linux only")
+def test_compressed_tiff_streaming_keeps_rss_bounded(tmp_path):
+    # 6000x4000 RGB is 72 MB decoded; a gradient keeps the file small
+    height, width = 4000, 6000
+    ramp = np.broadcast_to((np.arange(width) % 256).astype(np.uint8)[None, :, None], (height, width, 3))
+    path = str(tmp_path / 'huge.tif')
+    tifffile.imwrite(path, ramp, compression='zlib', rowsperstrip=64)
+
+    script = textwrap.dedent(f"""
+        import resource
+        import numpy as np
+        from large_image import LargeImage
+
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        image = LargeImage.open({path!r})
+        total = sum(int(band.sum(dtype=np.uint64)) for _, band in image.iter_bands(128))
+        image.close()
+        print(total, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+    """)
+    output = subprocess.run([sys.executable, '-c', script], check=True, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    total, grown_kib = map(int, output.split())
+    assert total == int(ramp.sum(dtype=np.uint64))
+    # Decoding the whole frame would grow RSS by at least 72 MB; allow a third of that
+    assert grown_kib * 1024 < height * width
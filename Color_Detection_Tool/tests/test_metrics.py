@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from metrics import PipelineMetrics
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_timed_stages_and_fps_use_the_clock(clock):
+    metrics = PipelineMetrics(clock=clock)
+    for _ in range(5):
+        with metrics.time('read'):
+            clock.now += 0.004
+        clock.now += 0.046
+        metrics.frame()
+
+    assert metrics.fps == pytest.approx(20.0)
+    stats = metrics.summary()['read']
+    assert stats['count'] == 5
+    assert stats['mean_ms'] == stats['p50_ms'] == stats['max_ms'] == pytest.approx(4.0)
+    assert metrics.counters['frames'] == 5
+
+
+def test_prometheus_golden_output(clock):
+    metrics = PipelineMetrics(window=2, clock=clock)
+    for seconds in (0.1, 0.2, 0.3):
+        metrics.record('name', seconds)
+    metrics.frame()
+    clock.now = 0.5
+    metrics.frame()
+    metrics.set_counter('frames_dropped', 7)
+    metrics.set_gauge('name_cache_size', 42)
+
+    assert metrics.to_prometheus() == (
+        "# HELP color_detection_fps Frames per second over the recent window\n"
+        "# TYPE color_detection_fps gauge\n"
+        "color_detection_fps 2.000\n"
+        "# TYPE color_detection_frames_total counter\n"
+        "color_detection_frames_total 2\n"
+        "# TYPE color_detection_frames_dropped_total counter\n"
+        "color_detection_frames_dropped_total 7\n"
+        "# TYPE color_detection_name_cache_size gauge\n"
+        "color_detection_name_cache_size 42\n"
+        "# HELP color_detection_stage_seconds Per-stage duration (quantiles over the recent window)\n"
+        "# TYPE color_detection_stage_seconds summary\n"
+        'color_detection_stage_seconds{stage="name",quantile="0.5"} 0.250000\n'
+        'color_detection_stage_seconds{stage="name",quantile="0.95"} 0.295000\n'
+        'color_detection_stage_seconds{stage="name",quantile="0.99"} 0.299000\n'
+        'color_detection_stage_seconds_sum{stage="name"} 0.600000\n'
+        'color_detection_stage_seconds_count{stage="name"} 3\n'
+    )
+
+
+def test_summary_sum_and_count_keep_growing_past_the_window():
+    metrics = PipelineMetrics(window=4)
+    previous = (0, 0.0)
+    for _ in range(10):
+        metrics.record('total', 0.01)
+        totals = metrics.totals()['total']
+        current = (totals['count'], totals['sum_s'])
+        assert current > previous
+        previous = current
+    assert metrics.summary()['total']['count'] == 4
+    assert metrics.totals()['total'] == {'count': 10, 'sum_s': 0.1}
+
+    metrics.reset()
+    assert metrics.totals() == {} and metrics.summary() == {}
+
+
+def test_json_export(clock, tmp_path):
+    metrics = PipelineMetrics(clock=clock)
+    metrics.record('read', 0.002)
+    metrics.set_gauge('name_cache_size', 3)
+
+    path = tmp_path / 'metrics.json'
+    metrics.export(str(path))
+    assert json.loads(path.read_text(encoding='utf-8')) == {
+        'fps': 0.0,
+        'counters': {},
+        'gauges': {'name_cache_size': 3},
+        'stages': {'read': {'count': 1, 'mean_ms': 2.0, 'p50_ms': 2.0, 'p95_ms': 2.0,
+                            'p99_ms': 2.0, 'max_ms': 2.0}},
+        'totals': {'read': {'count': 1, 'sum_s': 0.002}},
+    }
+
+    prom = tmp_path / 'metrics.prom'
+    metrics.export(str(prom))
+    assert prom.read_text(encoding='utf-8') == metrics.to_prometheus()
+
+
+def test_status_text(clock):
+    metrics = PipelineMetrics(clock=clock)
+    metrics.record('total', 0.010)
+    metrics.set_counter('frames_dropped', 2)
+    assert metrics.status_text() == "0.0 FPS | total p95 10.0 ms | dropped 2"
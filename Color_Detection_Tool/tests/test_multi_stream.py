@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+from frame_sources import SyntheticSource
+from multi_stream import Stream, StreamManager
+
+
+class RecordingSource(SyntheticSource):
+    """Synthetic frames, remembering which thread released the source"""
+
+    def __init__(self, width, height, **options):
+        super().__init__(width, height, **options)
+        self.released_by = []
+
+    def release(self):
+        self.released_by.append(threading.current_thread().name)
+
+
+class ShapeProcessor:
+    """Returns the frame shape; optionally blocks until `gate` is set"""
+
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.threads = set()
+
+    def process(self, frame):
+        self.threads.add(threading.current_thread().name)
+        if self.gate is not None:
+            self.gate.wait(2.0)
+        return frame.shape
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def make_manager(sizes, gate=None, frames=None, workers=None):
+    streams = [Stream(f"{w}x{h}", RecordingSource(w, h, frames=frames), ShapeProcessor(gate))
+               for w, h in sizes]
+    return StreamManager(streams, workers=workers)
+
+
+def test_results_are_kept_per_stream():
+    manager = make_manager([(64, 48), (32, 16)], frames=20)
+    manager.start()
+    seen = {}
+    wait_until(lambda: seen.update(manager.poll()) or len(seen) == 2)
+    assert manager.stop()
+    assert seen == {0: (48, 64, 3), 1: (16, 32, 3)}
+    for stream in manager.streams:
+        assert stream.processor.threads <= {f"stream-worker_{i}" for i in range(manager.workers)}
+
+
+def test_frames_are_skipped_while_one_is_in_flight():
+    gate = threading.Event()
+    manager = make_manager([(32, 24)], gate=gate)
+    manager.start()
+    stream = manager.streams[0]
+    wait_until(lambda: stream.frames_skipped >= 5)
+    # Only the first frame reached the pool; the rest were skipped, not queued
+    assert stream.frames_processed == 0
+    assert stream.frames_captured == stream.frames_skipped + 1
+    gate.set()
+    wait_until(lambda: stream.frames_processed >= 2)
+    assert manager.stop()
+    stats = manager.stats()[0]
+    assert stats['captured'] >= stats['processed'] + stats['skipped']
+    assert stats['error'] is None
+
+
+def test_end_of_source_is_reported():
+    manager = make_manager([(32, 24)], frames=3)
+    manager.start()
+    wait_until(lambda: not manager.running)
+    assert manager.stop()
+    assert manager.streams[0].error == "Source stopped delivering frames"
+
+
+def test_stop_joins_the_threads_and_capture_threads_release_their_sources():
+    manager = make_manager([(32, 24), (32, 24), (32, 24)], workers=2)
+    manager.start()
+    wait_until(lambda: all(s.frames_processed for s in manager.streams))
+    assert manager.stop()
+    assert not manager.running
+    assert manager._pool is None
+    assert not any(t.name.startswith("stream-") for t in threading.enumerate())
+    assert [s.source.released_by for s in manager.streams] == [
+        ["stream-capture-0"], ["stream-capture-1"], ["stream-capture-2"]]
+
+
+def test_stop_without_start_releases_the_sources():
+    manager = make_manager([(32, 24), (32, 24)])
+    assert manager.stop()
+    assert [s.source.released_by for s in manager.streams] == [["MainThread"], ["MainThread"]]
+
+
+def test_from_specs_rejects_unopenable_sources(tmp_path):
+    with pytest.raises(ValueError, match="Cannot open frame source"):
+        StreamManager.from_specs(['synthetic:32x24', str(tmp_path / '*.png')], ShapeProcessor)
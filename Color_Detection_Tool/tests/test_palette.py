@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from palette import extract_palette, median_cut, minibatch_kmeans
+
+
+@pytest.fixture(scope='module')
+def two_colors():
+    image = np.zeros((40, 40, 3), dtype=np.uint8)
+    image[:, :10] = (0, 0, 255)      # a quarter red (BGR)
+    image[:, 10:] = (255, 0, 0)      # three quarters blue
+    return image
+
+
+@pytest.mark.parametrize('method', ['kmeans', 'median_cut'])
+def test_palette_is_most_common_first(two_colors, method):
+    palette = extract_palette(two_colors, 2, method)
+    assert [(c['rgb'], c['name']) for c in palette] == [((0, 0, 255), 'Blue'), ((255, 0, 0), 'Red')]
+    assert [c['share'] for c in palette] == [0.75, 0.25]
+    assert palette[0]['hex'] == '#0000ff'
+
+
+@pytest.mark.parametrize('n_colors', [0, -3])
+def test_palette_size_must_be_positive(two_colors, n_colors):
+    with pytest.raises(ValueError, match="at least 1"):
+        extract_palette(two_colors, n_colors)
+
+
+@pytest.mark.parametrize('method', ['kmeans', 'median_cut'])
+def test_empty_image_has_empty_palette(method):
+    assert extract_palette(np.zeros((0, 8, 3), dtype=np.uint8), 3, method) == []
+
+
+@pytest.mark.parametrize('cluster', [minibatch_kmeans, median_cut])
+def test_clustering_rejects_empty_points_and_bad_k(cluster):
+    with pytest.raises(ValueError, match="No pixels"):
+        cluster(np.zeros((0, 3), dtype=np.uint8), 3)
+    with pytest.raises(ValueError, match="at least 1"):
+        cluster(np.zeros((5, 3), dtype=np.uint8), 0)
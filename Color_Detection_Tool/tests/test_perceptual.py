@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from color_names import css3_colors
+from perceptual import PerceptualMatcher, delta_e_2000, named_palette, rgb_to_lab
+
+# Sharma, Wu & Dalal (2005), "The CIEDE2000 color-difference formula:
+# implementation notes, supplementary test data": (Lab 1, Lab 2, ΔE00)
+SHARMA_PAIRS = [
+    ((50.0000, 2.6772, -79.7751), (50.0000, 0.0000, -82.7485), 2.0425),
+    ((50.0000, 3.1571, -77.2803), (50.0000, 0.0000, -82.7485), 2.8615),
+    ((50.0000, 2.8361, -74.0200), (50.0000, 0.0000, -82.7485), 3.4412),
+    ((50.0000, -1.3802, -84.2814), (50.0000, 0.0000, -82.7485), 1.0000),
+    ((50.0000, -1.1848, -84.8006), (50.0000, 0.0000, -82.7485), 1.0000),
+    ((50.0000, -0.9009, -85.5211), (50.0000, 0.0000, -82.7485), 1.0000),
+    ((50.0000, 0.0000, 0.0000), (50.0000, -1.0000, 2.0000), 2.3669),
+    ((50.0000, -1.0000, 2.0000), (50.0000, 0.0000, 0.0000), 2.3669),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0009), 7.1792),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0010), 7.1792),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0011), 7.2195),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0012), 7.2195),
+    ((50.0000, -0.0010, 2.4900), (50.0000, 0.0009, -2.4900), 4.8045),
+    ((50.0000, -0.0010, 2.4900), (50.0000, 0.0010, -2.4900), 4.8045),
+    ((50.0000, -0.0010, 2.4900), (50.0000, 0.0011, -2.4900), 4.7461),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 0.0000, -2.5000), 4.3065),
+    ((50.0000, 2.5000, 0.0000), (73.0000, 25.0000, -18.0000), 27.1492),
+    ((50.0000, 2.5000, 0.0000), (61.0000, -5.0000, 29.0000), 22.8977),
+    ((50.0000, 2.5000, 0.0000), (56.0000, -27.0000, -3.0000), 31.9030),
+    ((50.0000, 2.5000, 0.0000), (58.0000, 24.0000, 15.0000), 19.4535),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 3.1736, 0.5854), 1.0000),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 3.2972, 0.0000), 1.0000),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 1.8634, 0.5757), 1.0000),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 3.2592, 0.3350), 1.0000),
+    ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+    ((63.0109, -31.0961, -5.8663), (62.8187, -29.7946, -4.0864), 1.2630),
+    ((61.2901, 3.7196, -5.3901), (61.4292, 2.2480, -4.9620), 1.8731),
+    ((35.0831, -44.1164, 3.7933), (35.0232, -40.0716, 1.5901), 1.8645),
+    ((22.7233, 20.0904, -46.6940), (23.0331, 14.9730, -42.5619), 2.0373),
+    ((36.4612, 47.8580, 18.3852), (36.2715, 50.5065, 21.2231), 1.4146),
+    ((90.8027, -2.0831, 1.4410), (91.1528, -1.6435, 0.0447), 1.4441),
+    ((90.9257, -0.5406, -0.9208), (88.6381, -0.8985, -0.7239), 1.5381),
+    ((6.7747, -0.2908, -2.4247), (5.8714, -0.0985, -2.2286), 0.6377),
+    ((2.0776, 0.0795, -1.1350), (0.9033, -0.0636, -0.5514), 0.9082),
+]
+
+
+@pytest.mark.parametrize('lab1, lab2, expected', SHARMA_PAIRS)
+def test_delta_e_2000_matches_sharma_reference(lab1, lab2, expected):
+    assert delta_e_2000(lab1, lab2) == pytest.approx(expected, abs=1e-4)
+    assert delta_e_2000(lab2, lab1) == pytest.approx(expected, abs=1e-4)
+
+
+def test_delta_e_2000_broadcasts():
+    lab1 = np.array([pair[0] for pair in SHARMA_PAIRS])
+    lab2 = np.array([pair[1] for pair in SHARMA_PAIRS])
+    expected = np.array([pair[2] for pair in SHARMA_PAIRS])
+    assert np.allclose(delta_e_2000(lab1, lab2), expected, atol=1e-4)
+    assert (delta_e_2000(lab1, lab1) == 0).all()
+    assert delta_e_2000(lab1[0], lab2).shape == (len(SHARMA_PAIRS),)
+
+
+def test_rgb_to_lab_reference_values():
+    assert np.allclose(rgb_to_lab([255, 255, 255]), [100, 0, 0], atol=0.01)
+    assert np.allclose(rgb_to_lab([0, 0, 0]), [0, 0, 0], atol=1e-9)
+    assert np.allclose(rgb_to_lab([255, 0, 0]), [53.24, 80.09, 67.20], atol=0.01)
+    assert rgb_to_lab(np.zeros((4, 5, 3))).shape == (4, 5, 3)
+
+
+def test_matcher_names_palette_colors_and_batches():
+    palette = {'Red': (255, 0, 0), 'Dark Red': (139, 0, 0), 'Green': (0, 128, 0), 'Sky': (135, 206, 235)}
+    for name, rgb in palette.items():
+        assert PerceptualMatcher(palette, k=2).name(rgb) == name
+
+    # With every palette entry as a candidate, re-ranking is an exhaustive ΔE2000 search
+    matcher = PerceptualMatcher(palette, k=len(palette))
+    pixels = np.random.default_rng(0).integers(0, 256, (300, 3), dtype=np.uint8)
+    labels = matcher.label(pixels)
+    lab = rgb_to_lab(pixels)
+    exact = delta_e_2000(lab[:, None, :], matcher.lab[None, :, :]).argmin(axis=1)
+    assert (labels == exact).all()
+    assert (matcher.label(pixels[:, ::-1], bgr=True) == labels).all()
+
+
+def test_named_palette_specs(tmp_path):
+    assert named_palette('css3') == css3_colors()
+    assert named_palette('css4')['Rebeccapurple'] == (102, 51, 153)
+
+    path = tmp_path / 'vendor.csv'
+    path.write_text("name,hex\nBrand Red,#d52b1e\nBrand Grey,64,64,64\n", encoding='utf-8')
+    assert named_palette(str(path)) == {'Brand Red': (213, 43, 30), 'Brand Grey': (64, 64, 64)}
+
+
+def test_backend_segments_with_the_chosen_palette(tmp_path):
+    from Color_Detection_Tool import load_backend
+    from segmentation import area_stats, segment_image
+
+    path = tmp_path / 'vendor.csv'
+    path.write_text("name,hex\nBrand Red,#d52b1e\nBrand Grey,64,64,64\n", encoding='utf-8')
+    backend = load_backend(palette=str(path))
+    assert backend.color_lut.names == ['Brand Red', 'Brand Grey']
+    assert backend.palette_matcher.names == backend.color_lut.names
+
+    image = np.zeros((4, 4, 3), np.uint8)
+    image[:, :3] = (30, 43, 213)  # BGR brand red
+    stats = area_stats(segment_image(image, backend.color_lut, bgr=True))
+    assert [(s['name'], s['pixels']) for s in stats] == [('Brand Red', 12), ('Brand Grey', 4)]
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from sampling import SAMPLING_PRESETS, IntegralImage, SamplingRegion, sample_window
+
+
+@pytest.fixture(scope='module')
+def image():
+    return np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+
+
+def rgb(bgr_mean):
+    b, g, r = (int(round(float(c))) for c in bgr_mean)
+    return r, g, b
+
+
+def test_rect_mean_matches_slice_mean(image):
+    sampler = IntegralImage(image)
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        x0, x1 = sorted(rng.integers(0, 161, 2))
+        y0, y1 = sorted(rng.integers(0, 121, 2))
+        if x1 == x0 or y1 == y0:
+            continue
+        expected = rgb(image[y0:y1, x0:x1].reshape(-1, 3).mean(axis=0))
+        assert sampler.rect_mean(x0, y0, x1, y1) == expected
+        # Corners may come in any order
+        assert sampler.sample(SAMPLING_PRESETS['Drag rectangle'], bounds=(x1, y1, x0, y0)) == expected
+
+
+def test_box_and_point_presets(image):
+    sampler = IntegralImage(image)
+    assert sampler.sample(SAMPLING_PRESETS['Single pixel'], 40, 30) == rgb(image[30, 40])
+    box = image[28:33, 38:43].reshape(-1, 3)
+    assert sampler.sample(SAMPLING_PRESETS['5x5 box'], 40, 30) == rgb(box.mean(axis=0))
+    # Boxes are clipped at the image border
+    assert sampler.sample(SAMPLING_PRESETS['11x11 box'], 0, 0) == rgb(image[:6, :6].reshape(-1, 3).mean(axis=0))
+
+
+def test_circle_and_median_match_masked_pixels(image):
+    sampler = IntegralImage(image)
+    cx, cy, radius = 70, 50, 20
+    yy, xx = np.mgrid[:120, :160]
+    disc = image[(xx - cx) ** 2 + (yy - cy) ** 2 <= radius * radius]
+    region = SamplingRegion('circle', radius)
+    assert sampler.sample(region, cx, cy) == rgb(disc.mean(axis=0))
+    assert sampler.sample(region, cx, cy, statistic='median') == rgb(np.median(disc, axis=0))
+
+
+def test_box_means_and_rgb_input(image):
+    boxes = [(0, 0, 10, 10), (150, 110, 160, 120), (20, 30, 70, 90)]
+    means = IntegralImage(image).box_means(boxes)
+    for (x0, y0, x1, y1), mean in zip(boxes, means):
+        assert np.allclose(mean, image[y0:y1, x0:x1].reshape(-1, 3).mean(axis=0)[::-1])
+    rgb_image = np.ascontiguousarray(image[..., ::-1])
+    assert IntegralImage(rgb_image, bgr=False).rect_mean(5, 5, 50, 40) == IntegralImage(image).rect_mean(5, 5, 50, 40)
+
+
+def test_errors(image):
+    sampler = IntegralImage(image)
+    with pytest.raises(ValueError):
+        sampler.rect_mean(200, 200, 300, 300)
+    with pytest.raises(ValueError):
+        sampler.sample(SAMPLING_PRESETS['Drag rectangle'])
+    with pytest.raises(ValueError):
+        sampler.sample(SAMPLING_PRESETS['5x5 box'], 10, 10, statistic='mode')
+
+
+@pytest.mark.parametrize('name', [n for n in SAMPLING_PRESETS if n != 'Drag rectangle'])
+@pytest.mark.parametrize('statistic', ['mean', 'median'])
+def test_sample_window_matches_full_integral(image, name, statistic):
+    def outcome(sample, *args):
+        try:
+            return sample(*args, statistic=statistic)
+        except ValueError:
+            return 'outside'
+
+    sampler = IntegralImage(image)
+    region = SAMPLING_PRESETS[name]
+    # Centre, corners, and a centre off the image that only larger regions reach
+    for cx, cy in [(80, 60), (0, 0), (159, 119), (3, 118), (-5, 60)]:
+        assert outcome(sample_window, image, region, cx, cy) == outcome(sampler.sample, region, cx, cy)
+
+
+def test_uint32_sums_wrap_exactly_on_large_white_image():
+    # 17.2 M pixels: the summed-area table's bottom-right sums exceed 2**32 and wrap
+    height, width = 4200, 4100
+    white = np.full((height, width, 3), 255, dtype=np.uint8)
+    sampler = IntegralImage(white)
+    assert int(sampler.sat[-1, -1, 0]) != height * width * 255
+
+    assert sampler.sample(SAMPLING_PRESETS['11x11 box'], width - 3, height - 3) == (255, 255, 255)
+    assert sampler.sample(SAMPLING_PRESETS['Circle (20 px)'], width - 30, height - 30) == (255, 255, 255)
+    # Largest exact area, ending in the wrapped corner
+    assert sampler.rect_mean(0, 100, width, height) == (255, 255, 255)
+    # Beyond the exact area the mean is computed from the pixels directly
+    assert sampler.rect_mean(0, 0, width, height) == (255, 255, 255)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from large_image import LargeImage
+from segmentation import area_stats, name_mask, overlay, segment_image
+
+
+@pytest.fixture(scope='module')
+def two_colors():
+    image = np.zeros((10, 20, 3), dtype=np.uint8)
+    image[:, :6] = (0, 0, 255)       # 60 red pixels (BGR)
+    image[:, 6:] = (255, 0, 0)       # 140 blue pixels
+    return image
+
+
+def test_area_stats_are_exact_for_two_colors(lut, two_colors):
+    segmentation = segment_image(two_colors, lut)
+    assert segmentation.labels.shape == (10, 20)
+    assert area_stats(segmentation) == [
+        {'name': 'Blue', 'pixels': 140, 'percent': 70.0},
+        {'name': 'Red', 'pixels': 60, 'percent': 30.0},
+    ]
+    assert [s['name'] for s in area_stats(segmentation, top=1)] == ['Blue']
+
+    mask = name_mask(segmentation, 'Red')
+    assert mask.sum() == 60 and mask[:, :6].all()
+
+
+def test_rgb_input(lut, two_colors):
+    counts = segment_image(two_colors[..., ::-1], lut, bgr=False).counts
+    assert (counts == segment_image(two_colors, lut).counts).all()
+
+
+def test_streamed_large_image_matches_in_memory(lut, tmp_path):
+    # Taller than one band, so the counts are summed over several
+    rgb = np.random.default_rng(0).integers(0, 256, (1100, 300, 3), dtype=np.uint8)
+    path = str(tmp_path / 'scan.npy')
+    np.save(path, rgb)
+
+    image = LargeImage.open(path)
+    assert not image.resident
+    streamed = segment_image(image, lut)
+    in_memory = segment_image(rgb, lut, bgr=False)
+
+    assert streamed.labels is None
+    assert (streamed.counts == in_memory.counts).all()
+    assert area_stats(streamed) == area_stats(in_memory)
+    with pytest.raises(ValueError):
+        name_mask(streamed, 'Red')
+    image.close()
+
+
+def test_overlay_tints_only_the_highlighted_name(lut, two_colors):
+    segmentation = segment_image(two_colors, lut)
+    red = lut.names.index('Red')
+    tinted = overlay(two_colors, segmentation.labels, lut.colors, alpha=1.0, highlight=red)
+    assert (tinted[:, :6] == (0, 0, 255)).all()
+    assert (tinted[:, 6:] == two_colors[:, 6:]).all()
@@ -0,0 +1,57 @@
+import pytest
+
+from smoothing import TemporalFilter
+
+
+def test_ema_converges_after_a_step_change():
+    smoother = TemporalFilter('ema', alpha=0.5)
+    assert smoother.update((0, 0, 0)) == (0, 0, 0)
+
+    readings = [smoother.update((200, 100, 40)) for _ in range(12)]
+    # Each reading halves the remaining distance to the new color
+    assert readings[:3] == [(100, 50, 20), (150, 75, 30), (175, 88, 35)]
+    assert all(a[0] <= b[0] for a, b in zip(readings, readings[1:]))
+    assert readings[-1] == (200, 100, 40)
+
+
+def test_median_rejects_a_single_outlier():
+    smoother = TemporalFilter('median', window=5)
+    for _ in range(4):
+        assert smoother.update((100, 120, 140)) == (100, 120, 140)
+    assert smoother.update((255, 0, 255)) == (100, 120, 140)
+    # A change that persists for most of the window does come through
+    for _ in range(2):
+        smoother.update((10, 20, 30))
+    assert smoother.update((10, 20, 30)) == (10, 20, 30)
+
+
+def test_stable_only_after_a_full_window_of_steady_readings():
+    smoother = TemporalFilter('ema', window=4, stable_std=3.0)
+    flags = []
+    for _ in range(5):
+        smoother.update((50, 50, 50))
+        flags.append(smoother.stable)
+    assert flags == [False, False, False, True, True]
+
+    # A step change is unstable until the new color fills the window
+    flags = []
+    for _ in range(4):
+        smoother.update((90, 50, 50))
+        flags.append(smoother.stable)
+    assert flags == [False, False, False, True]
+
+    # Jitter within stable_std still counts as stable
+    for value in (89, 91, 90, 92):
+        smoother.update((value, 50, 50))
+    assert smoother.stable
+
+    smoother.reset()
+    smoother.update((90, 50, 50))
+    assert not smoother.stable
+
+
+def test_invalid_settings_are_rejected():
+    with pytest.raises(ValueError):
+        TemporalFilter('mean')
+    with pytest.raises(ValueError):
+        TemporalFilter(window=0)
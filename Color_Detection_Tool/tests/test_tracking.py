@@ -0,0 +1,49 @@
+import numpy as np
+
+from tracking import ColorTracker, draw_boxes, hsv_ranges
+
+
+def frame_with_rect(width, height, rect, bgr=(0, 0, 220), background=(40, 160, 40)):
+    frame = np.full((height, width, 3), background, dtype=np.uint8)
+    x, y, w, h = rect
+    frame[y:y + h, x:x + w] = bgr
+    return frame
+
+
+def test_finds_the_box_of_a_colored_rectangle():
+    frame = frame_with_rect(400, 300, (120, 80, 100, 60))
+    result = ColorTracker((220, 0, 0)).detect(frame)
+    assert result.boxes == [(120, 80, 100, 60)]
+    assert result.latency_ms >= 0
+
+
+def test_downscaled_mask_maps_back_to_full_frame():
+    # Processed at 480 px wide, so boxes are scaled back by 4 and rounded outwards
+    frame = frame_with_rect(1920, 1080, (800, 400, 320, 200))
+    x, y, w, h = ColorTracker((220, 0, 0)).detect(frame).boxes[0]
+    assert (x, y) <= (800, 400) and (x, y) >= (796, 396)
+    assert 320 <= w <= 328 and 200 <= h <= 208
+
+
+def test_boxes_are_largest_first_and_small_regions_ignored():
+    frame = frame_with_rect(400, 300, (10, 10, 40, 40))
+    frame[100:200, 200:350] = (0, 0, 220)
+    frame[280:283, 380:383] = (0, 0, 220)     # 9 px, under min_area
+    assert ColorTracker((220, 0, 0)).detect(frame).boxes == [(200, 100, 150, 100), (10, 10, 40, 40)]
+    assert ColorTracker((0, 0, 220)).detect(frame).boxes == []
+
+
+def test_red_hue_range_wraps_around():
+    for rgb in ((255, 0, 20), (255, 20, 0)):     # hue just below / above 0
+        hues = sorted((int(lower[0]), int(upper[0])) for lower, upper in hsv_ranges(rgb))
+        assert len(hues) == 2 and hues[0][0] == 0 and hues[1][1] == 179
+    # Grays match any hue
+    (lower, upper), = hsv_ranges((128, 128, 128))
+    assert (lower[0], upper[0]) == (0, 179)
+
+
+def test_draw_boxes_outlines_in_place():
+    frame = np.zeros((50, 50, 3), dtype=np.uint8)
+    assert draw_boxes(frame, [(10, 10, 20, 20)], thickness=1) is frame
+    assert (frame[10, 10:30] == (255, 0, 255)).all() and (frame[29, 10:30] == (255, 0, 255)).all()
+    assert not frame[15:25, 15:25].any()
@@ -0,0 +1,106 @@
+"""HSV range-based tracking of one color in camera frames"""
+
+import math
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# boxes: (x, y, w, h) in full-frame pixels, largest first; latency_ms: time spent in detect()
+TrackResult = namedtuple('TrackResult', ['boxes', 'latency_ms'])
+
+# Width of the downscaled frame the mask is computed on
+DEFAULT_PROCESS_WIDTH = 480
+
+BOX_COLOR = (255, 0, 255)
+
+
+def hsv_ranges(rgb_color, hue_tol=10, sat_tol=70, val_tol=70):
+    """OpenCV inRange (lower, upper) HSV bounds around an RGB color.
+
+    Hue is in OpenCV's 0-179 units and wraps around red, so a range may be
+    split in two. Colors too unsaturated for their hue to mean anything
+    (grays, white, black) match any hue.
+    """
+    r, g, b = rgb_color
+    h, s, v = (int(c) for c in cv2.cvtColor(np.uint8([[[b, g, r]]]), cv2.COLOR_BGR2HSV)[0, 0])
+    s_lo, s_hi = max(0, s - sat_tol), min(255, s + sat_tol)
+    v_lo, v_hi = max(0, v - val_tol), min(255, v + val_tol)
+
+    if s <= sat_tol:
+        hue_spans = [(0, 179)]
+    elif h - hue_tol < 0:
+        hue_spans = [(0, h + hue_tol), (180 + h - hue_tol, 179)]
+    elif h + hue_tol > 179:
+        hue_spans = [(h - hue_tol, 179), (0, h + hue_tol - 180)]
+    else:
+        hue_spans = [(h - hue_tol, h + hue_tol)]
+
+    return [(np.array([h_lo, s_lo, v_lo], dtype=np.uint8), np.array([h_hi, s_hi, v_hi], dtype=np.uint8))
+            for h_lo, h_hi in hue_spans]
+
+
+class ColorTracker:
+    """Find and box every region of one color in a BGR frame.
+
+    The mask is built on a copy downscaled to `process_width` pixels wide, so
+    the cost is nearly independent of the camera resolution: inRange in HSV,
+    an opening to drop speckle and a closing to fill holes, then external
+    contours. Regions smaller than `min_area` (a fraction of the frame) are
+    ignored.
+    """
+
+    def __init__(self, rgb_color, hue_tol=10, sat_tol=70, val_tol=70,
+                 process_width=DEFAULT_PROCESS_WIDTH, min_area=0.001, kernel_size=5):
+        self.rgb_color = tuple(int(c) for c in rgb_color)
+        self.process_width = process_width
+        self.min_area = min_area
+        self._ranges = hsv_ranges(self.rgb_color, hue_tol, sat_tol, val_tol)
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
+
+    def mask(self, frame):
+        """Binary mask of the target color at processing resolution, and the scale used"""
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.process_width / w)
+        if scale < 1.0:
+            frame = cv2.resize(frame, (max(1, round(w * scale)), max(1, round(h * scale))),
+                               interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+
+        lower, upper = self._ranges[0]
+        mask = cv2.inRange(hsv, lower, upper)
+        for lower, upper in self._ranges[1:]:
+            cv2.bitwise_or(mask, cv2.inRange(hsv, lower, upper), dst=mask)
+
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self._kernel)
+        return mask, scale
+
+    def detect(self, frame):
+        """Bounding boxes of the target color's regions in full-frame coordinates"""
+        start = time.perf_counter()
+        mask, scale = self.mask(frame)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        min_pixels = self.min_area * mask.shape[0] * mask.shape[1]
+        found = []
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if area < min_pixels:
+                continue
+            x, y, bw, bh = cv2.boundingRect(contour)
+            # Map back to the full frame, rounding outwards
+            x0, y0 = int(x / scale), int(y / scale)
+            x1, y1 = math.ceil((x + bw) / scale), math.ceil((y + bh) / scale)
+            found.append((area, (x0, y0, x1 - x0, y1 - y0)))
+
+        found.sort(key=lambda item: item[0], reverse=True)
+        return TrackResult([box for _, box in found], (time.perf_counter() - start) * 1000)
+
+
+def draw_boxes(frame, boxes, color=BOX_COLOR, thickness=2):
+    """Draw tracked boxes onto a BGR frame in place"""
+    for x, y, w, h in boxes:
+        cv2.rectangle(frame, (x, y), (x + w - 1, y + h - 1), color, thickness)
+    return frame